@@ -0,0 +1,5 @@
+"""
+Multi-agent crews built with CrewAI: automated code review, deep research and
+YouTube Shorts content planning. Run them with the `crews` command (crews/cli.py),
+on a process pool (crews/pool.py) or behind the local HTTP daemon (crews/daemon.py).
+"""
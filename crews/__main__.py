@@ -0,0 +1,5 @@
+import sys
+
+from crews.cli import main
+
+sys.exit(main())
@@ -0,0 +1,409 @@
+# crews/accounting.py
+
+"""
+Token and Cost Accounting
+-------------------------
+`CrewOutput.token_usage` only has crew totals, so we could not see which agent,
+task or tool burns the budget. UsageRecorder uses CrewAI's LLM and tool call
+hooks and LLM call events for the duration of one run and records, per call,
+the agent, task, model, prompt/completion/cached tokens (taken from each
+response as the LLM tracks it), requests and latency. Tool calls are recorded with
+their latency and whether they failed.
+
+Every crew run that goes through crews/pool.py (CLI, pool, daemon, selftest)
+is recorded and persisted to the usage store ($CREWS_HOME/usage.db, or
+CREWS_USAGE_PATH) next to the other local crew state:
+
+    with UsageRecorder() as recorder:
+        crew.kickoff(inputs=...)
+    UsageStore().save_run(run_id, "review", recorder.calls, seconds=12.3)
+
+Aggregate reports for capacity planning:
+
+    crews usage --by day --by crew --by model [--since 2026-01-01]
+    crews usage --by agent --by task --kind tool
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from crewai.events import crewai_event_bus, LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+from crewai.hooks import (
+    register_before_llm_call_hook, unregister_before_llm_call_hook, register_after_tool_call_hook,
+    register_before_tool_call_hook, unregister_after_tool_call_hook, unregister_before_tool_call_hook,
+)
+
+from crews.model_router import model_price
+from crews.utils import state_path
+
+DEFAULT_USAGE_PATH = state_path("usage.db")
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "cached_prompt_tokens", "successful_requests")
+REPORT_DIMENSIONS = ("day", "crew", "model", "agent", "task", "kind", "name")
+DIRECT_CALL = "(direct)"  # LLM calls made outside an agent, e.g. the parallel blueprint generator
+
+# --- Per-Thread Token Usage ---
+
+# Agent.copy() (and with it Crew.copy()) shallow-copies the LLM, so copies fanned out over threads share one
+# `_token_usage` dict and diffing it would credit each call with its siblings' tokens. Instead, every response's
+# usage is taken where the LLM adds it to that dict, and credited to the thread that made the call.
+_thread_tokens = defaultdict(lambda: dict.fromkeys(TOKEN_FIELDS, 0))
+_tracking_lock = threading.Lock()
+
+
+def _track_per_thread(method):
+    def track_token_usage(llm, *args, **kwargs):
+        with _tracking_lock:
+            before = {field: llm._token_usage.get(field, 0) for field in TOKEN_FIELDS}
+            result = method(llm, *args, **kwargs)
+            tokens = _thread_tokens[threading.get_ident()]
+            for field in TOKEN_FIELDS:
+                tokens[field] += llm._token_usage.get(field, 0) - before[field]
+        return result
+
+    track_token_usage.tracks_per_thread = True
+    return track_token_usage
+
+
+def _install_token_tracking(llm):
+    """Wraps `_track_token_usage_internal` where the LLM's class defines it (once per class)."""
+    owner = next((cls for cls in type(llm).__mro__ if "_track_token_usage_internal" in vars(cls)), None)
+    if owner is None:
+        return
+    with _tracking_lock:
+        method = vars(owner)["_track_token_usage_internal"]
+        if not getattr(method, "tracks_per_thread", False):
+            owner._track_token_usage_internal = _track_per_thread(method)
+
+
+def _token_counters(thread_id):
+    with _tracking_lock:
+        return dict(_thread_tokens[thread_id])
+
+# --- Recording ---
+
+
+def _task_name(task):
+    return (getattr(task, "name", None) or getattr(task, "description", "")[:40]) if task else DIRECT_CALL
+
+
+# The event bus has no way to unregister handlers, so they are installed once and fan out to active recorders
+_active_recorders = set()
+_recorders_lock = threading.Lock()
+_events_installed = False
+
+
+def _forward_event(source, event):
+    with _recorders_lock:
+        recorders = list(_active_recorders)
+    for recorder in recorders:
+        recorder._on_llm_event(source, event)
+
+
+def _install_event_handlers():
+    global _events_installed
+    with _recorders_lock:
+        if not _events_installed:
+            for event_type in (LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent):
+                crewai_event_bus.register_handler(event_type, _forward_event)
+            _events_installed = True
+
+
+class UsageRecorder:
+    """Records one row per LLM and tool call of the enclosed crew run.
+
+    Only before-call hooks are used for LLM calls: with any after_llm_call
+    hook registered, CrewAI turns native tool-call answers into strings. A
+    thread's LLM calls are sequential, so a call's token usage is what the
+    thread's responses reported up to its next call (or the end of the run);
+    latency and failures come from CrewAI's LLM call events.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._open_llm_calls = {}
+        self._event_starts = {}
+        self._outcomes = defaultdict(list)
+        self._event_keys = []  # (agent, task, model) as CrewAI's events report them, per recorded LLM call
+
+    def _key(self, *parts):
+        return (threading.get_ident(),) + tuple(id(part) for part in parts)
+
+    # --- LLM Calls ---
+
+    def _before_llm(self, context):
+        if context.llm is None:
+            return None
+        _install_token_tracking(context.llm)
+        agent, task = getattr(context.agent, "role", DIRECT_CALL), _task_name(context.task)
+        with self._lock:
+            previous = self._open_llm_calls.pop(threading.get_ident(), None)
+            event_key = (agent, task)
+            if context.agent is None and previous and previous["llm"] is context.llm and previous["executor"]:
+                # CrewAI's forced final answer (max_iter reached) is a direct call on the agent's LLM
+                agent, task = previous["agent"], _task_name(previous["executor"].task)
+            self._open_llm_calls[threading.get_ident()] = {
+                "llm": context.llm,
+                "executor": context.executor or (previous["executor"] if agent != DIRECT_CALL else None),
+                "thread": threading.get_ident(),
+                "counters": _token_counters(threading.get_ident()),
+                "name": getattr(context.llm, "model", str(context.llm)),
+                "agent": agent,
+                "task": task,
+                "event_key": event_key,
+            }
+        if previous:
+            self._close_llm_call(previous)
+        return None
+
+    def _close_llm_call(self, call):
+        after = _token_counters(call["thread"])
+        self._append({
+            "kind": "llm",
+            "name": call["name"],
+            "agent": call["agent"],
+            "task": call["task"],
+            "seconds": 0.0,
+            "errors": 0,
+            **{field: after[field] - call["counters"][field] for field in TOKEN_FIELDS},
+        }, event_key=call["event_key"] + (call["name"],))
+
+    def _on_llm_event(self, source, event):
+        key = (event.agent_id or id(source), event.task_id)
+        with self._lock:
+            if isinstance(event, LLMCallStartedEvent):
+                self._event_starts[key] = event.timestamp
+                return
+            started = self._event_starts.pop(key, None)
+            if started is None:
+                return
+            outcome_key = (event.agent_role or DIRECT_CALL, event.task_name or DIRECT_CALL, event.model)
+            self._outcomes[outcome_key].append(
+                ((event.timestamp - started).total_seconds(), isinstance(event, LLMCallFailedEvent)))
+
+    def _apply_outcomes(self):
+        """Matches the per-call latency/failure events to the recorded calls, in call order per agent/task/model."""
+        crewai_event_bus.flush()
+        with self._lock:
+            llm_rows = [row for row in self.calls if row["kind"] == "llm"]
+            for row, event_key in zip(llm_rows, self._event_keys):
+                outcomes = self._outcomes.get(event_key)
+                if outcomes:
+                    row["seconds"], failed = outcomes.pop(0)
+                    row["errors"] = int(failed)
+
+    # --- Tool Calls ---
+
+    def _before_tool(self, context):
+        with self._lock:
+            self._pending[self._key(context.tool)] = time.perf_counter()
+        return None
+
+    def _after_tool(self, context):
+        with self._lock:
+            started = self._pending.pop(self._key(context.tool), None)
+        if started is None:
+            return None
+        result = str(context.tool_result or "")
+        self._append({
+            "kind": "tool",
+            "name": context.tool_name,
+            "agent": getattr(context.agent, "role", DIRECT_CALL),
+            "task": _task_name(context.task),
+            "seconds": time.perf_counter() - started,
+            "errors": int(result.startswith(("Error", "I encountered an error"))),
+            **{field: 0 for field in TOKEN_FIELDS},
+        })
+        return None
+
+    def _append(self, row, event_key=None):
+        with self._lock:
+            self.calls.append(row)
+            if event_key:
+                self._event_keys.append(event_key)
+
+    def __enter__(self):
+        _install_event_handlers()
+        with _recorders_lock:
+            _active_recorders.add(self)
+        register_before_llm_call_hook(self._before_llm)
+        register_before_tool_call_hook(self._before_tool)
+        register_after_tool_call_hook(self._after_tool)
+        return self
+
+    def __exit__(self, *exc_info):
+        unregister_before_llm_call_hook(self._before_llm)
+        unregister_before_tool_call_hook(self._before_tool)
+        unregister_after_tool_call_hook(self._after_tool)
+        with self._lock:
+            still_open = list(self._open_llm_calls.values())
+            self._open_llm_calls.clear()
+        for call in still_open:
+            self._close_llm_call(call)
+        self._apply_outcomes()
+        with _recorders_lock:
+            _active_recorders.discard(self)
+        return False
+
+# --- Aggregation ---
+
+def call_cost(row):
+    if row["kind"] != "llm":
+        return 0.0
+    prompt_price, completion_price = model_price(row["name"])
+    return (row["prompt_tokens"] * prompt_price + row["completion_tokens"] * completion_price) / 1_000_000
+
+
+def aggregate(calls, keys=("kind", "agent", "task", "name")):
+    """Sums calls per `keys`; returns plain dict rows with calls, tokens, cost and seconds."""
+    groups = defaultdict(lambda: defaultdict(int))
+    for row in calls:
+        group = groups[tuple(row[key] for key in keys)]
+        group["calls"] += 1
+        group["errors"] += row["errors"]
+        group["seconds"] += row["seconds"]
+        group["cost_usd"] += call_cost(row)
+        for field in TOKEN_FIELDS:
+            group[field] += row[field]
+    return [dict(zip(keys, key)) | {field: round(value, 6) if isinstance(value, float) else value
+                                    for field, value in totals.items()}
+            for key, totals in groups.items()]
+
+
+def summarize(calls):
+    """Run summary stored with each job result: totals plus per-agent, per-task and per-tool rows."""
+    llm_calls = [row for row in calls if row["kind"] == "llm"]
+    tool_calls = [row for row in calls if row["kind"] == "tool"]
+    totals = aggregate(llm_calls, keys=("kind",))
+    return {
+        "totals": totals[0] if totals else {},
+        "by_agent": aggregate(llm_calls, keys=("agent", "name")),
+        "by_task": aggregate(llm_calls, keys=("task",)),
+        "by_tool": aggregate(tool_calls, keys=("name",)),
+    }
+
+
+def format_summary(summary):
+    """Terminal table of a run summary (used by `--profile`)."""
+    lines = [f"{'LLM by agent':<34}{'Model':<28}{'Calls':>6}{'Prompt':>9}{'Cached':>8}{'Compl.':>8}{'Cost $':>9}{'s':>7}"]
+    for row in summary["by_agent"]:
+        lines.append(f"{row['agent'][:33]:<34}{row['name'][:27]:<28}{int(row['calls']):>6}{int(row['prompt_tokens']):>9}"
+                     f"{int(row['cached_prompt_tokens']):>8}{int(row['completion_tokens']):>8}"
+                     f"{row['cost_usd']:>9.4f}{row['seconds']:>7.1f}")
+    lines.append(f"\n{'LLM by task':<62}{'Calls':>6}{'Prompt':>9}{'Cached':>8}{'Compl.':>8}{'Cost $':>9}{'s':>7}")
+    for row in summary["by_task"]:
+        lines.append(f"{row['task'][:61]:<62}{int(row['calls']):>6}{int(row['prompt_tokens']):>9}"
+                     f"{int(row['cached_prompt_tokens']):>8}{int(row['completion_tokens']):>8}"
+                     f"{row['cost_usd']:>9.4f}{row['seconds']:>7.1f}")
+    if summary["by_tool"]:
+        lines.append(f"\n{'Tool':<62}{'Calls':>6}{'Errors':>9}{'s':>32}")
+        for row in summary["by_tool"]:
+            lines.append(f"{row['name'][:61]:<62}{int(row['calls']):>6}{int(row['errors']):>9}{row['seconds']:>32.1f}")
+    return "\n".join(lines)
+
+# --- Usage Store ---
+
+class UsageStore:
+    """SQLite store of per-run usage rows (one row per kind/agent/task/model-or-tool and run)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("CREWS_USAGE_PATH", DEFAULT_USAGE_PATH)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, crew TEXT, started TEXT, day TEXT,"
+                " seconds REAL, status TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage (run_id TEXT, day TEXT, crew TEXT, kind TEXT, agent TEXT,"
+                " task TEXT, name TEXT, calls INTEGER, errors INTEGER, prompt_tokens INTEGER,"
+                " completion_tokens INTEGER, cached_prompt_tokens INTEGER, successful_requests INTEGER,"
+                " seconds REAL, cost_usd REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS usage_day ON usage (day, crew)")
+
+    def _connect(self):
+        # Pool workers write from several processes; wait for the lock instead of failing
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save_run(self, run_id, crew, calls, seconds, status="done", started=None):
+        started = started or datetime.now(timezone.utc)
+        day = started.date().isoformat()
+        rows = aggregate(calls)
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                         (run_id, crew, started.isoformat(timespec="seconds"), day, seconds, status))
+            conn.execute("DELETE FROM usage WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, day, crew, row["kind"], row["agent"], row["task"], row["name"], int(row["calls"]),
+                  int(row["errors"]), int(row["prompt_tokens"]), int(row["completion_tokens"]),
+                  int(row["cached_prompt_tokens"]), int(row["successful_requests"]), row["seconds"],
+                  row["cost_usd"]) for row in rows],
+            )
+
+    def report(self, by=("day", "crew", "model"), since=None, until=None, kind="llm"):
+        """Aggregate rows grouped by `by` (any of REPORT_DIMENSIONS; 'model' is the LLM name)."""
+        columns = ["name" if dimension == "model" else dimension for dimension in by]
+        unknown = [column for column in columns if column not in REPORT_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown report dimension(s) {unknown}; choose from {REPORT_DIMENSIONS + ('model',)}")
+        where, params = ["kind = ?"], [kind]
+        if since:
+            where.append("day >= ?")
+            params.append(since)
+        if until:
+            where.append("day <= ?")
+            params.append(until)
+        group = ", ".join(columns)
+        query = (
+            f"SELECT {group}, COUNT(DISTINCT run_id), SUM(calls), SUM(errors), SUM(prompt_tokens),"
+            f" SUM(completion_tokens), SUM(cached_prompt_tokens), SUM(seconds), SUM(cost_usd)"
+            f" FROM usage WHERE {' AND '.join(where)} GROUP BY {group} ORDER BY {group}"
+        )
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        fields = list(by) + ["runs", "calls", "errors", "prompt_tokens", "completion_tokens", "cached_prompt_tokens",
+                             "seconds", "cost_usd"]
+        return [dict(zip(fields, row)) for row in rows]
+
+
+def format_report(rows, by):
+    if not rows:
+        return "No usage recorded for this selection."
+    widths = {dimension: max(len(dimension), *(len(str(row[dimension])) for row in rows)) + 2 for dimension in by}
+    header = "".join(f"{dimension:<{widths[dimension]}}" for dimension in by)
+    lines = [header + f"{'Runs':>6}{'Calls':>7}{'Errors':>7}{'Prompt':>11}{'Compl.':>10}{'Cached':>10}{'s':>9}{'Cost $':>10}"]
+    for row in rows:
+        lines.append(
+            "".join(f"{str(row[dimension]):<{widths[dimension]}}" for dimension in by)
+            + f"{row['runs']:>6}{row['calls']:>7}{row['errors']:>7}{row['prompt_tokens']:>11}"
+              f"{row['completion_tokens']:>10}{row['cached_prompt_tokens']:>10}{row['seconds']:>9.1f}{row['cost_usd']:>10.4f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews usage", description="Report token usage and cost of past crew runs.")
+    parser.add_argument("--by", action="append", choices=REPORT_DIMENSIONS + ("model",),
+                        help="Group by these dimensions (repeatable; default: day, crew, model)")
+    parser.add_argument("--since", metavar="YYYY-MM-DD", help="First day to include")
+    parser.add_argument("--until", metavar="YYYY-MM-DD", help="Last day to include")
+    parser.add_argument("--kind", choices=["llm", "tool", "memory"], default="llm",
+                        help="LLM calls (default), tool calls or memory retrievals/saves (crews/memory.py)")
+    parser.add_argument("--store", help="Usage store (default: $CREWS_HOME/usage.db)")
+    args = parser.parse_args(argv)
+
+    by = args.by or ["day", "crew", "model"]
+    print(format_report(UsageStore(args.store).report(by, args.since, args.until, args.kind), by))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+# crews/batch_scrape.py
+
+"""
+Batch Website Scraping
+----------------------
+Agents are told to pass the URLs they found to the ScrapeWebsiteTool, which
+reads one URL per agent step, so reading five OWASP pages costs five full LLM
+round trips plus five sequential downloads. BatchScrapeTool takes the whole
+list in one call:
+
+- pages are fetched concurrently on one pooled async HTTP client, with at
+  most `per_host` requests in flight per host
+- HTML-to-text extraction (BeautifulSoup, the same cleanup as
+  ScrapeWebsiteTool) runs in a thread pool, off the event loop
+- the result is one digest with a section per page, each capped at
+  `max_chars_per_page` and all together at `max_total_chars`; pages that
+  could not be read are listed with the reason
+- inside a Resilience (crews/resilience.py) transient page failures
+  (connection errors, 429/5xx) are retried with jittered backoff
+
+    tool = BatchScrapeTool()
+    tool.run(website_urls=["https://cheatsheetseries.owasp.org/...", "https://owasp.org/..."])
+"""
+
+import asyncio
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Type
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+from crewai.tools import BaseTool
+from crewai_tools import ScrapeWebsiteTool
+from pydantic import BaseModel, Field
+
+from crews.resilience import backoff_delay, is_transient, tool_retries
+
+# Same browser-like headers as ScrapeWebsiteTool, so sites answer both tools the same way
+HEADERS = ScrapeWebsiteTool.model_fields["headers"].default_factory()
+MAX_URLS = 8
+
+_extract_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="scrape-extract")
+
+# --- Fetching ---
+
+def extract_page(html):
+    """(title, visible text) of an HTML page, whitespace cleaned up like ScrapeWebsiteTool does."""
+    parsed = BeautifulSoup(html, "html.parser")
+    title = parsed.title.get_text(" ", strip=True) if parsed.title else ""
+    text = re.sub("[ \t]+", " ", parsed.get_text(" "))
+    return title, re.sub("\\s+\n\\s+", "\n", text).strip()
+
+
+def unique_urls(urls):
+    """Strips whitespace and fragments and drops duplicates, keeping the first occurrence's position."""
+    seen, unique = set(), []
+    for url in urls:
+        url = url.strip().split("#", 1)[0]
+        key = url.rstrip("/")
+        if url and key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+async def scrape_urls_async(urls, per_host=2, max_connections=10, timeout=15.0, transport=None, retries=0):
+    """Fetches `urls` concurrently; returns [{url, title, text, error, seconds}] in the order of `urls`.
+
+    A page whose fetch fails transiently is tried up to `retries` more times.
+    """
+    loop = asyncio.get_running_loop()
+    host_limits = {}
+
+    async def scrape(client, url):
+        started = time.perf_counter()
+        semaphore = host_limits.setdefault(urlsplit(url).hostname, asyncio.Semaphore(per_host))
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    async with semaphore:
+                        response = await client.get(url)
+                        response.raise_for_status()
+                    break
+                except httpx.HTTPError as e:
+                    if attempt == retries or not is_transient(e):
+                        raise
+                await asyncio.sleep(backoff_delay(attempt))
+            if "html" in response.headers.get("content-type", "html"):
+                title, text = await loop.run_in_executor(_extract_pool, extract_page, response.text)
+            else:
+                title, text = "", response.text.strip()
+            error = None
+        except (httpx.HTTPError, ValueError) as e:
+            # httpx appends a multi-line help link to status errors; the first line is enough
+            title, text, error = "", "", f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+        seconds = round(time.perf_counter() - started, 3)
+        return {"url": url, "title": title, "text": text, "error": error, "seconds": seconds}
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(headers=HEADERS, timeout=timeout, limits=limits, follow_redirects=True,
+                                 transport=transport) as client:
+        return await asyncio.gather(*(scrape(client, url) for url in urls))
+
+
+def scrape_urls(urls, **options):
+    """Blocking scrape_urls_async, also callable from a thread that already runs an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scrape_urls_async(urls, **options))
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, scrape_urls_async(urls, **options)).result()
+
+
+def format_digest(pages, max_chars_per_page=4000, max_total_chars=16000):
+    """One text with a section per page; page texts are cut at a word boundary to fit both caps."""
+    remaining = max_total_chars
+    sections = []
+    for page in pages:
+        if page["error"]:
+            sections.append(f"## {page['url']}\nCould not read this page ({page['error']}).")
+            continue
+        limit = min(max_chars_per_page, remaining)
+        text = page["text"]
+        if len(text) > limit:
+            text = text[:limit].rsplit(" ", 1)[0] + " ..." if limit > 0 else "(left out: digest size limit reached)"
+        remaining -= min(len(page["text"]), limit)
+        sections.append(f"## {page['url']}\n{text}")
+    return "\n\n".join(sections)
+
+# --- CrewAI Tool ---
+
+class BatchScrapeToolSchema(BaseModel):
+    """Input for BatchScrapeTool."""
+
+    website_urls: List[str] = Field(
+        ..., description="All website URLs to read, passed together in one call (list of strings)"
+    )
+
+
+class BatchScrapeTool(BaseTool):
+    name: str = "Read several websites"
+    description: str = (
+        "Reads several web pages at once and returns one digest with a section per page. "
+        "Pass all URLs you want to read in a single call instead of reading them one by one."
+    )
+    args_schema: Type[BaseModel] = BatchScrapeToolSchema
+    max_urls: int = MAX_URLS
+    per_host: int = 2
+    timeout: float = 15.0
+    max_chars_per_page: int = 4000
+    max_total_chars: int = 16000
+
+    def _prepare(self, website_urls):
+        if isinstance(website_urls, str):
+            website_urls = re.split(r"[\s,]+", website_urls)
+        urls = unique_urls(website_urls)
+        if not urls:
+            raise ValueError("website_urls must contain at least one URL")
+        return urls[:self.max_urls], urls[self.max_urls:]
+
+    def _digest(self, pages, dropped):
+        digest = format_digest(pages, self.max_chars_per_page, self.max_total_chars)
+        if dropped:
+            digest += f"\n\nNot read (at most {self.max_urls} URLs per call): " + ", ".join(dropped)
+        return digest
+
+    def _run(self, website_urls: List[str]) -> str:
+        urls, dropped = self._prepare(website_urls)
+        pages = scrape_urls(urls, per_host=self.per_host, timeout=self.timeout, retries=tool_retries())
+        return self._digest(pages, dropped)
+
+    async def _arun(self, website_urls: List[str]) -> str:
+        urls, dropped = self._prepare(website_urls)
+        pages = await scrape_urls_async(urls, per_host=self.per_host, timeout=self.timeout, retries=tool_retries())
+        return self._digest(pages, dropped)
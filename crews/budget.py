@@ -0,0 +1,196 @@
+# crews/budget.py
+
+"""
+Crew Run Budgets
+----------------
+Static `max_iter` caps are a poor proxy for cost: the research agents are cut
+off after two steps even when a run is cheap, while the review agents may loop
+through many tool calls. A BudgetController gives one run a total token and/or
+wall-clock budget instead and splits it across the crew's tasks:
+
+- each task gets a slice when it starts: what is left of the budget, split by
+  the task weights of the tasks still to come (so unspent or skipped slices
+  roll over to later tasks)
+- consumption is tracked live from the same LLM call hooks as
+  crews/accounting.py
+- once a task's slice is spent, the agent is told to give its final answer
+  now, and its executor's `max_iter` is lowered so CrewAI's own max-iteration
+  handling ends the loop on the next step
+
+While a budget is active, agents' `max_iter` is raised to `BUDGETED_MAX_ITER`,
+so the budget (not the static cap) decides when to stop; the iteration count
+of CrewAI's reused agent executors is reset after every task. Budgets are set per
+job, e.g. `crews research "query" --budget-tokens 40000 --budget-seconds 300`
+or `{"payload": {..., "budget": {"tokens": 40000, "seconds": 300}}}` via the API.
+"""
+
+import threading
+import time
+
+from crews.accounting import UsageRecorder, DIRECT_CALL
+
+BUDGETED_MAX_ITER = 15
+FINALIZE_MESSAGE = (
+    "Budget notice: the token/time budget for this task is used up. Do not call any more tools. "
+    "Reply now with your Final Answer, based on what you have gathered so far, in the expected output format."
+)
+
+
+class BudgetController(UsageRecorder):
+    """Allocates a run's token/time budget across tasks and forces agents to finalize when their slice is spent."""
+
+    def __init__(self, tasks, tokens=None, seconds=None, weights=None, max_iter=BUDGETED_MAX_ITER):
+        super().__init__()
+        if not tokens and not seconds:
+            raise ValueError("A budget needs tokens and/or seconds")
+        self.tasks = list(tasks)
+        self.task_names = [task.name for task in tasks]
+        self.agents = {task.agent for task in tasks if task.agent is not None}
+        self.tokens = tokens
+        self.seconds = seconds
+        self.weights = {name: float((weights or {}).get(name, 1.0)) for name in self.task_names}
+        self.max_iter = max_iter
+        self.slices = {}
+        self.used = {}
+        self.finalized = set()
+        self._state_lock = threading.Lock()
+        self._current = None
+        self._started = None
+        self._saved_max_iter = {}
+        self._saved_executors = {}
+        self._saved_callbacks = []
+
+    # --- Allocation ---
+
+    def _remaining(self):
+        spent_tokens = sum(used["tokens"] for used in self.used.values())
+        tokens = self.tokens - spent_tokens if self.tokens else None
+        seconds = self.seconds - (time.monotonic() - self._started) if self.seconds else None
+        return tokens, seconds
+
+    def _start_task(self, name):
+        """Gives `name` its slice of what is left, weighted against the tasks that have not started yet."""
+        upcoming = [task for task in self.task_names[self.task_names.index(name):] if task not in self.slices]
+        share = self.weights[name] / (sum(self.weights[task] for task in upcoming) or 1.0)
+        tokens, seconds = self._remaining()
+        self.slices[name] = {
+            "tokens": max(0, int(tokens * share)) if tokens is not None else None,
+            "seconds": max(0.0, seconds * share) if seconds is not None else None,
+            "started": time.monotonic(),
+        }
+        self.used.setdefault(name, {"tokens": 0, "calls": 0})
+        self._current = name
+
+    def exhausted(self, name):
+        slice_ = self.slices.get(name)
+        if slice_ is None:
+            return False
+        over_tokens = slice_["tokens"] is not None and self.used[name]["tokens"] >= slice_["tokens"]
+        over_time = slice_["seconds"] is not None and time.monotonic() - slice_["started"] >= slice_["seconds"]
+        return over_tokens or over_time
+
+    # --- Hooks ---
+
+    def _before_llm(self, context):
+        # Closes the previous call first, so its tokens count towards the slice
+        result = super()._before_llm(context)
+        name = getattr(context.task, "name", None)
+        if name in self.weights:
+            with self._state_lock:
+                if name not in self.slices:
+                    self._start_task(name)
+                force = self.exhausted(name) and context.executor is not None
+                if force:
+                    self.finalized.add(name)
+            if force:
+                context.messages.append({"role": "user", "content": FINALIZE_MESSAGE})
+                # CrewAI forces a final answer once iterations reach max_iter
+                context.executor.max_iter = min(context.executor.max_iter, context.executor.iterations + 1)
+        return result
+
+    def _append(self, row, event_key=None):
+        super()._append(row, event_key=event_key)
+        if row["kind"] != "llm":
+            return
+        with self._state_lock:
+            name = row["task"] if row["task"] in self.weights else DIRECT_CALL
+            used = self.used.setdefault(name, {"tokens": 0, "calls": 0})
+            used["tokens"] += row["prompt_tokens"] + row["completion_tokens"]
+            used["calls"] += 1
+
+    def _reset_executor(self, agent):
+        # CrewAI reuses an agent's executor across tasks and jobs without refreshing max_iter or resetting
+        # the iteration counter, so a second task would start out (or be forced) at the limit
+        executor = getattr(agent, "agent_executor", None)
+        if executor is not None:
+            self._saved_executors.setdefault(executor, executor.max_iter)
+            executor.max_iter, executor.iterations = agent.max_iter, 0
+
+    def _task_done(self, task, callback, output):
+        if task.agent is not None:
+            self._reset_executor(task.agent)
+        if callback:
+            callback(output)
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        for agent in self.agents:
+            self._saved_max_iter[agent] = agent.max_iter
+            agent.max_iter = max(agent.max_iter, self.max_iter)
+            self._reset_executor(agent)
+        for task in self.tasks:
+            self._saved_callbacks.append((task, task.callback))
+            task.callback = lambda output, task=task, callback=task.callback: self._task_done(task, callback, output)
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        for task, callback in self._saved_callbacks:
+            task.callback = callback
+        for agent, max_iter in self._saved_max_iter.items():
+            agent.max_iter = max_iter
+        for executor, max_iter in self._saved_executors.items():
+            executor.max_iter = max_iter
+        return super().__exit__(*exc_info)
+
+    # --- Reporting ---
+
+    def report(self):
+        """Plain-data budget report: the budget, and per task its slice, what it used and whether it was cut short."""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        tasks = []
+        for name in self.task_names + [DIRECT_CALL]:
+            if name not in self.used:
+                continue
+            slice_ = self.slices.get(name, {})
+            tasks.append({
+                "task": name,
+                "slice_tokens": slice_.get("tokens"),
+                "slice_seconds": round(slice_["seconds"], 1) if slice_.get("seconds") is not None else None,
+                "used_tokens": self.used[name]["tokens"],
+                "llm_calls": self.used[name]["calls"],
+                "forced_final": name in self.finalized,
+            })
+        return {
+            "tokens": self.tokens,
+            "seconds": self.seconds,
+            "used_tokens": sum(used["tokens"] for used in self.used.values()),
+            "elapsed_seconds": round(elapsed, 1),
+            "tasks": tasks,
+        }
+
+
+def format_budget(report):
+    limits = " / ".join(part for part in (
+        f"{report['tokens']:,} tokens" if report["tokens"] else "",
+        f"{report['seconds']:g}s" if report["seconds"] else "",
+    ) if part)
+    lines = [f"Budget {limits}: used {report['used_tokens']:,} tokens in {report['elapsed_seconds']}s", ""]
+    for task in report["tasks"]:
+        slice_ = ", ".join(part for part in (
+            f"{task['slice_tokens']:,} tokens" if task["slice_tokens"] is not None else "",
+            f"{task['slice_seconds']}s" if task["slice_seconds"] is not None else "",
+        ) if part) or "-"
+        forced = " (forced to finalize)" if task["forced_final"] else ""
+        lines.append(f"- {task['task']}: {task['used_tokens']:,} tokens in {task['llm_calls']} calls, "
+                     f"slice {slice_}{forced}")
+    return "\n".join(lines)
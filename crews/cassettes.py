@@ -0,0 +1,231 @@
+# crews/cassettes.py
+
+"""
+Record/Replay Cassettes for HTTP Traffic
+----------------------------------------
+Every external call the crews make (LLM completions through the OpenAI SDK or
+LiteLLM, Serper searches, EXA searches, website scrapes) goes through either
+`requests` or `httpx`. A Cassette patches both transports, the same way
+crews/patch.py does, and either records each request/response pair to a JSON
+file or replays it from there without touching the network:
+
+    with Cassette("review_e2e", mode="replay"):
+        crews.review.crew.run_job(code_changes)
+
+Requests are matched on method, path, query and a hash of the (canonicalized
+JSON) body. The host is left out on purpose, so fixtures recorded against the
+local stub server (DLAI_SERPER_BASE_URL, EXA_BASE_URL, OPENAI_API_BASE)
+replay against any base URL. Credentials are never written to disk.
+
+Modes: "replay" (default; a missing cassette or a request without a recording
+raises CassetteMiss), "record" (always hits the network and rewrites the
+cassette) and "once" (replays recorded requests and records missing ones).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CASSETTE_DIR = Path(__file__).resolve().parent / "cassettes"
+CASSETTE_MODES = ("replay", "record", "once")
+SENSITIVE_HEADERS = {"authorization", "x-api-key", "api-key", "cookie", "set-cookie", "openai-organization"}
+# Response headers that describe the original transfer, not the stored body
+DROPPED_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that has no recording."""
+
+# --- Request Matching ---
+
+def _canonical_body(body):
+    if not body:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except (ValueError, UnicodeDecodeError):
+        return body
+
+
+def request_key(method, url, body):
+    """Host-independent key of a request: 'METHOD /path?query sha256(body)[:16]'."""
+    parts = urlsplit(str(url))
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")  # "https://host" requests "/"
+    return f"{method.upper()} {target} {hashlib.sha256(_canonical_body(body)).hexdigest()[:16]}"
+
+
+def _endpoint(key):
+    return key.rsplit(" ", 1)[0]
+
+
+def _encode_body(content):
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode()}
+
+
+def _decode_body(body):
+    return body["text"].encode("utf-8") if "text" in body else base64.b64decode(body["base64"])
+
+
+def _safe_headers(headers, dropped=()):
+    return {name: value for name, value in headers.items()
+            if name.lower() not in SENSITIVE_HEADERS and name.lower() not in dropped}
+
+# --- Cassette ---
+
+class Cassette:
+    """Context manager that records or replays all requests/httpx traffic of the enclosed code."""
+
+    _active = None
+    _install_lock = threading.Lock()
+
+    def __init__(self, name, mode=None, cassette_dir=None):
+        self.mode = mode or os.getenv("CREWS_CASSETTE_MODE", "replay")
+        if self.mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{self.mode}'; choose from {CASSETTE_MODES}")
+        self.path = Path(cassette_dir or os.getenv("CREWS_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)) / f"{name}.json"
+        self._lock = threading.Lock()
+        self._recorded = []
+        self._by_key = defaultdict(deque)
+        self._by_endpoint = defaultdict(deque)
+        self.stats = {"replayed": 0, "approximate": 0, "recorded": 0}
+        self._originals = {}
+
+    # --- Storage ---
+
+    def load(self):
+        if self.mode == "replay" and not self.path.exists():
+            raise CassetteMiss(f"No cassette {self.path}; record it with `crews selftest --record`")
+        interactions = json.loads(self.path.read_text()) if self.path.exists() else []
+        for interaction in interactions:
+            self._by_key[interaction["key"]].append(interaction)
+            self._by_endpoint[_endpoint(interaction["key"])].append(interaction)
+        if self.mode == "once":
+            self._recorded = list(interactions)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._recorded, indent=1, ensure_ascii=False))
+
+    # --- Lookup/Record ---
+
+    def lookup(self, key):
+        """Returns the recorded response for `key`, or None when it has to go to the network."""
+        if self.mode == "record":
+            return None
+        with self._lock:
+            exact = self._by_key.get(key)
+            if exact:
+                interaction = exact.popleft()
+                self._by_endpoint[_endpoint(key)].remove(interaction)
+                self.stats["replayed"] += 1
+                return interaction["response"]
+            # Same endpoint, different body (e.g. an edited prompt): replay in recorded order
+            fallback = self._by_endpoint.get(_endpoint(key))
+            if fallback and self.mode == "replay":
+                interaction = fallback.popleft()
+                self._by_key[interaction["key"]].remove(interaction)
+                self.stats["approximate"] += 1
+                return interaction["response"]
+        if self.mode == "replay":
+            raise CassetteMiss(f"No recording for {key} in {self.path}; re-record with CREWS_CASSETTE_MODE=record")
+        return None
+
+    def record(self, key, method, url, request_headers, status, headers, content):
+        with self._lock:
+            self._recorded.append({
+                "key": key,
+                "request": {"method": method, "url": str(url), "headers": _safe_headers(request_headers)},
+                "response": {"status": status, "headers": _safe_headers(headers, DROPPED_RESPONSE_HEADERS),
+                             "body": _encode_body(content)},
+            })
+            self.stats["recorded"] += 1
+
+    # --- Transport Patches ---
+
+    def _patched_requests_send(self, session, request, **kwargs):
+        key = request_key(request.method, request.url, request.body)
+        stored = self.lookup(key)
+        if stored is None:
+            response = self._originals["requests"](session, request, **kwargs)
+            self.record(key, request.method, request.url, request.headers,
+                        response.status_code, response.headers, response.content)
+            return response
+        response = requests.Response()
+        response.status_code = stored["status"]
+        response.headers = CaseInsensitiveDict(stored["headers"])
+        response._content = _decode_body(stored["body"])
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        return response
+
+    def _replayed_httpx_response(self, request, stored):
+        return httpx.Response(stored["status"], headers=stored["headers"], content=_decode_body(stored["body"]),
+                              request=request)
+
+    def _patched_httpx_send(self, client, request, **kwargs):
+        key = request_key(request.method, request.url, request.content)
+        stored = self.lookup(key)
+        if stored is None:
+            response = self._originals["httpx"](client, request, **kwargs)
+            content = response.read()
+            self.record(key, request.method, request.url, request.headers,
+                        response.status_code, response.headers, content)
+            return response
+        return self._replayed_httpx_response(request, stored)
+
+    async def _patched_httpx_async_send(self, client, request, **kwargs):
+        key = request_key(request.method, request.url, request.content)
+        stored = self.lookup(key)
+        if stored is None:
+            response = await self._originals["httpx_async"](client, request, **kwargs)
+            content = await response.aread()
+            self.record(key, request.method, request.url, request.headers,
+                        response.status_code, response.headers, content)
+            return response
+        return self._replayed_httpx_response(request, stored)
+
+    def __enter__(self):
+        with Cassette._install_lock:
+            if Cassette._active is not None:
+                raise RuntimeError("Another cassette is already active")
+            self.load()
+            Cassette._active = self
+            self._originals = {
+                "requests": requests.Session.send,
+                "httpx": httpx.Client.send,
+                "httpx_async": httpx.AsyncClient.send,
+            }
+            cassette = self
+            requests.Session.send = lambda session, request, **kw: cassette._patched_requests_send(session, request, **kw)
+            httpx.Client.send = lambda client, request, **kw: cassette._patched_httpx_send(client, request, **kw)
+
+            async def async_send(client, request, **kw):
+                return await cassette._patched_httpx_async_send(client, request, **kw)
+            httpx.AsyncClient.send = async_send
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        with Cassette._install_lock:
+            requests.Session.send = self._originals["requests"]
+            httpx.Client.send = self._originals["httpx"]
+            httpx.AsyncClient.send = self._originals["httpx_async"]
+            Cassette._active = None
+        # A failed recording run would leave a partial cassette behind; keep the previous one
+        if self.mode != "replay" and exc_type is None:
+            self.save()
+        return False
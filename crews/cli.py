@@ -0,0 +1,283 @@
+# crews/cli.py
+
+"""
+Crews Command Line
+------------------
+One entry point for all crews that works from any directory (cron, CI):
+
+    crews review changes.diff [more.diff ...]      ('-' reads the diff from stdin)
+        [--max-file-kb N] [--exclude GLOB] [--include GLOB]   (lock/generated/vendored/binary files are skipped;
+                                                              several diffs run riskiest first)
+        [--speculative [review|prescan]]                       (Tech Lead drafts while the reviews run)
+    crews research "query" ["another query" ...] [--parallel-verify] [--map-reduce]
+    crews content [--niche NICHE ...] [--week WEEK] [--parallel]
+
+    crews calendar | pool | serve | owasp-index | selftest | usage | memory | zygote ...
+        (batch planner, process pool, HTTP daemon, OWASP index, offline self-test, usage reports, crew memory,
+         warm-start benchmark)
+
+Agent/task definitions are read from the installed package and each crew is
+built once per process. With several inputs and `--jobs N`, the inputs run on
+N warm worker processes (crews/pool.py) instead of one after the other.
+`--budget-tokens/--budget-seconds` cap each job and split the budget across
+its tasks (crews/budget.py). `--memory` gives the crews long-term memory in a
+local vector store (crews/memory.py). Model and search calls are retried with
+backoff, timed out, hedged and circuit-broken per provider (crews/resilience.py;
+`--hedge-llm`, `--no-resilience`). `--profile` adds crew build time, wall time and
+tokens per job, the per-agent model table and the hottest functions from cProfile.
+"""
+
+import argparse
+import atexit
+import cProfile
+import importlib
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from crews.pool import CrewPool, CREW_KINDS, load_crew_module, run_crew_job
+from crews.review.diff_ingest import DiffRules
+from crews.review.risk_score import risk_prescore
+
+# Subcommands that keep their own argument parsers
+TOOL_COMMANDS = {
+    "calendar": ("crews.content.content_calendar", "Plan Shorts calendars for many niches and weeks"),
+    "pool": ("crews.pool", "Run a JSON Lines file of crew jobs on a process pool"),
+    "serve": ("crews.daemon", "Serve the crews over a local HTTP/JSON API"),
+    "owasp-index": ("crews.review.owasp_index", "Build or query the offline OWASP knowledge index"),
+    "selftest": ("crews.selftest", "Run the offline self-test suite on recorded fixtures"),
+    "usage": ("crews.accounting", "Report token usage and cost per day, crew, model, agent or task"),
+    "memory": ("crews.memory", "Inspect or clear the crews' long-term memory"),
+    "zygote": ("crews.zygote", "Benchmark cold vs warm-start (forked) crew job start"),
+    "stub-server": ("crews.stub_server", "Serve canned LLM/search/page answers for recording cassettes"),
+}
+PROFILE_TOP_FUNCTIONS = 15
+
+# --- Arguments ---
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--jobs", type=int, default=1, metavar="N", help="Run up to N inputs in parallel worker processes")
+    common.add_argument("--profile", action="store_true", help="Print timings, token usage and a cProfile summary")
+    common.add_argument("--json", action="store_true", help="Print one JSON result per line instead of reports")
+    common.add_argument("--budget-tokens", type=int, metavar="N", help="Token budget per job, split across its tasks")
+    common.add_argument("--budget-seconds", type=float, metavar="S", help="Wall-clock budget per job, split across its tasks")
+    common.add_argument("--budget-weight", action="append", default=[], metavar="TASK=W",
+                        help="Relative share of a task (by name) in the budget; default 1 per task (repeatable)")
+    common.add_argument("--memory", action="store_true",
+                        help="Recall and save task results in the crew's long-term memory ($CREWS_HOME/memory.db)")
+    common.add_argument("--memory-namespace", metavar="NAME",
+                        help="Separate memory within the crew's, e.g. one per repository (implies --memory)")
+    common.add_argument("--hedge-llm", action="store_true",
+                        help="Send a second model request when one is slower than the endpoint's p95 (costs tokens)")
+    common.add_argument("--no-resilience", action="store_true",
+                        help="Do not retry, time out or circuit-break model and search calls")
+
+    parser = argparse.ArgumentParser(prog="crews", description="Run the code review, deep research and content crews.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    review = commands.add_parser("review", parents=[common], help="Review pull request diffs")
+    review.add_argument("diffs", nargs="+", help="Diff files to review ('-' reads stdin)")
+    review.add_argument("--prompt-mode", choices=["inline", "shared"], help="Overrides REVIEW_PROMPT_MODE")
+    review.add_argument("--speculative", nargs="?", const="review", choices=["review", "prescan"],
+                        help="Draft the Tech Lead's decision while the reviews run, from the first finished review "
+                             "(default) or the static pre-scan, then confirm or revise it")
+    review.add_argument("--max-file-kb", type=float, help="Per-file diff cap; larger files are truncated (default 64)")
+    review.add_argument("--max-total-kb", type=float, help="Cap on the whole filtered diff (default 256)")
+    review.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="Also skip these files (repeatable)")
+    review.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Always review these files, even if lock/generated/vendored (repeatable)")
+
+    research = commands.add_parser("research", parents=[common], help="Research one or more queries")
+    research.add_argument("queries", nargs="*", help="Research queries (default query if none)")
+    research.add_argument("--run-id", help="Checkpoint run ID; required with --resume/--replay-from")
+    research.add_argument("--resume", action="store_true", help="Continue a failed run from its first unfinished task")
+    research.add_argument("--replay-from", metavar="TASK", help="Re-run from a task number (1-4) or name, e.g. write_final_report")
+    research.add_argument("--parallel-verify", action="store_true",
+                          help="Verify the gathered data claim by claim in parallel batches instead of in one agent step")
+    research.add_argument("--map-reduce", action="store_true",
+                          help="Compose the report from parallel section summaries within a fixed context budget")
+    research.add_argument("--workers", "--verify-workers", type=int, default=4,
+                          help="Concurrent claim batches / section summaries in --parallel-verify and --map-reduce mode")
+
+    content = commands.add_parser("content", parents=[common], help="Plan a week of YouTube Shorts")
+    content.add_argument("--niche", action="append", default=[], help="Niche to plan (repeatable)")
+    content.add_argument("--week", help="Week label, e.g. 'the week of 2026-01-05'")
+    content.add_argument("--parallel", action="store_true", help="Generate each video blueprint as a parallel sub-task")
+    content.add_argument("--workers", type=int, default=5, help="Concurrent blueprint generations in --parallel mode")
+
+    for name, (_, help_text) in TOOL_COMMANDS.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def diff_path(path):
+    """Diffs are streamed by the crew from a file; stdin is spooled to a temporary file first."""
+    if path != "-":
+        return str(Path(path).resolve())
+    with tempfile.NamedTemporaryFile("wb", prefix="crews-stdin-", suffix=".diff", delete=False) as spool:
+        shutil.copyfileobj(sys.stdin.buffer, spool)
+    atexit.register(os.unlink, spool.name)
+    return spool.name
+
+
+def review_risk(payload):
+    return risk_prescore(Path(payload["diff_path"]), DiffRules(**payload["diff_rules"]))["score"]
+
+
+def diff_rules(args):
+    rules = {"exclude": args.exclude, "include": args.include}
+    if args.max_file_kb:
+        rules["max_file_bytes"] = int(args.max_file_kb * 1024)
+    if args.max_total_kb:
+        rules["max_total_bytes"] = int(args.max_total_kb * 1024)
+    return rules
+
+
+def job_budget(parser, args):
+    """The per-job `budget` payload entry (see crews/budget.py), or None without --budget-* flags."""
+    if not args.budget_tokens and not args.budget_seconds:
+        if args.budget_weight:
+            parser.error("--budget-weight needs --budget-tokens or --budget-seconds")
+        return None
+    weights = {}
+    for spec in args.budget_weight:
+        task, _, weight = spec.rpartition("=")
+        try:
+            weights[task] = float(weight)
+        except ValueError:
+            parser.error(f"--budget-weight expects TASK=WEIGHT, got '{spec}'")
+    return {"tokens": args.budget_tokens, "seconds": args.budget_seconds, "weights": weights}
+
+
+def build_payloads(parser, args):
+    """Turns the parsed arguments into one run_job payload per input."""
+    budget = job_budget(parser, args)
+    payloads = [payload | {"budget": budget} if budget else payload for payload in _crew_payloads(parser, args)]
+    if args.memory or args.memory_namespace:
+        memory = {"namespace": args.memory_namespace} if args.memory_namespace else {}
+        payloads = [payload | {"memory": memory} for payload in payloads]
+    if args.no_resilience or args.hedge_llm:
+        resilience = False if args.no_resilience else {"llm": {"hedge": True}}
+        payloads = [payload | {"resilience": resilience} for payload in payloads]
+    if args.command == "review" and len(payloads) > 1:
+        # Riskiest diffs first, so they are not stuck behind doc-only changes when jobs < diffs
+        return sorted(payloads, key=lambda payload: -review_risk(payload))
+    return payloads
+
+
+def _crew_payloads(parser, args):
+    if args.command == "review":
+        return [{"diff_path": diff_path(path), "prompt_mode": args.prompt_mode, "diff_rules": diff_rules(args),
+                 "speculative": args.speculative} for path in args.diffs]
+    if args.command == "research":
+        if (args.resume or args.replay_from) and (not args.run_id or len(args.queries) > 1):
+            parser.error("--resume and --replay-from need --run-id and at most one query")
+        if args.run_id and len(args.queries) > 1:
+            parser.error("--run-id can only be used with a single query")
+        return [
+            {"user_query": query, "run_id": args.run_id, "resume": args.resume, "replay_from": args.replay_from,
+             "parallel_verify": args.parallel_verify, "map_reduce": args.map_reduce, "max_workers": args.workers}
+            for query in (args.queries or [None])
+        ]
+    niches = args.niche or [None]
+    return [
+        {key: value for key, value in {"niche": niche, "week": args.week}.items() if value}
+        | {"parallel": args.parallel, "max_workers": args.workers}
+        for niche in niches
+    ]
+
+# --- Execution ---
+
+def run_in_process(kind, payloads, profile):
+    """Builds the crew once in this process and runs the payloads one after the other."""
+    from crews.model_router import ModelUsageReport
+
+    started = time.perf_counter()
+    module = load_crew_module(kind)
+    profile["crew_load_s"] = time.perf_counter() - started
+    usage_report = ModelUsageReport()
+    for payload in payloads:
+        yield run_crew_job(module, kind, payload)
+    profile["usage_table"] = usage_report.format(getattr(module, CREW_KINDS[kind][1]))
+
+
+def run_on_pool(kind, payloads, jobs):
+    with CrewPool({kind: min(jobs, len(payloads))}) as pool:
+        yield from pool.run_jobs((kind, payload) for payload in payloads)
+
+
+def print_result(result, as_json):
+    if as_json:
+        print(json.dumps(result, ensure_ascii=False, default=str), flush=True)
+    elif result["status"] == "done":
+        print(result["text"], flush=True)
+    else:
+        print(f"❌ {result['kind']} job {result['job_id']} failed: {result['error']}", file=sys.stderr, flush=True)
+
+
+def print_profile(results, profile, profiler):
+    from crews.accounting import format_summary
+
+    print("\n--- Profile ---\n")
+    if "crew_load_s" in profile:
+        print(f"Crew build (imports, definitions, agents, tools): {profile['crew_load_s']:.2f}s")
+    for result in results:
+        usage = result.get("token_usage", {})
+        print(f"Job {result['job_id']} ({result['status']}): {result.get('seconds', 0):.1f}s, "
+              f"{usage.get('prompt_tokens', 0)} prompt / {usage.get('completion_tokens', 0)} completion tokens "
+              f"in {usage.get('successful_requests', 0)} requests (pid {result.get('worker_pid', '-')})")
+    print(f"Total wall time: {profile['total_s']:.1f}s")
+    if profile.get("usage_table"):
+        print("\n" + profile["usage_table"])
+    for result in results:
+        if result.get("accounting"):
+            print(f"\nJob {result['job_id']} usage by agent, task and tool:\n")
+            print(format_summary(result["accounting"]))
+    if profiler:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        print("\n" + stream.getvalue())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOL_COMMANDS:
+        return importlib.import_module(TOOL_COMMANDS[argv[0]][0]).main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    kind = args.command
+    payloads = build_payloads(parser, args)
+
+    profile = {}
+    # Worker processes are not profiled; cProfile only covers in-process runs
+    profiler = cProfile.Profile() if args.profile and args.jobs <= 1 else None
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    if args.jobs > 1 and len(payloads) > 1:
+        runs = run_on_pool(kind, payloads, args.jobs)
+    else:
+        runs = run_in_process(kind, payloads, profile)
+    results = []
+    for result in runs:
+        results.append(result)
+        print_result(result, args.json)
+    if profiler:
+        profiler.disable()
+    profile["total_s"] = time.perf_counter() - started
+
+    if args.profile:
+        print_profile(results, profile, profiler)
+    return 1 if any(result["status"] != "done" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
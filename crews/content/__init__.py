@@ -0,0 +1 @@
+"""YouTube Shorts content crew: weekly plans, parallel blueprints, batch calendars and title history."""
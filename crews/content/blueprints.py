@@ -0,0 +1,120 @@
+# crews/content/blueprints.py
+
+"""
+Parallel Video Blueprint Generation
+-----------------------------------
+Instead of asking one completion for all 5 blueprints, the planner first asks
+for 5 topic seeds and then generates each blueprint as its own small crew run,
+in parallel. Every blueprint is validated on its own, and only the items that
+fail validation are regenerated before the `{"videos": [...]}` plan is
+assembled. With a HistoryIndex, blueprints repeating an earlier title or hook
+also count as failed, and the seed prompt lists past titles to avoid.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from crewai import Crew, Task
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from crews.utils import parse_json_output
+
+# --- Blueprint Schema ---
+
+class VideoBlueprint(BaseModel):
+    """One video of the weekly plan, as described in create_shorts_plan.md."""
+
+    title: str = Field(min_length=1)
+    hook_main: str = Field(min_length=1)
+    hook_alt: str = Field(min_length=1)
+    visuals: List[str] = Field(min_length=1)
+    tags: List[str] = Field(min_length=1)
+    cta: str = Field(min_length=1)
+
+    @field_validator("hook_main")
+    @classmethod
+    def hook_fits_one_second(cls, value):
+        if len(value.split()) > 12:
+            raise ValueError("hook_main must be at most 12 words")
+        return value
+
+# --- Planner ---
+
+class ParallelBlueprintPlanner:
+    """Seeds topics once, then fans out one blueprint crew per topic and retries only failed items."""
+
+    def __init__(self, agent, seed_task_cfg, blueprint_task_cfg, video_count=5, max_workers=5, max_retries=2,
+                 history=None, niche="Micro-History of Everyday Things", week="the coming week"):
+        self.video_count = video_count
+        self.history = history
+        self.niche = niche
+        self.week = week
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.failed_topics = []
+        self.token_usage = UsageMetrics()
+        self._usage_lock = threading.Lock()
+        self.seed_crew = Crew(
+            agents=[agent],
+            tasks=[Task(description=seed_task_cfg["description"], expected_output=seed_task_cfg["expected_output"], agent=agent)],
+        )
+        self.blueprint_crew = Crew(
+            agents=[agent],
+            tasks=[Task(description=blueprint_task_cfg["description"], expected_output=blueprint_task_cfg["expected_output"], agent=agent)],
+        )
+
+    def _kickoff(self, crew, inputs):
+        result = crew.kickoff(inputs=inputs)
+        with self._usage_lock:
+            self.token_usage.add_usage_metrics(result.token_usage)
+        return result
+
+    def generate_seeds(self):
+        """Asks for the topic seeds, retrying when the answer is not a usable topic list."""
+        for _ in range(self.max_retries + 1):
+            previous_titles = self.history.negative_examples(self.niche) if self.history else "None yet."
+            result = self._kickoff(self.seed_crew, {"video_count": self.video_count, "niche": self.niche,
+                                                    "week": self.week, "previous_titles": previous_titles})
+            parsed = parse_json_output(result.raw) or {}
+            topics = [str(topic).strip() for topic in parsed.get("topics", []) if str(topic).strip()]
+            if len(topics) >= self.video_count:
+                return topics[:self.video_count]
+        raise ValueError(f"Could not get {self.video_count} topic seeds from the model")
+
+    def generate_blueprint(self, topic):
+        """Runs one blueprint crew; returns the validated blueprint dict or None if it is invalid."""
+        result = self._kickoff(self.blueprint_crew.copy(), {"topic": topic, "niche": self.niche, "week": self.week})
+        parsed = parse_json_output(result.raw)
+        if parsed is None:
+            return None
+        try:
+            blueprint = VideoBlueprint.model_validate(parsed).model_dump()
+        except ValidationError:
+            return None
+        if self.history and self.history.find_duplicate(blueprint):
+            return None
+        return blueprint
+
+    def run(self):
+        """Builds the full `{"videos": [...]}` plan, in seed order."""
+        topics = self.generate_seeds()
+        blueprints = [None] * len(topics)
+        pending = list(range(len(topics)))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for _ in range(self.max_retries + 1):
+                if not pending:
+                    break
+                results = pool.map(self.generate_blueprint, [topics[i] for i in pending])
+                for index, blueprint in zip(pending, results):
+                    blueprints[index] = blueprint
+                pending = [i for i in pending if blueprints[i] is None]
+
+        self.failed_topics = [topics[i] for i in pending]
+        videos = [blueprint for blueprint in blueprints if blueprint is not None]
+        if self.history:
+            videos, rejected = self.history.filter_new(videos, self.niche)
+            self.failed_topics += [item["title"] for item in rejected]
+        return {"videos": videos}
@@ -0,0 +1,185 @@
+# crews/content/content_calendar.py
+
+"""
+Batch Content Calendar Planner
+------------------------------
+Plans a calendar of YouTube Shorts for a matrix of niches x weeks by running
+the `create_shorts_plan.md` task once per cell, concurrently. Completed plans
+are cached in a shared SQLite store keyed by the rendered prompt and model, so
+re-running or extending a calendar only pays for new cells and for cells whose
+cached videos were already accepted into the history. Titles and hooks
+are checked against the persistent HistoryIndex (everything accepted in this
+and earlier runs), near-duplicates are dropped, and each cell is streamed to a
+JSON Lines file as soon as it is done. A cell whose crew run fails is written
+with `"status": "failed"` and its error, and the other cells carry on.
+
+Usage:
+    crews calendar --niche "Micro-History of Everyday Things" \
+        --niche "Forgotten Inventions" --weeks 13 --start 2026-01-05 --out calendar.jsonl
+    crews calendar --niches-file niches.txt --weeks 13 --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from pydantic import ValidationError
+
+from crews.utils import parse_json_output, state_path
+from crews.content.crew import content_crew
+from crews.content.blueprints import VideoBlueprint
+from crews.content.title_index import HistoryIndex, DEFAULT_HISTORY_PATH
+
+DEFAULT_CACHE_PATH = state_path("calendar_cache.db")
+
+# --- Shared LLM Result Cache ---
+
+class ResultCache:
+    """Thread-safe SQLite cache of raw crew answers, shared by all calendar jobs."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, raw TEXT, created REAL)")
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key_for(crew, inputs):
+        """Hashes what the model would actually see: rendered task prompts plus model ids."""
+        parts = []
+        for task in crew.tasks:
+            description = task.description
+            for name, value in inputs.items():
+                description = description.replace("{" + name + "}", str(value))
+            parts.append(description)
+            parts.append(task.expected_output)
+            parts.append(str(getattr(task.agent.llm, "model", task.agent.llm)))
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+    def get(self, key, usable=None):
+        """The cached answer for `key`, or None. An answer `usable` rejects counts as a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT raw FROM results WHERE key = ?", (key,)).fetchone()
+        raw = row[0] if row and (usable is None or usable(row[0])) else None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return raw
+
+    def put(self, key, raw):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, raw, time.time()))
+            self._conn.commit()
+
+# --- Calendar Planner ---
+
+def week_labels(start, count):
+    return [f"the week of {(start + timedelta(weeks=i)).isoformat()}" for i in range(count)]
+
+
+class ContentCalendarPlanner:
+    """Fans the shorts-plan task out over niches x weeks and streams deduplicated plans to JSONL."""
+
+    def __init__(self, crew, output_path, max_workers=4, cache=None, history=None):
+        self.crew = crew
+        self.output_path = output_path
+        self.max_workers = max_workers
+        self.cache = cache or ResultCache()
+        self.history = history or HistoryIndex()
+        self.stats = {"cells": 0, "failed": 0, "videos": 0, "duplicates": 0, "invalid": 0}
+
+    def plan_cell(self, niche, week):
+        """Returns the raw plan for one niche/week, from the cache when possible."""
+        inputs = {"niche": niche, "week": week}
+        # The negative examples change with every run, so they are left out of the cache key. Instead a
+        # cached answer is only replayed while none of its videos is in the history yet: once accepted
+        # (by this or an earlier run), replaying it would only yield duplicates, so the cell is planned anew.
+        key = ResultCache.key_for(self.crew, inputs)
+        raw = self.cache.get(key, usable=self.is_new)
+        if raw is None:
+            inputs["previous_titles"] = self.history.negative_examples(niche)
+            raw = self.crew.copy().kickoff(inputs=inputs).raw
+            if parse_json_output(raw) is not None:
+                self.cache.put(key, raw)
+        return raw
+
+    def is_new(self, raw):
+        """Whether no video of a raw plan repeats the history."""
+        videos = (parse_json_output(raw) or {}).get("videos", [])
+        return not any(isinstance(video, dict) and self.history.find_duplicate(video) for video in videos)
+
+    def accept_videos(self, niche, week, raw):
+        """Validates the cell's videos and drops titles/hooks that near-duplicate anything already planned."""
+        videos = []
+        for item in (parse_json_output(raw) or {}).get("videos", []):
+            try:
+                videos.append(VideoBlueprint.model_validate(item).model_dump())
+            except ValidationError:
+                self.stats["invalid"] += 1
+        return self.history.filter_new(videos, niche)
+
+    def run(self, niches, weeks):
+        cells = [(niche, week) for niche in niches for week in weeks]
+        with open(self.output_path, "a", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.plan_cell, niche, week): (niche, week) for niche, week in cells}
+            for future in as_completed(futures):
+                niche, week = futures[future]
+                try:
+                    videos, duplicates = self.accept_videos(niche, week, future.result())
+                except Exception as e:  # one cell must not lose the calendar; it is recorded as failed
+                    record = {"niche": niche, "week": week, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    self.stats["failed"] += 1
+                    print(f"❌ {niche} / {week}: {record['error']}")
+                    continue
+                record = {"niche": niche, "week": week, "status": "done", "videos": videos,
+                          "dropped_duplicates": duplicates}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                self.stats["cells"] += 1
+                self.stats["videos"] += len(videos)
+                self.stats["duplicates"] += len(duplicates)
+                print(f"✅ {niche} / {week}: {len(videos)} videos ({len(duplicates)} duplicates dropped)")
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews calendar", description="Plan YouTube Shorts calendars for many niches and weeks.")
+    parser.add_argument("--niche", action="append", default=[], help="Niche to plan (repeatable)")
+    parser.add_argument("--niches-file", help="Text file with one niche per line")
+    parser.add_argument("--weeks", type=int, default=13, help="Number of consecutive weeks (13 = one quarter)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="First week start (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent crew runs")
+    parser.add_argument("--out", default="calendar.jsonl", help="JSON Lines output file (appended to)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Shared LLM result cache")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Cross-run title/hook history index")
+    args = parser.parse_args(argv)
+
+    niches = list(args.niche)
+    if args.niches_file:
+        with open(args.niches_file, encoding="utf-8") as f:
+            niches += [line.strip() for line in f if line.strip()]
+    if not niches:
+        parser.error("give at least one --niche or a --niches-file")
+
+    start = time.perf_counter()
+    planner = ContentCalendarPlanner(content_crew, args.out, args.workers, ResultCache(args.cache), HistoryIndex(args.history))
+    stats = planner.run(niches, week_labels(args.start, args.weeks))
+    print(
+        f"\nPlanned {stats['cells']} niche-weeks ({stats['failed']} failed), {stats['videos']} videos in {time.perf_counter() - start:.1f}s "
+        f"({stats['duplicates']} duplicate titles/hooks dropped, {stats['invalid']} invalid videos, "
+        f"cache {planner.cache.hits} hits / {planner.cache.misses} misses) -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# crews/content/crew.py
+
+import json
+import os
+import warnings
+from crewai import Task, Agent, Crew
+from crews.patch import disable_ssl_verification
+from crews.utils import get_openai_api_key, definition_file, load_md_content, parse_json_output
+from crews.model_router import resolve_model
+from crews.content.blueprints import ParallelBlueprintPlanner
+from crews.content.title_index import HistoryIndex
+
+# --- 1. Environment Configuration ---
+
+disable_ssl_verification()
+warnings.filterwarnings('ignore')
+
+os.environ["CREWAI_TESTING"] = "true"
+os.environ["OPENAI_API_KEY"] = get_openai_api_key()
+
+# --- 2. Resource Loading ---
+
+agent_cfg = load_md_content(definition_file(__package__, "agent_definitions/micro_history_strategist.md"))
+task_cfg = load_md_content(definition_file(__package__, "task_definitions/create_shorts_plan.md"))
+seed_task_cfg = load_md_content(definition_file(__package__, "task_definitions/create_topic_seeds.md"))
+blueprint_task_cfg = load_md_content(definition_file(__package__, "task_definitions/create_video_blueprint.md"))
+
+# --- 3. Agent Definition ---
+
+content_creator_assistant = Agent(
+    role=agent_cfg["role"],
+    goal=agent_cfg["goal"],
+    backstory=agent_cfg["backstory"],
+    llm=resolve_model(agent_cfg["model"]),
+    verbose=True
+)
+
+# --- 4. Task Definition ---
+
+task = Task(
+    description=task_cfg["description"],
+    expected_output=task_cfg["expected_output"],
+    agent=content_creator_assistant
+)
+
+# --- 5. Crew Assembly and Execution ---
+
+DEFAULT_INPUTS = {"niche": "Micro-History of Everyday Things", "week": "the coming week"}
+
+# Titles and hooks of earlier runs: fed back as negative examples and used to reject repeats
+history = HistoryIndex()
+
+content_crew = Crew(
+    agents=[content_creator_assistant],
+    tasks=[task]
+)
+
+def plan_week(niche=DEFAULT_INPUTS["niche"], week=DEFAULT_INPUTS["week"]):
+    """Runs the single-task planner; returns (result, accepted videos, rejected repeats)."""
+    inputs = {"niche": niche, "week": week, "previous_titles": history.negative_examples(niche)}
+    result = content_crew.kickoff(inputs=inputs)
+    plan = parse_json_output(result.raw)
+    accepted, rejected = history.filter_new(plan.get("videos", []), niche) if plan else ([], [])
+    return result, accepted, rejected
+
+def run_job(niche=DEFAULT_INPUTS["niche"], week=DEFAULT_INPUTS["week"], parallel=False, max_workers=5):
+    """Entry point for the CLI and pooled workers: one weekly plan, returned as plain data."""
+    if parallel:
+        planner = ParallelBlueprintPlanner(
+            content_creator_assistant, seed_task_cfg, blueprint_task_cfg, max_workers=max_workers,
+            history=history, niche=niche, week=week
+        )
+        return {"videos": planner.run()["videos"], "failed_topics": planner.failed_topics}
+    result, accepted, rejected = plan_week(niche, week)
+    return {"videos": accepted, "rejected_repeats": rejected, "crew_output": result}
+
+def format_output(output):
+    """Renders a (serialized) run_job result for the terminal."""
+    lines = ["=" * 80, "STRATEGIC WEEKLY CONTENT PLAN", "=" * 80,
+             json.dumps({"videos": output["videos"]}, indent=2, ensure_ascii=False)]
+    for duplicate in output.get("rejected_repeats", []):
+        lines.append(f"⚠️ Repeats an earlier {duplicate['field']}: {duplicate['title']!r} ~ {duplicate['similar_to']!r}")
+    if output.get("failed_topics"):
+        lines.append(f"⚠️ {len(output['failed_topics'])} blueprint(s) failed validation after retries: {output['failed_topics']}")
+    return "\n".join(lines)
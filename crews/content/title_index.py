@@ -0,0 +1,207 @@
+# crews/content/title_index.py
+
+"""
+Near-Duplicate Title Index
+--------------------------
+MinHash signatures over character shingles, bucketed with locality-sensitive
+hashing, so checking a new title against thousands of existing ones only
+compares it with the few titles that share an LSH band. Candidates are then
+confirmed with the exact Jaccard similarity of their shingle sets.
+
+HistoryIndex persists the titles and hooks of every accepted video in SQLite
+(together with their signatures), so later runs can reject repeats and show
+the model what has already been published.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import defaultdict
+
+from crews.utils import state_path
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def normalize(text):
+    """Lowercases and strips punctuation/hashtags so cosmetic edits do not hide duplicates."""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def shingles(text, size=3):
+    text = normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashIndex:
+    """In-memory LSH index of short texts (titles, hooks) for near-duplicate lookups."""
+
+    def __init__(self, threshold=0.6, num_perm=64, bands=16, shingle_size=3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.shingle_size = shingle_size
+        # Deterministic permutations keep signatures stable across processes and runs
+        self._perms = [
+            (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+            for i in range(num_perm)
+        ]
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._shingles = {}
+        self.texts = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def signature(self, shingle_set):
+        hashes = [zlib.crc32(s.encode()) for s in shingle_set] or [0]
+        return [
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key, text, signature=None):
+        shingle_set = shingles(text, self.shingle_size)
+        signature = signature or self.signature(shingle_set)
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].add(key)
+        self._shingles[key] = shingle_set
+        self.texts[key] = text
+        return signature
+
+    def query(self, text):
+        """Returns [(key, similarity)] of stored texts at or above the threshold, most similar first."""
+        shingle_set = shingles(text, self.shingle_size)
+        candidates = set()
+        for band, band_key in self._band_keys(self.signature(shingle_set)):
+            candidates |= self._buckets[band].get(band_key, set())
+
+        matches = [(key, jaccard(shingle_set, self._shingles[key])) for key in candidates]
+        return sorted((m for m in matches if m[1] >= self.threshold), key=lambda m: -m[1])
+
+    def is_duplicate(self, text):
+        return bool(self.query(text))
+
+
+# --- Cross-Run History ---
+
+DEFAULT_HISTORY_PATH = state_path("title_history.db")
+HISTORY_FIELDS = ("title", "hook_main")
+
+
+class HistoryIndex:
+    """
+    Persistent title/hook history of generated shorts, mirrored in MinHash
+    indexes. Every lookup first loads the rows added since the last one, so
+    repeats are caught across processes (pool workers, zygote children,
+    concurrent CLI runs) and not just within the run that recorded them.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, threshold=0.6):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._last_id = 0
+        self.indexes = {field: MinHashIndex(threshold) for field in HISTORY_FIELDS}
+
+    def _connect(self):
+        """
+        This process's connection, opened on first use rather than at import.
+        A job forked by crews/zygote.py opens its own instead of writing
+        through the one its parent may have opened.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS history ("
+                    "id INTEGER PRIMARY KEY, field TEXT, text TEXT, niche TEXT, signature BLOB, created REAL)"
+                )
+                self._pid = os.getpid()
+            return self._conn
+
+    def refresh(self):
+        """Adds the rows recorded since the last refresh, by any process."""
+        with self._lock:
+            # Stored signatures make loading thousands of items cheap: only shingles are recomputed
+            for row_id, field, text, signature in self._connect().execute(
+                    "SELECT id, field, text, signature FROM history WHERE id > ? ORDER BY id", (self._last_id,)):
+                if field in self.indexes:
+                    self.indexes[field].add(row_id, text, signature=array("Q", signature).tolist())
+                self._last_id = row_id
+
+    def __len__(self):
+        self.refresh()
+        return len(self.indexes["title"])
+
+    def find_duplicate(self, video):
+        """Returns (field, previous_text) for the first title/hook that repeats history, else None."""
+        with self._lock:
+            self.refresh()
+            for field in HISTORY_FIELDS:
+                text = video.get(field)
+                matches = self.indexes[field].query(text) if text else []
+                if matches:
+                    return field, self.indexes[field].texts[matches[0][0]]
+        return None
+
+    def record(self, video, niche=""):
+        with self._lock:
+            for field in HISTORY_FIELDS:
+                text = video.get(field)
+                if not text:
+                    continue
+                index = self.indexes[field]
+                signature = index.signature(shingles(text, index.shingle_size))
+                self._connect().execute(
+                    "INSERT INTO history (field, text, niche, signature, created) VALUES (?, ?, ?, ?, ?)",
+                    (field, text, niche, array("Q", signature).tobytes(), time.time()),
+                )
+            self._connect().commit()
+            self.refresh()
+
+    def filter_new(self, videos, niche=""):
+        """Splits videos into (accepted, rejected); accepted ones are recorded immediately."""
+        accepted, rejected = [], []
+        with self._lock:
+            for video in videos:
+                duplicate = self.find_duplicate(video)
+                if duplicate:
+                    rejected.append({"title": video.get("title"), "field": duplicate[0], "similar_to": duplicate[1]})
+                else:
+                    self.record(video, niche)
+                    accepted.append(video)
+        return accepted, rejected
+
+    def negative_examples(self, niche=None, limit=30):
+        """Most recent titles, formatted as a prompt list of topics the model must not repeat."""
+        query = "SELECT text FROM history WHERE field = 'title'"
+        params = ()
+        if niche:
+            query += " AND niche = ?"
+            params = (niche,)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY id DESC LIMIT ?", params + (limit,)).fetchall()
+        if not rows:
+            return "None yet."
+        return "\n".join(f"- {text}" for (text,) in rows)
@@ -0,0 +1,338 @@
+# crews/daemon.py
+
+"""
+Crew Daemon
+-----------
+Long-running local HTTP/JSON API in front of the three crews (code review,
+deep research, content creation). Crews are built once in warm worker
+processes (see crews/pool.py), jobs wait in a bounded priority queue
+per crew kind, and at most `--workers KIND=N` jobs of a kind run at a time.
+Review jobs are ordered by a cheap risk pre-score of their diff
+(crews/review/risk_score.py), so an auth change does not wait behind doc-only
+PRs; a waiting job gains one point per `--aging` seconds so nothing starves.
+
+Endpoints:
+    POST /jobs                    {"kind": "review", "payload": {"code_changes": "..."}} -> 202 {"job_id": ...}
+                                  (review payloads may send "diff_path" instead of inline "code_changes";
+                                  an optional top-level "score" overrides the risk pre-score; any payload
+                                  may carry "budget": {"tokens": N, "seconds": S}, see crews/budget.py,
+                                  and "memory": {"namespace": "..."}, see crews/memory.py)
+    GET  /jobs/<id>               job status (and result once finished)
+    GET  /jobs/<id>/events        server-sent events stream of status changes until the job finishes
+    GET  /jobs/<id>/result        result only (409 while the job is still queued or running)
+    GET  /metrics                 queue depth, running jobs, counts, latency and queue wait per crew kind
+                                  (and per priority class)
+    GET  /health
+
+Usage:
+    crews serve --port 8765 --workers review=2 --workers research=1 --workers content=1 --queue-size 100
+    crews serve --zygote    (jobs are forked from one process with all crews built, see crews/zygote.py)
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from crews.pool import CrewPool, CREW_KINDS, parse_workers
+from crews.review.diff_ingest import DiffRules
+from crews.review.risk_score import NORMAL, PRIORITY_CLASSES, priority_class, risk_prescore
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+LATENCY_WINDOW = 500  # most recent jobs per kind kept for the latency percentiles
+DEFAULT_AGING_S = 60.0  # a queued job gains one score point per minute of waiting
+
+# --- Job Scheduling ---
+
+def review_priority(payload):
+    """Risk pre-score of a review payload (see crews/review/risk_score.py)."""
+    source = Path(payload["diff_path"]) if payload.get("diff_path") else payload.get("code_changes", "")
+    return risk_prescore(source, DiffRules(**(payload.get("diff_rules") or {})))
+
+
+# Kinds without a scorer are all "normal" and therefore served in arrival order
+PRIORITY_SCORERS = {"review": review_priority}
+
+
+class PriorityJobQueue:
+    """Bounded queue that pops the highest score first, with linear aging against starvation.
+
+    A job's effective priority is `score + waited / aging_s`. Since every queued
+    job ages at the same rate, ordering by `score - submitted / aging_s` is
+    the same at any moment, so a plain heap keyed on it stays valid; equal
+    scores fall back to FIFO.
+    """
+
+    def __init__(self, maxsize=0, aging_s=DEFAULT_AGING_S):
+        self.maxsize = maxsize
+        self.aging_s = aging_s
+        self._heap = []
+        self._order = itertools.count()
+        self._not_empty = threading.Condition()
+
+    def put_nowait(self, item, score=0.0, submitted=None):
+        with self._not_empty:
+            if self.maxsize and len(self._heap) >= self.maxsize:
+                raise queue.Full
+            key = -(score - (submitted or time.time()) / self.aging_s)
+            heapq.heappush(self._heap, (key, next(self._order), item))
+            self._not_empty.notify()
+
+    def get(self):
+        with self._not_empty:
+            self._not_empty.wait_for(lambda: self._heap)
+            return heapq.heappop(self._heap)[2]
+
+    def qsize(self):
+        with self._not_empty:
+            return len(self._heap)
+
+class JobManager:
+    """Bounded per-kind priority queues dispatched to a CrewPool under per-kind concurrency limits."""
+
+    def __init__(self, pool, concurrency, queue_size=100, retain=1000, aging_s=DEFAULT_AGING_S):
+        self.pool = pool
+        self.retain = retain
+        self.jobs = OrderedDict()
+        self._changed = threading.Condition()
+        self._queues = {kind: PriorityJobQueue(queue_size, aging_s) for kind in concurrency}
+        self._slots = {kind: threading.BoundedSemaphore(count) for kind, count in concurrency.items()}
+        self.concurrency = dict(concurrency)
+        self.counts = defaultdict(lambda: defaultdict(int))
+        self.latencies = {kind: deque(maxlen=LATENCY_WINDOW) for kind in concurrency}
+        self.queue_waits = {kind: deque(maxlen=LATENCY_WINDOW) for kind in concurrency}
+        self.class_waits = {kind: defaultdict(lambda: deque(maxlen=LATENCY_WINDOW)) for kind in concurrency}
+        for kind in concurrency:
+            threading.Thread(target=self._dispatch, args=(kind,), daemon=True, name=f"dispatch-{kind}").start()
+
+    def submit(self, kind, payload, score=None):
+        """Queues a job; raises KeyError for unknown kinds, ValueError for a `score` that is not a
+        finite number and queue.Full when the kind's queue is full.
+
+        Jobs are ordered by `score` (higher first); by default it is the kind's
+        risk pre-score, so review jobs touching risky code are dispatched first.
+        """
+        if kind not in self._queues:
+            raise KeyError(kind)
+        if score is not None:
+            try:
+                score = float(score)
+            except (TypeError, ValueError):
+                score = math.nan
+            if not math.isfinite(score):
+                raise ValueError("'score' must be a finite number")
+        risk = None
+        if score is None and kind in PRIORITY_SCORERS:
+            risk = PRIORITY_SCORERS[kind](payload)
+            score = risk["score"]
+        priority = NORMAL if score is None else priority_class(score)
+        job = {"job_id": uuid.uuid4().hex[:12], "kind": kind, "status": QUEUED, "submitted": time.time(),
+               "started": None, "finished": None, "result": None, "error": None,
+               "score": float(score or 0.0), "priority": priority, "risk": risk}
+        with self._changed:
+            self._queues[kind].put_nowait((job["job_id"], payload), job["score"], job["submitted"])
+            self.jobs[job["job_id"]] = job
+            self.counts[kind]["submitted"] += 1
+            self._prune()
+        return job
+
+    def _dispatch(self, kind):
+        while True:
+            # A free slot first: a job taken off the queue any earlier could be overtaken by a riskier one
+            self._slots[kind].acquire()
+            job_id, payload = self._queues[kind].get()
+            self._update(job_id, status=RUNNING, started=time.time())
+            try:
+                self.pool.submit(kind, payload, job_id=job_id,
+                                 callback=lambda result, kind=kind: self._finish(kind, result))
+            except Exception as e:  # fail this job only; the dispatcher keeps serving the queue
+                self._finish(kind, {"job_id": job_id, "kind": kind, "status": "failed",
+                                    "error": f"{type(e).__name__}: {e}"})
+
+    def _finish(self, kind, result):
+        self._slots[kind].release()
+        status = DONE if result["status"] == "done" else FAILED
+        job = self._update(result["job_id"], status=status, finished=time.time(),
+                           result=result if status == DONE else None, error=result.get("error"))
+        self.counts[kind][status] += 1
+        if job:
+            self.latencies[kind].append(job["finished"] - job["started"])
+            self.queue_waits[kind].append(job["started"] - job["submitted"])
+            self.class_waits[kind][job["priority"]].append(job["started"] - job["submitted"])
+
+    def _update(self, job_id, **fields):
+        with self._changed:
+            job = self.jobs.get(job_id)
+            if job:
+                job.update(fields)
+            self._changed.notify_all()
+            return job
+
+    def _prune(self):
+        """Drops the oldest finished jobs beyond `retain`; queued/running jobs are always kept."""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(self.jobs) - self.retain)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self._changed:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_change(self, job_id, last_status, timeout=15.0):
+        """Blocks until the job leaves `last_status` (or timeout); returns the current job snapshot."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.jobs.get(job_id, {}).get("status") != last_status, timeout)
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def metrics(self):
+        with self._changed:
+            running = defaultdict(int)
+            for job in self.jobs.values():
+                if job["status"] == RUNNING:
+                    running[job["kind"]] += 1
+        return {
+            kind: {
+                "queue_depth": self._queues[kind].qsize(),
+                "running": running[kind],
+                "concurrency": self.concurrency[kind],
+                "counts": dict(self.counts[kind]),
+                "latency_s": percentiles(self.latencies[kind]),
+                "queue_wait_s": percentiles(self.queue_waits[kind]),
+                "queue_wait_by_priority_s": {
+                    name: percentiles(self.class_waits[kind][name])
+                    for name in PRIORITY_CLASSES if self.class_waits[kind].get(name)
+                },
+            }
+            for kind in self._queues
+        }
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+    return {"count": len(ordered), "p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 3)}
+
+# --- HTTP API ---
+
+class CrewRequestHandler(BaseHTTPRequestHandler):
+    manager = None  # set by serve()
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            job = self.manager.submit(body["kind"], body.get("payload", {}), body.get("score"))
+        except (json.JSONDecodeError, TypeError):
+            return self._send_json(400, {"error": "body must be a JSON object"})
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        except OSError as e:
+            return self._send_json(400, {"error": f"cannot read diff_path: {e}"})
+        except KeyError:
+            return self._send_json(400, {"error": f"'kind' must be one of {list(self.manager.concurrency)}"})
+        except queue.Full:
+            return self._send_json(429, {"error": "queue is full, retry later"})
+        self._send_json(202, {"job_id": job["job_id"], "status": job["status"], "priority": job["priority"]})
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok"})
+        if parts == ["metrics"]:
+            return self._send_json(200, self.manager.metrics())
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "not found"})
+
+        job = self.manager.get(parts[1])
+        if job is None:
+            return self._send_json(404, {"error": f"unknown job {parts[1]}"})
+        if len(parts) == 2:
+            return self._send_json(200, job)
+        if parts[2] == "result":
+            if job["status"] in (QUEUED, RUNNING):
+                return self._send_json(409, {"error": f"job is {job['status']}"})
+            return self._send_json(200, job["result"] or {"error": job["error"]})
+        if parts[2] == "events":
+            return self._stream_events(job)
+        self._send_json(404, {"error": "not found"})
+
+    def _stream_events(self, job):
+        """Server-sent events: one `status` event per change, ending with the finished job."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        last_status = None
+        while job:
+            if job["status"] != last_status:
+                self.wfile.write(f"event: status\ndata: {json.dumps(job, default=str)}\n\n".encode())
+            else:
+                self.wfile.write(b": keep-alive\n\n")
+            self.wfile.flush()
+            if job["status"] in (DONE, FAILED):
+                break
+            last_status = job["status"]
+            job = self.manager.wait_for_change(job["job_id"], last_status)
+
+
+def serve(host, port, workers, max_jobs_per_worker, queue_size, aging_s=DEFAULT_AGING_S, zygote=False):
+    if zygote:
+        from crews.zygote import Zygote
+        executor = Zygote([kind for kind, count in workers.items() if count > 0])
+    else:
+        executor = CrewPool(workers, max_jobs_per_worker)
+    with executor as pool:
+        CrewRequestHandler.manager = JobManager(pool, workers, queue_size, aging_s=aging_s)
+        server = ThreadingHTTPServer((host, port), CrewRequestHandler)
+        print(f"Crew daemon listening on http://{host}:{port} (workers: {workers})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews serve", description="Serve the crews over a local HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", action="append", default=[], metavar="KIND=N",
+                        help=f"Concurrent jobs (worker processes) per crew kind ({', '.join(CREW_KINDS)}); repeatable")
+    parser.add_argument("--max-jobs", type=int, default=20, help="Jobs per worker before it is recycled")
+    parser.add_argument("--queue-size", type=int, default=100, help="Queued jobs per crew kind before POST returns 429")
+    parser.add_argument("--aging", type=float, default=DEFAULT_AGING_S, metavar="SECONDS",
+                        help="Seconds of waiting that raise a queued job's priority score by one point")
+    parser.add_argument("--zygote", action="store_true",
+                        help="Fork every job from one warm-start process (crews/zygote.py) instead of pooled workers")
+    args = parser.parse_args(argv)
+
+    workers = {kind: 1 for kind in CREW_KINDS}
+    workers.update(parse_workers(args.workers))
+    workers = {kind: count for kind, count in workers.items() if count > 0}
+    serve(args.host, args.port, workers, args.max_jobs, args.queue_size, args.aging, args.zygote)
+
+
+if __name__ == "__main__":
+    main()
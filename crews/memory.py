@@ -0,0 +1,319 @@
+# crews/memory.py
+
+"""
+Long-Term Crew Memory
+---------------------
+None of the crews remembered anything between runs: the research planner
+re-planned queries it had planned before, and the code reviewers rediscovered
+the same issues in every diff of a repository. With `--memory`, a run gets
+CrewAI's external memory, backed by a local store:
+
+- MemoryStore keeps the entries in SQLite ($CREWS_HOME/memory.db) with a
+  sparse vector per entry (its words and word pairs hashed into 2^20 buckets,
+  log-scaled and L2-normalized), so similarity search needs no embedding
+  model and no external service
+- entries live in namespaces, one per crew ("research", "review", or e.g.
+  "review:my-service" with --memory-namespace), and every namespace is capped
+  by size (least recently used entries go first) and by age
+- before each task, CrewAI asks the memory for the entries most similar to the
+  task and adds them to the prompt; after each task the agent's final answer
+  is saved, refreshing a near-identical entry instead of duplicating it
+- every retrieval is timed: the job result reports hits and retrieval latency,
+  and the calls go to the usage store as kind "memory" (crews usage --kind memory)
+
+    with CrewMemory(crew, "research") as memory:
+        crew.kickoff(inputs=inputs)
+    print(format_memory(memory.report()))
+
+    crews memory stats
+    crews memory search research "generative AI productivity"
+    crews memory clear --namespace review:my-service
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from datetime import datetime
+
+from crewai.memory.external.external_memory import ExternalMemory
+from crewai.memory.storage.interface import Storage
+
+from crews.accounting import DIRECT_CALL, TOKEN_FIELDS
+from crews.utils import state_path
+
+DEFAULT_MEMORY_PATH = state_path("memory.db")
+BUCKETS = 1 << 20
+MAX_CONTENT_CHARS = 4000
+WORD = re.compile(r"[a-z0-9][a-z0-9_]*")
+STOPWORDS = frozenset(
+    "the and for that with from this are was were has have had its their there which what when who will would "
+    "can could not but than then also more most into over such these those been being about after before you your "
+    "should must each all any our use using".split()
+)
+
+# --- Vectors ---
+
+def embed(text):
+    """Sparse unit vector {bucket: weight} of the words and word pairs in `text`."""
+    words = [word for word in WORD.findall(text.lower()) if len(word) > 2 and word not in STOPWORDS]
+    counts = defaultdict(int)
+    for feature in words + [f"{first} {second}" for first, second in zip(words, words[1:])]:
+        counts[zlib.crc32(feature.encode("utf-8")) % BUCKETS] += 1
+    weights = {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {bucket: weight / norm for bucket, weight in weights.items()}
+
+
+def similarity(first, second):
+    """Cosine similarity of two unit vectors from `embed`."""
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(bucket, 0.0) for bucket, weight in first.items())
+
+
+def pack(vector):
+    buckets = sorted(vector)
+    return array("I", buckets).tobytes() + array("f", [vector[bucket] for bucket in buckets]).tobytes()
+
+
+def unpack(blob):
+    size = len(blob) // 8
+    buckets, weights = array("I"), array("f")
+    buckets.frombytes(blob[:size * 4])
+    weights.frombytes(blob[size * 4:])
+    return dict(zip(buckets, weights))
+
+# --- Store ---
+
+class MemoryStore:
+    """Namespaced vector store of crew memories in SQLite, capped per namespace by size (LRU) and age."""
+
+    def __init__(self, path=DEFAULT_MEMORY_PATH, max_entries=500, max_age_days=90, duplicate_score=0.95):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.duplicate_score = duplicate_score
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memories (id INTEGER PRIMARY KEY, namespace TEXT, content TEXT,"
+                " metadata TEXT, vector BLOB, created REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS memories_namespace ON memories (namespace, last_used)")
+
+    def _connect(self):
+        # Pool workers share the file; wait for the lock instead of failing
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, namespace, content, metadata=None, text=None):
+        """Stores `content`, found by `text` (default: the content); returns (entry id, entries evicted)."""
+        vector = embed(text or content)
+        content = content[:MAX_CONTENT_CHARS]
+        metadata = json.dumps(metadata or {})
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            duplicate = next((entry_id for entry_id, blob in conn.execute(
+                "SELECT id, vector FROM memories WHERE namespace = ?", (namespace,))
+                if similarity(vector, unpack(blob)) >= self.duplicate_score), None)
+            if duplicate:
+                conn.execute("UPDATE memories SET content = ?, metadata = ?, vector = ?, created = ?, last_used = ?"
+                             " WHERE id = ?", (content, metadata, pack(vector), now, now, duplicate))
+                entry_id = duplicate
+            else:
+                entry_id = conn.execute(
+                    "INSERT INTO memories (namespace, content, metadata, vector, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)", (namespace, content, metadata, pack(vector), now, now)
+                ).lastrowid
+            return entry_id, self._evict(conn, namespace, now)
+
+    def _evict(self, conn, namespace, now):
+        expired = conn.execute("DELETE FROM memories WHERE namespace = ? AND created < ?",
+                               (namespace, now - self.max_age)).rowcount
+        overflow = conn.execute(
+            "DELETE FROM memories WHERE id IN (SELECT id FROM memories WHERE namespace = ?"
+            " ORDER BY last_used DESC, id DESC LIMIT -1 OFFSET ?)", (namespace, self.max_entries)
+        ).rowcount
+        return expired + overflow
+
+    def search(self, namespace, query, limit=3, min_score=0.2):
+        """Most similar live entries: [{id, content, metadata, score}], best first; marks them as used."""
+        vector = embed(query)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT id, content, metadata, vector FROM memories WHERE namespace = ? AND created >= ?",
+                                (namespace, now - self.max_age)).fetchall()
+            scored = sorted(((similarity(vector, unpack(blob)), entry_id, content, metadata)
+                             for entry_id, content, metadata, blob in rows), reverse=True)
+            hits = [row for row in scored if row[0] >= min_score][:limit]
+            conn.executemany("UPDATE memories SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                             [(now, entry_id) for _, entry_id, _, _ in hits])
+        return [{"id": entry_id, "content": content, "metadata": json.loads(metadata), "score": round(score, 3)}
+                for score, entry_id, content, metadata in hits]
+
+    def count(self, namespace):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM memories WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def stats(self):
+        """Per namespace: entries, retrieval hits, oldest entry and last use."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT namespace, COUNT(*), SUM(hits), MIN(created), MAX(last_used) FROM memories"
+                                " GROUP BY namespace ORDER BY namespace").fetchall()
+        return [{"namespace": namespace, "entries": entries, "hits": hits or 0, "oldest": oldest, "last_used": last_used}
+                for namespace, entries, hits, oldest, last_used in rows]
+
+    def clear(self, namespace=None):
+        with self._lock, self._connect() as conn:
+            if namespace:
+                return conn.execute("DELETE FROM memories WHERE namespace = ?", (namespace,)).rowcount
+            return conn.execute("DELETE FROM memories").rowcount
+
+# --- CrewAI Memory ---
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class CrewMemory(Storage):
+    """One namespace of a MemoryStore as a crew's external memory for the duration of a run, with every call timed."""
+
+    def __init__(self, crew, namespace, store=None, limit=3, min_score=0.2, max_chars=800):
+        self.crew = crew
+        self.namespace = namespace
+        self.store = store or MemoryStore()
+        self.limit = limit
+        self.min_score = min_score
+        self.max_chars = max_chars
+        self.memory = ExternalMemory(storage=self)
+        self.calls = []  # usage rows of kind "memory" (crews/accounting.py)
+        self.retrievals = []  # (milliseconds, hits)
+        self.saved = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._previous = None
+
+    # --- Storage Interface ---
+
+    def save(self, value, metadata):
+        started = time.perf_counter()
+        task = (metadata or {}).get("description", "")
+        agent = getattr(self.memory.agent, "role", DIRECT_CALL)
+        # CrewAI also passes the whole message history; the task and the answer are enough to be found again
+        _, evicted = self.store.save(self.namespace, str(value), {"agent": agent, "task": task[:300]},
+                                     text=f"{task}\n{value}")
+        with self._lock:
+            self.saved += 1
+            self.evicted += evicted
+        self._record("save", time.perf_counter() - started)
+
+    def search(self, query, limit=3, score_threshold=0.6):
+        # CrewAI's default threshold is meant for dense embeddings; hashed word vectors score lower, so min_score applies
+        started = time.perf_counter()
+        hits = self.store.search(self.namespace, query, min(limit, self.limit), self.min_score)
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self.retrievals.append((seconds * 1000, len(hits)))
+        self._record("search", seconds)
+        return [{"content": self._excerpt(hit["content"]), "score": hit["score"], "metadata": hit["metadata"]}
+                for hit in hits]
+
+    def reset(self):
+        self.store.clear(self.namespace)
+
+    def _excerpt(self, content):
+        if len(content) <= self.max_chars:
+            return content
+        return content[:self.max_chars].rsplit(" ", 1)[0] + " ..."
+
+    def _record(self, operation, seconds):
+        task = self.memory.task
+        row = {
+            "kind": "memory",
+            "name": f"{self.namespace} ({operation})",
+            "agent": getattr(self.memory.agent, "role", DIRECT_CALL),
+            "task": (getattr(task, "name", None) or getattr(task, "description", "")[:40]) if task else DIRECT_CALL,
+            "seconds": seconds,
+            "errors": 0,
+            **{field: 0 for field in TOKEN_FIELDS},
+        }
+        with self._lock:
+            self.calls.append(row)
+
+    # --- Run Wiring ---
+
+    def __enter__(self):
+        self._previous = self.crew._external_memory
+        self.crew._external_memory = self.memory.set_crew(self.crew)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.crew._external_memory = self._previous
+        return False
+
+    def report(self):
+        """Plain-data report: retrievals, hits, saves, evictions and retrieval latency (ms) of this run."""
+        latencies = sorted(milliseconds for milliseconds, _ in self.retrievals)
+        return {
+            "namespace": self.namespace,
+            "retrievals": len(self.retrievals),
+            "hits": sum(1 for _, hits in self.retrievals if hits),
+            "saved": self.saved,
+            "evicted": self.evicted,
+            "entries": self.store.count(self.namespace),
+            "retrieval_ms": {
+                "p50": round(_percentile(latencies, 0.5), 2),
+                "p95": round(_percentile(latencies, 0.95), 2),
+                "max": round(latencies[-1], 2),
+            } if latencies else None,
+        }
+
+
+def format_memory(report):
+    latency = report["retrieval_ms"]
+    timing = f" (p50 {latency['p50']} ms, p95 {latency['p95']} ms)" if latency else ""
+    return (f"Memory '{report['namespace']}': {report['hits']} of {report['retrievals']} retrievals found entries"
+            f"{timing}; {report['saved']} saved, {report['evicted']} evicted, {report['entries']} entries kept")
+
+# --- Command Line ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews memory", description="Inspect or clear the crews' long-term memory.")
+    parser.add_argument("--store", default=DEFAULT_MEMORY_PATH, help="Memory store (default: $CREWS_HOME/memory.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Entries and retrieval hits per namespace")
+    search_cmd = commands.add_parser("search", help="Query one namespace")
+    search_cmd.add_argument("namespace")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--limit", type=int, default=5)
+    clear_cmd = commands.add_parser("clear", help="Delete the entries of one namespace (or all)")
+    clear_cmd.add_argument("--namespace", help="Namespace to clear (default: all)")
+    args = parser.parse_args(argv)
+
+    store = MemoryStore(args.store)
+    if args.command == "stats":
+        print(f"{'Namespace':<32}{'Entries':>8}{'Hits':>7}  {'Oldest':<17}{'Last used':<17}")
+        for row in store.stats():
+            oldest, last_used = (datetime.fromtimestamp(row[key]).strftime("%Y-%m-%d %H:%M")
+                                 for key in ("oldest", "last_used"))
+            print(f"{row['namespace'][:31]:<32}{row['entries']:>8}{row['hits']:>7}  {oldest:<17}{last_used:<17}")
+    elif args.command == "search":
+        started = time.perf_counter()
+        hits = store.search(args.namespace, args.query, args.limit, min_score=0.0)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            print(f"{hit['score']:6.2f}  [{hit['metadata'].get('agent', '-')}] {' '.join(hit['content'].split())[:100]}")
+        print(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+    else:
+        print(f"Deleted {store.clear(args.namespace)} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+# crews/model_router.py
+
+"""
+Per-Agent Model Tiering
+-----------------------
+Agent definitions pick a model with a `**Model:**` entry: either a tier name
+(`small` for cheap planning/formatting work, `large` for hard reasoning) or an
+explicit model id. Tiers are resolved from the environment so deployments can
+point them at different endpoints without touching the definitions:
+
+    MODEL_SMALL=Llama-3.2-3B-Instruct-Q4_K_M MODEL_LARGE=gpt-4o crews review changes.diff
+
+Unset tiers fall back to MODEL, then to CrewAI's default model. ModelUsageReport
+records per-agent latency from CrewAI's LLM events and token usage/cost from
+each agent's LLM after the run.
+"""
+
+import json
+import os
+import threading
+from collections import defaultdict
+
+from crewai.events import crewai_event_bus, LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+
+DEFAULT_MODEL = "gpt-4o-mini"
+MODEL_TIERS = ("small", "large")
+
+# USD per 1M (prompt, completion) tokens; local models are free. Override with MODEL_PRICES='{"model": [in, out]}'
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# --- Model Resolution ---
+
+def resolve_model(spec):
+    """Maps a `**Model:**` value (tier name, model id or empty) to a concrete model id."""
+    spec = (spec or "").strip()
+    default = os.getenv("MODEL") or DEFAULT_MODEL
+    if not spec:
+        return default
+    if spec.lower() in MODEL_TIERS:
+        return os.getenv(f"MODEL_{spec.upper()}") or default
+    return spec
+
+
+def model_price(model):
+    prices = dict(MODEL_PRICES)
+    prices.update({name: tuple(value) for name, value in json.loads(os.getenv("MODEL_PRICES", "{}")).items()})
+    return prices.get(model, (0.0, 0.0))
+
+# --- Usage Reporting ---
+
+class ModelUsageReport:
+    """Collects per-agent LLM latency during a run and prints a cost/latency table afterwards."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self.latencies = defaultdict(list)
+        self.failures = defaultdict(int)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, self._on_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, self._on_completed)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, self._on_failed)
+
+    def _on_started(self, source, event):
+        with self._lock:
+            self._started[event.agent_id] = event.timestamp
+
+    def _on_completed(self, source, event):
+        with self._lock:
+            started = self._started.pop(event.agent_id, None)
+            if started is not None:
+                self.latencies[event.agent_role].append((event.timestamp - started).total_seconds())
+
+    def _on_failed(self, source, event):
+        with self._lock:
+            self._started.pop(event.agent_id, None)
+            self.failures[event.agent_role] += 1
+
+    def rows(self, crew):
+        """One row per agent: model, requests, tokens, cost and LLM latency."""
+        crewai_event_bus.flush()
+        rows = []
+        for agent in crew.agents:
+            model = getattr(agent.llm, "model", str(agent.llm))
+            usage = agent.llm.get_token_usage_summary()
+            prompt_price, completion_price = model_price(model)
+            latencies = self.latencies.get(agent.role, [])
+            rows.append({
+                "agent": agent.role,
+                "model": model,
+                "requests": usage.successful_requests,
+                "failures": self.failures.get(agent.role, 0),
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "cost_usd": (usage.prompt_tokens * prompt_price + usage.completion_tokens * completion_price) / 1_000_000,
+                "llm_seconds": sum(latencies),
+                "avg_latency_s": sum(latencies) / len(latencies) if latencies else 0.0,
+            })
+        return rows
+
+    def format(self, crew):
+        lines = [f"{'Agent':<28}{'Model':<32}{'Reqs':>5}{'Prompt':>9}{'Compl.':>8}{'Cost $':>9}{'LLM s':>8}{'Avg s':>7}"]
+        for row in self.rows(crew):
+            lines.append(
+                f"{row['agent'][:27]:<28}{row['model'][:31]:<32}{row['requests']:>5}"
+                f"{row['prompt_tokens']:>9}{row['completion_tokens']:>8}{row['cost_usd']:>9.4f}"
+                f"{row['llm_seconds']:>8.1f}{row['avg_latency_s']:>7.1f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,275 @@
+# crews/pool.py
+
+"""
+Process-Pool Crew Executor
+--------------------------
+Runs code reviews, research queries and content plans on a pool of worker
+processes instead of one Python process driving crews serially. Each crew kind
+gets its own pool: the workers start up front and import their crew module
+once, so agents, tools and the loaded definitions are already built when the
+first job arrives, and a worker only holds the crew it serves. Jobs are queued
+on the pool, every result comes back as plain JSON-serializable data, and a
+worker is replaced after `max_jobs_per_worker` jobs to bound memory growth.
+
+Usage:
+    crews pool jobs.jsonl --workers review=2 --workers research=1 --max-jobs 20 --out results.jsonl
+
+where each line of jobs.jsonl is e.g.
+    {"kind": "review", "payload": {"diff_path": "/path/to/pr.diff", "diff_rules": {"exclude": ["docs/*"]}}}
+    {"kind": "research", "payload": {"user_query": "...", "budget": {"tokens": 40000, "seconds": 300}}}
+    {"kind": "review", "payload": {"diff_path": "/path/to/pr.diff", "memory": {"namespace": "my-service"}}}
+    {"kind": "content", "payload": {"niche": "Forgotten Inventions", "week": "the week of 2026-01-05"}}
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import time
+import uuid
+
+# kind -> (module exposing run_job(**payload) and format_output(output), crew attribute used for token accounting)
+CREW_KINDS = {
+    "review": ("crews.review.crew", "code_review_crew"),
+    "research": ("crews.research.crew", "deep_research_crew"),
+    "content": ("crews.content.crew", "content_crew"),
+}
+
+USAGE_FIELDS = ("total_tokens", "prompt_tokens", "cached_prompt_tokens", "completion_tokens", "successful_requests")
+
+# --- Running Jobs ---
+
+def load_crew_module(kind):
+    """Imports (and thereby builds) the crew of one kind; later calls reuse the loaded module."""
+    return importlib.import_module(CREW_KINDS[kind][0])
+
+
+def _usage(crew):
+    metrics = crew.calculate_usage_metrics()
+    return {field: getattr(metrics, field) for field in USAGE_FIELDS}
+
+
+def to_serializable(value):
+    """Converts CrewOutput/TaskOutput objects (also nested in dicts/lists) into plain data."""
+    if hasattr(value, "tasks_output"):
+        return {
+            "raw": value.raw,
+            "tasks": [{"name": task.name, "agent": task.agent, "raw": task.raw} for task in value.tasks_output],
+        }
+    if isinstance(value, dict):
+        return {key: to_serializable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(item) for item in value]
+    return value
+
+
+def run_crew_job(module, kind, payload, job_id=None):
+    """Runs one job on an already loaded crew module; returns the serialized result with its own token usage.
+
+    Per-agent/task/tool usage is recorded for every job and persisted to the usage store (crews/accounting.py),
+    and tool results are memoized for the duration of the job (crews/tool_memo.py).
+    An optional `budget` entry in the payload ({"tokens": N, "seconds": S, "weights": {task: w}}) runs the job
+    under a BudgetController (crews/budget.py), and an optional `memory` entry ({"namespace": name,
+    "max_entries": N, "max_age_days": D}, all optional) gives the crew long-term memory (crews/memory.py)
+    in the crew kind's namespace, or in "<kind>:<name>". Model and network tool calls are retried, timed out,
+    hedged and circuit-broken (crews/resilience.py); a `resilience` entry overrides the policies
+    ({"llm": {"hedge": true}, "tool": {"retries": 3}}) or, set to false, turns that off.
+    """
+    from crews.accounting import UsageRecorder, UsageStore, summarize
+    from crews.budget import BudgetController, format_budget
+    from crews.memory import CrewMemory, MemoryStore, format_memory
+    from crews.resilience import Resilience, format_resilience, resilient_llms
+    from crews.tool_memo import ToolMemo, format_memo
+
+    job_id = job_id or uuid.uuid4().hex[:12]
+    crew = getattr(module, CREW_KINDS[kind][1])
+    payload = dict(payload)
+    budget = payload.pop("budget", None)
+    memory_options = payload.pop("memory", None)
+    resilience_options = payload.pop("resilience", None)
+    resilience = Resilience(resilience_options) if resilience_options is not False else None
+    resilient_llms(crew.agents)
+    controller = None
+    # LLM token counters are cumulative per agent, and agents live as long as the process
+    before = _usage(crew)
+    memory = None
+    started = time.perf_counter()
+    with UsageRecorder() as recorder, ToolMemo() as memo:
+        try:
+            if budget:
+                controller = BudgetController(crew.tasks, **budget)
+            if memory_options is not None:
+                namespace = memory_options.get("namespace")
+                store = MemoryStore(**{key: value for key, value in memory_options.items() if key != "namespace"})
+                memory = CrewMemory(crew, f"{kind}:{namespace}" if namespace else kind, store)
+            with (controller or contextlib.nullcontext(), memory or contextlib.nullcontext(),
+                  resilience or contextlib.nullcontext()):
+                output, status, error = module.run_job(**payload), "done", None
+        except Exception as e:
+            output, status, error = None, "failed", f"{type(e).__name__}: {e}"
+    if memory:
+        recorder.calls.extend(memory.calls)
+    after = _usage(crew)
+    seconds = round(time.perf_counter() - started, 3)
+    try:
+        UsageStore().save_run(job_id, kind, recorder.calls, seconds, status)
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not record usage of job {job_id}: {e}", flush=True)
+    output = to_serializable(output)
+    text = module.format_output(output) if status == "done" else None
+    if text and controller:
+        text += f"\n\n--- Budget ---\n\n{format_budget(controller.report())}"
+    memo_report = memo.report()
+    if text and memo_report["saved"]:
+        text += f"\n\n--- Tool Calls Saved ---\n\n{format_memo(memo_report)}"
+    memory_report = memory.report() if memory else None
+    if text and memory_report:
+        text += f"\n\n--- Memory ---\n\n{format_memory(memory_report)}"
+    resilience_report = resilience.report() if resilience else None
+    if text and resilience_report and (resilience_report["retries"] or resilience_report["hedges"]
+                                       or resilience_report["rejected"]):
+        text += f"\n\n--- Resilience ---\n\n{format_resilience(resilience_report)}"
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "status": status,
+        "error": error,
+        "worker_pid": os.getpid(),
+        "seconds": seconds,
+        "token_usage": {field: after[field] - before[field] for field in USAGE_FIELDS},
+        "accounting": summarize(recorder.calls),
+        "budget": controller.report() if controller else None,
+        "tool_memo": memo_report,
+        "memory": memory_report,
+        "resilience": resilience_report,
+        "output": output,
+        "text": text,
+    }
+
+# --- Worker Side ---
+
+_module = None
+_init_error = None
+
+
+def _init_worker(kind):
+    """Pool initializer: imports the crew module once, so every job in this worker reuses the built crew."""
+    global _module, _init_error
+    try:
+        _module = load_crew_module(kind)
+    except Exception as e:
+        # An initializer that raises makes the pool respawn workers forever; fail the jobs instead
+        _init_error = f"Could not build the {kind} crew: {type(e).__name__}: {e}"
+
+
+def _run_job(job_id, kind, payload):
+    if _init_error:
+        return {"job_id": job_id, "kind": kind, "status": "failed", "error": _init_error, "worker_pid": os.getpid()}
+    return run_crew_job(_module, kind, payload, job_id)
+
+# --- Pool ---
+
+class CrewPool:
+    """Pre-started worker pools, one per crew kind, fed through the pools' job queues."""
+
+    def __init__(self, workers=None, max_jobs_per_worker=20):
+        workers = workers or {kind: 1 for kind in CREW_KINDS}
+        unknown = set(workers) - set(CREW_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown crew kind(s) {sorted(unknown)}; choose from {sorted(CREW_KINDS)}")
+        # spawn: CrewAI starts background threads at import time, which must not be forked mid-flight
+        context = multiprocessing.get_context("spawn")
+        self._pools = {
+            kind: context.Pool(count, initializer=_init_worker, initargs=(kind,), maxtasksperchild=max_jobs_per_worker)
+            for kind, count in workers.items() if count > 0
+        }
+
+    @property
+    def kinds(self):
+        return list(self._pools)
+
+    def submit(self, kind, payload=None, job_id=None, callback=None):
+        """Queues one job; returns an AsyncResult whose value is the serialized job result."""
+        if kind not in self._pools:
+            raise ValueError(f"No workers for crew kind '{kind}'; available: {self.kinds}")
+        job_id = job_id or uuid.uuid4().hex[:12]
+
+        def on_error(e):
+            if callback:
+                callback({"job_id": job_id, "kind": kind, "status": "failed", "error": f"{type(e).__name__}: {e}"})
+
+        return self._pools[kind].apply_async(
+            _run_job, (job_id, kind, payload or {}), callback=callback, error_callback=on_error
+        )
+
+    def run_jobs(self, jobs):
+        """Submits (kind, payload) pairs and yields their results in completion order."""
+        done = queue.Queue()
+        count = 0
+        for kind, payload in jobs:
+            self.submit(kind, payload, callback=done.put)
+            count += 1
+        for _ in range(count):
+            yield done.get()
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+        for pool in self._pools.values():
+            pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_workers(specs):
+    workers = {}
+    for spec in specs:
+        kind, _, count = spec.partition("=")
+        workers[kind.strip()] = int(count or 1)
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews pool", description="Run crew jobs from a JSON Lines file on a process pool.")
+    parser.add_argument("jobs", help='JSON Lines file with {"kind": ..., "payload": {...}} per line')
+    parser.add_argument("--workers", action="append", default=[], metavar="KIND=N",
+                        help=f"Worker processes per crew kind ({', '.join(CREW_KINDS)}); repeatable")
+    parser.add_argument("--max-jobs", type=int, default=20, help="Jobs per worker before it is recycled")
+    parser.add_argument("--out", default="pool_results.jsonl", help="JSON Lines file for results (appended to)")
+    parser.add_argument("--zygote", action="store_true",
+                        help="Fork every job from one warm-start process (crews/zygote.py); --workers then caps "
+                             "concurrent jobs")
+    args = parser.parse_args(argv)
+
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    workers = parse_workers(args.workers) or {kind: 1 for kind in {job["kind"] for job in jobs}}
+
+    start = time.perf_counter()
+    failed = 0
+    if args.zygote:
+        from crews.zygote import Zygote
+        kinds = [kind for kind, count in workers.items() if count > 0]
+        executor = Zygote(kinds, max_concurrent=sum(workers.values()))
+    else:
+        executor = CrewPool(workers, args.max_jobs)
+    with executor as pool, open(args.out, "a", encoding="utf-8") as out:
+        for result in pool.run_jobs((job["kind"], job.get("payload", {})) for job in jobs):
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            failed += result["status"] != "done"
+            print(f"{'✅' if result['status'] == 'done' else '❌'} {result['kind']} job {result['job_id']} "
+                  f"in {result.get('seconds', 0):.1f}s (pid {result.get('worker_pid', '-')})")
+    print(f"\nRan {len(jobs)} jobs ({failed} failed) in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Deep research crew: planner, researcher, fact checker and report writer, with per-task checkpoints."""
@@ -0,0 +1,148 @@
+# crews/research/checkpoint.py
+
+"""
+Per-Task Checkpointing for Crew Runs
+------------------------------------
+Every completed TaskOutput is written to `$CREWS_HOME/checkpoints/<run_id>/`
+as soon as the task finishes. A failed run (rate limit, timeout) can then be
+resumed from the first task without a checkpoint, or replayed from any task,
+instead of paying again for the planning, research and fact-checking steps.
+"""
+
+import json
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from crewai import Crew
+from crewai.tasks.task_output import TaskOutput
+
+from crews.utils import state_path
+
+DEFAULT_CHECKPOINT_DIR = state_path("checkpoints")
+
+
+def new_run_id():
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def task_slug(task):
+    """Stable file-name friendly key for a task, e.g. 'Write Final Report' -> 'write_final_report'."""
+    return re.sub(r"[^a-z0-9]+", "_", (task.name or task.description[:40]).lower()).strip("_")
+
+
+class CheckpointStore:
+    """Local store of one run's inputs and completed task outputs, keyed by run ID."""
+
+    def __init__(self, run_id, root=DEFAULT_CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.run_dir = Path(root) / run_id
+        self._attached = []
+
+    def exists(self):
+        return (self.run_dir / "run.json").exists()
+
+    # --- Run Inputs ---
+
+    def save_inputs(self, inputs):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self._write(self.run_dir / "run.json", json.dumps({"run_id": self.run_id, "inputs": inputs}, indent=2))
+
+    def load_inputs(self):
+        return json.loads((self.run_dir / "run.json").read_text())["inputs"]
+
+    # --- Task Outputs ---
+
+    def _task_path(self, index, task):
+        return self.run_dir / f"{index + 1:02d}_{task_slug(task)}.json"
+
+    def save(self, index, task, output):
+        self._write(self._task_path(index, task), output.model_dump_json(indent=2))
+
+    def load(self, index, task):
+        path = self._task_path(index, task)
+        return TaskOutput.model_validate_json(path.read_text()) if path.exists() else None
+
+    def first_incomplete(self, tasks):
+        """Index of the first task without a checkpoint (len(tasks) if the run finished)."""
+        for index, task in enumerate(tasks):
+            if not self._task_path(index, task).exists():
+                return index
+        return len(tasks)
+
+    def attach(self, tasks):
+        """Makes every task checkpoint its own output as soon as it completes, then call its previous callback."""
+        # The context is saved too: build_resumed_crew rewrites it for the resumed tasks
+        self._attached = [(task, task.callback, task.context) for task in tasks]
+        for index, (task, callback, _) in enumerate(self._attached):
+            task.callback = lambda output, index=index, task=task, callback=callback: self._completed(
+                index, task, output, callback)
+
+    def detach(self):
+        """Restores the callbacks and context the tasks had before `attach`."""
+        for task, callback, context in self._attached:
+            task.callback = callback
+            task.context = context
+        self._attached = []
+
+    def _completed(self, index, task, output, callback):
+        self.save(index, task, output)
+        if callback:
+            callback(output)
+
+    @staticmethod
+    def _write(path, content):
+        # Write-then-rename so an interrupted run never leaves a truncated checkpoint behind
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(content)
+        tmp_path.replace(path)
+
+# --- Resuming ---
+
+def resolve_task_index(tasks, ref):
+    """Accepts a 1-based task number or a task name/slug and returns the 0-based index."""
+    if str(ref).isdigit():
+        index = int(ref) - 1
+        if 0 <= index < len(tasks):
+            return index
+    else:
+        wanted = re.sub(r"[^a-z0-9]+", "_", str(ref).lower()).strip("_")
+        for index, task in enumerate(tasks):
+            if task_slug(task) == wanted:
+                return index
+    choices = ", ".join(f"{i + 1}={task_slug(t)}" for i, t in enumerate(tasks))
+    raise ValueError(f"Unknown task '{ref}'. Choose one of: {choices}")
+
+
+def restore_outputs(tasks, store, stop_index):
+    """Sets the checkpointed outputs of the tasks before `stop_index` as their `task.output`."""
+    for index, task in enumerate(tasks[:stop_index]):
+        output = store.load(index, task)
+        if output is None:
+            raise FileNotFoundError(
+                f"Run {store.run_id} has no checkpoint for task {index + 1} ({task_slug(task)}); "
+                f"replay from an earlier task."
+            )
+        task.output = output
+
+
+def build_resumed_crew(crew, store, start_index, stop_index=None):
+    """
+    Restores checkpointed outputs for the tasks before `start_index` and returns
+    a crew that only runs the remaining tasks (up to, not including, `stop_index`).
+    Each remaining task gets all preceding tasks as explicit context, which is
+    what a sequential crew would have passed it in an uninterrupted run; the
+    store's `detach` restores the tasks' own context after the run.
+    """
+    if start_index == 0 and stop_index is None:
+        return crew
+
+    tasks = crew.tasks
+    restore_outputs(tasks, store, start_index)
+    remaining = tasks[start_index:stop_index]
+    for offset, task in enumerate(remaining):
+        task.context = tasks[:start_index + offset]
+    # Carries over long-term memory attached for this run (crews/memory.py)
+    return Crew(agents=crew.agents, tasks=remaining, process=crew.process, verbose=crew.verbose, cache=crew.cache,
+                external_memory=crew._external_memory)
@@ -0,0 +1,245 @@
+# crews/research/claims.py
+
+"""
+Claim-Level Parallel Fact Verification
+--------------------------------------
+The fact checker used to audit the whole research dump in one agent step, so
+verification got slower (and, on a small local model, sloppier) the longer
+the dump was. ClaimVerifier replaces that step with a fan-out:
+
+1. the research notes are split into chunks and the individual factual claims
+   are extracted from every chunk in parallel (one small crew run per chunk)
+2. evidence for each claim comes from the run's SourceStore first: the
+   stored snippet sentences with the most word overlap; only claims without
+   good enough evidence (misses) trigger an EXA search, whose top results are
+   read with the batch scraper and stored as well
+3. the claims are judged in parallel batches against their evidence, and the
+   verdicts are aggregated into a claim table and a per-source reliability
+   table, which become the output of the verification task
+
+Batches and chunks run on a thread pool of `max_workers`, the same way the
+content crew's ParallelBlueprintPlanner fans out, so verification time scales
+with the available concurrency rather than with the length of the notes.
+Claims the model could not judge stay "unverified" instead of failing the run.
+
+    verifier = ClaimVerifier(fact_checker, extract_cfg, verify_cfg, sources, exa_search_tool, batch_scrape_tool)
+    output = verifier.run(gathered_notes)
+    output["report"]
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai import Crew, Task
+from crewai.types.usage_metrics import UsageMetrics
+
+from crews.research.sources import normalize_url
+from crews.utils import parse_json_output
+
+VERDICTS = ("supported", "contradicted", "unverified")
+STOPWORDS = frozenset(
+    "the and for that with from this are was were has have had its their there which what when who will would "
+    "can could not but than then also more most into over such these those been being about after before per".split()
+)
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+CLAIM_HINT = re.compile(r"\d|percent|%")
+
+
+def content_words(text):
+    return {word for word in re.findall(r"[a-z0-9%]+", text.lower()) if len(word) > 2 and word not in STOPWORDS}
+
+
+def chunk_text(text, max_chars=3000):
+    """Splits notes at paragraph boundaries into chunks of at most about `max_chars`."""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        if current and len(current) + len(paragraph) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    return chunks + [current] if current.strip() else chunks
+
+
+def fallback_claims(text):
+    """Claims without the model: sentences that state numbers, dates or percentages."""
+    sentences = (sentence.strip(" -*#\t") for line in text.splitlines() for sentence in SENTENCE_SPLIT.split(line))
+    return [{"claim": sentence, "sources": re.findall(r"\[(S\d+)\]", sentence)} for sentence in sentences
+            if CLAIM_HINT.search(sentence) and 6 <= len(sentence.split()) <= 60]
+
+# --- Verifier ---
+
+class ClaimVerifier:
+    """Extracts claims, finds evidence in the source store (EXA only for misses) and judges them in parallel batches."""
+
+    def __init__(self, agent, extract_task_cfg, verify_task_cfg, sources, search_tool=None, scrape_tool=None,
+                 task_name=None, batch_size=5, max_workers=4, max_claims=40, min_overlap=0.5, evidence_per_claim=3):
+        self.sources = sources
+        self.search_tool = search_tool
+        self.scrape_tool = scrape_tool
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_claims = max_claims
+        self.min_overlap = min_overlap
+        self.evidence_per_claim = evidence_per_claim
+        self.searches = 0
+        self.token_usage = UsageMetrics()
+        self._lock = threading.Lock()
+        # Named after the task they stand in for, so budgets and usage reports attribute them to it
+        self.extract_crew = Crew(agents=[agent], tasks=[Task(
+            description=extract_task_cfg["description"], expected_output=extract_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+        self.verify_crew = Crew(agents=[agent], tasks=[Task(
+            description=verify_task_cfg["description"], expected_output=verify_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+
+    def _kickoff(self, crew, inputs):
+        result = crew.copy().kickoff(inputs=inputs)
+        with self._lock:
+            self.token_usage.add_usage_metrics(result.token_usage)
+        return result
+
+    # --- Claims ---
+
+    def _extract_chunk(self, chunk):
+        claims = []
+        try:
+            parsed = parse_json_output(self._kickoff(self.extract_crew, {"notes": chunk}).raw) or {}
+            for item in parsed.get("claims", []):
+                item = item if isinstance(item, dict) else {"claim": item}
+                claim = " ".join(str(item.get("claim", "")).split())
+                if claim:
+                    claims.append({"claim": claim, "sources": [str(ref) for ref in item.get("sources") or []]})
+        except Exception as e:  # one chunk must not fail the run; its number-bearing sentences stand in
+            print(f"⚠️  Claim extraction failed for a chunk: {type(e).__name__}: {e}", flush=True)
+            claims = []
+        return claims or fallback_claims(chunk)
+
+    def extract_claims(self, text, pool):
+        seen, claims = set(), []
+        for chunk_claims in pool.map(self._extract_chunk, chunk_text(text)):
+            for claim in chunk_claims:
+                key = " ".join(sorted(content_words(claim["claim"])))
+                if key and key not in seen:
+                    seen.add(key)
+                    claims.append(claim)
+        return claims[:self.max_claims]
+
+    # --- Evidence ---
+
+    def _stored_evidence(self, claim):
+        """Best-overlapping snippet sentences: [(overlap, record, sentence)], highest first."""
+        words = content_words(claim["claim"])
+        cited = {ref.upper() for ref in claim["sources"]}
+        scored = []
+        for record in self.sources.records():
+            for sentence in SENTENCE_SPLIT.split(self.sources.snippet(record)):
+                overlap = len(words & content_words(sentence)) / (len(words) or 1)
+                if overlap > 0:
+                    # Sources the notes cite for the claim are preferred among equally good matches
+                    scored.append((overlap + (0.05 if record["id"] in cited else 0.0), record, sentence))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:self.evidence_per_claim]
+
+    def _search(self, claim):
+        before = {record["url"] for record in self.sources.records()}
+        try:
+            results = self.search_tool.run(search_query=claim["claim"][:200])
+            # Only this search's results: other claims' searches add to the same store at the same time
+            new_urls = [result.url for result in getattr(results, "results", None) or []
+                        if normalize_url(result.url) and normalize_url(result.url) not in before]
+            if new_urls and self.scrape_tool is not None:
+                self.scrape_tool.run(website_urls=new_urls[:2])
+        except Exception as e:  # a failed lookup leaves the claim unverified, it does not fail the run
+            print(f"⚠️  Evidence search failed for claim {claim['claim'][:60]!r}: {type(e).__name__}: {e}",
+                  flush=True)
+        with self._lock:
+            self.searches += 1
+
+    def evidence(self, claim):
+        evidence = self._stored_evidence(claim)
+        if self.search_tool is not None and (not evidence or evidence[0][0] < self.min_overlap):
+            self._search(claim)
+            evidence = self._stored_evidence(claim)
+        return [{"source": record["id"], "credibility": record["credibility"], "text": sentence[:400]}
+                for _, record, sentence in evidence]
+
+    # --- Verdicts ---
+
+    def verify_batch(self, batch):
+        """Judges one batch of (id, claim) pairs; claims without a usable verdict stay unverified."""
+        for _, claim in batch:
+            claim["evidence"] = self.evidence(claim)
+        lines = []
+        for claim_id, claim in batch:
+            lines.append(f"{claim_id}. {claim['claim']}")
+            lines += [f"   - [{item['source']}] (credibility {item['credibility']}) {item['text']}"
+                      for item in claim["evidence"]] or ["   - (no evidence found)"]
+        verdicts, error = {}, None
+        if any(claim["evidence"] for _, claim in batch):
+            try:
+                parsed = parse_json_output(self._kickoff(self.verify_crew, {"claims": "\n".join(lines)}).raw) or {}
+                for item in parsed.get("verdicts", []):
+                    if isinstance(item, dict) and str(item.get("id", "")).isdigit():
+                        verdicts[int(item["id"])] = item
+            except Exception as e:  # the batch stays unverified; the other batches still count
+                print(f"⚠️  Claim verification failed for a batch: {type(e).__name__}: {e}", flush=True)
+                verdicts, error = {}, f"verification failed: {type(e).__name__}: {e}"
+        for claim_id, claim in batch:
+            verdict = verdicts.get(claim_id, {})
+            claim["verdict"] = verdict.get("verdict") if verdict.get("verdict") in VERDICTS else "unverified"
+            try:
+                claim["confidence"] = round(min(1.0, max(0.0, float(verdict.get("confidence", 0.0)))), 2)
+            except (TypeError, ValueError):
+                claim["confidence"] = 0.0
+            evidence_ids = [item["source"] for item in claim["evidence"]]
+            claim["sources"] = [ref for ref in verdict.get("sources") or evidence_ids if ref in evidence_ids] or \
+                evidence_ids
+            claim["note"] = str(verdict.get("note", "")) if verdict else error or "no usable verdict"
+        return batch
+
+    def run(self, text):
+        """Verifies the claims in `text`; returns {claims, sources, searches, report}."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            claims = self.extract_claims(text, pool)
+            numbered = list(enumerate(claims, start=1))
+            batches = [numbered[i:i + self.batch_size] for i in range(0, len(numbered), self.batch_size)]
+            list(pool.map(self.verify_batch, batches))
+        reliability = self.source_reliability(claims)
+        return {"claims": claims, "sources": reliability, "searches": self.searches,
+                "report": format_verification(claims, reliability, self.searches)}
+
+    def source_reliability(self, claims):
+        """Per source: its credibility and how many claims it supported or contradicted."""
+        rows = {}
+        for claim in claims:
+            for ref in claim["sources"]:
+                record = self.sources.get(ref)
+                if record is None:
+                    continue
+                row = rows.setdefault(ref, {"source": ref, "title": record["title"] or record["url"],
+                                            "credibility": record["credibility"], "supported": 0, "contradicted": 0})
+                if claim["verdict"] in ("supported", "contradicted"):
+                    row[claim["verdict"]] += 1
+        return sorted(rows.values(), key=lambda row: int(row["source"][1:]))
+
+
+def _cell(text):
+    return " ".join(str(text).replace("|", "/").split()) or "-"
+
+
+def format_verification(claims, reliability, searches=0):
+    counts = {verdict: sum(claim["verdict"] == verdict for claim in claims) for verdict in VERDICTS}
+    lines = [f"Claim verification: {len(claims)} claims, {counts['supported']} supported, "
+             f"{counts['contradicted']} contradicted, {counts['unverified']} unverified "
+             f"({searches} web searches for claims without stored evidence).", "",
+             "| # | Claim | Verdict | Confidence | Sources | Note |", "|---|---|---|---|---|---|"]
+    for number, claim in enumerate(claims, start=1):
+        sources = ", ".join(f"[{ref}]" for ref in claim["sources"]) or "-"
+        lines.append(f"| {number} | {_cell(claim['claim'])} | {claim['verdict']} | {claim['confidence']} | "
+                     f"{sources} | {_cell(claim['note'])} |")
+    lines += ["", "Source reliability:", "", "| Source | Title | Credibility | Supporting | Contradicting |",
+              "|---|---|---|---|---|"]
+    lines += [f"| [{row['source']}] | {_cell(row['title'])} | {row['credibility']} | {row['supported']} | "
+              f"{row['contradicted']} |" for row in reliability]
+    return "\n".join(lines)
@@ -0,0 +1,260 @@
+# crews/research/crew.py
+
+import os
+from crewai import Agent, Task, Crew
+from crewai.tasks.task_output import TaskOutput
+
+# Importing custom utilities
+from crews.patch import disable_ssl_verification
+from crews.utils import get_openai_api_key, get_exa_api_key, definition_file, load_md_content
+from crews.model_router import resolve_model
+from crews.tool_memo import memoized
+from crews.resilience import resilient
+from crews.research.sources import (
+    RecordingBatchScrapeTool, RecordingEXASearchTool, SourceLookupTool, SourceStore, strip_artifact, with_bibliography
+)
+from crews.research.claims import ClaimVerifier
+from crews.research.synthesis import ReportSynthesizer
+from crews.research.checkpoint import (
+    CheckpointStore, new_run_id, resolve_task_index, build_resumed_crew, restore_outputs
+)
+
+# --- Environment Setup ---
+disable_ssl_verification()
+
+os.environ["CREWAI_TESTING"] = "true"
+os.environ["MODEL"] = "Llama-3.2-3B-Instruct-Q4_K_M"  # default for agents without a **Model:** tier override
+os.environ["OPENAI_API_KEY"] = get_openai_api_key()
+os.environ["EXA_API_KEY"] = get_exa_api_key()
+
+# --- Tool Initialization ---
+# Memoized per run: the researcher and fact checker often repeat each other's searches and scrapes
+# Both record what they find in the run's source store (crews/research/sources.py)
+# Searches are retried, timed out and hedged inside a job's Resilience (crews/resilience.py)
+exa_search_tool = memoized(resilient(RecordingEXASearchTool, "exa"))(base_url=os.getenv("EXA_BASE_URL"))
+# One agent step reads all the URLs a search returned, fetched concurrently
+batch_scrape_tool = memoized(RecordingBatchScrapeTool)()
+# Lets the fact checker verify against stored snippets instead of fetching pages again
+source_lookup_tool = SourceLookupTool()
+
+# --- Load Configurations ---
+# Agents
+planner_cfg = load_md_content(definition_file(__package__, "agent_definitions/research_planner.md"))
+researcher_cfg = load_md_content(definition_file(__package__, "agent_definitions/researcher.md"))
+checker_cfg = load_md_content(definition_file(__package__, "agent_definitions/fact_checker.md"))
+writer_cfg = load_md_content(definition_file(__package__, "agent_definitions/report_writer.md"))
+
+# Tasks
+plan_task_cfg = load_md_content(definition_file(__package__, "task_definitions/create_research_plan.md"))
+data_task_cfg = load_md_content(definition_file(__package__, "task_definitions/gather_research_data.md"))
+verify_task_cfg = load_md_content(definition_file(__package__, "task_definitions/verify_information_quality.md"))
+report_task_cfg = load_md_content(definition_file(__package__, "task_definitions/write_final_report.md"))
+extract_claims_cfg = load_md_content(definition_file(__package__, "task_definitions/extract_claims.md"))
+verify_claims_cfg = load_md_content(definition_file(__package__, "task_definitions/verify_claims.md"))
+summarize_section_cfg = load_md_content(definition_file(__package__, "task_definitions/summarize_section.md"))
+compose_report_cfg = load_md_content(definition_file(__package__, "task_definitions/compose_report.md"))
+
+# --- Agent Definitions ---
+research_planner = Agent(
+    role=planner_cfg["role"],
+    goal=planner_cfg["goal"],
+    backstory=planner_cfg["backstory"],
+    llm=resolve_model(planner_cfg["model"]),
+    verbose=True,
+    max_iter=2,
+    max_rpm=10,
+    allow_delegation=False
+)
+
+researcher = Agent(
+    role=researcher_cfg["role"],
+    goal=researcher_cfg["goal"],
+    backstory=researcher_cfg["backstory"],
+    llm=resolve_model(researcher_cfg["model"]),
+    tools=[exa_search_tool, batch_scrape_tool],
+    verbose=True,
+    max_iter=2,
+    max_rpm=10,
+    allow_delegation=False
+)
+
+fact_checker = Agent(
+    role=checker_cfg["role"],
+    goal=checker_cfg["goal"],
+    backstory=checker_cfg["backstory"],
+    llm=resolve_model(checker_cfg["model"]),
+    tools=[source_lookup_tool, exa_search_tool, batch_scrape_tool],
+    verbose=True,
+    max_iter=2,
+    max_rpm=10,
+    allow_delegation=False
+)
+
+report_writer = Agent(
+    role=writer_cfg["role"],
+    goal=writer_cfg["goal"],
+    backstory=writer_cfg["backstory"],
+    llm=resolve_model(writer_cfg["model"]),
+    verbose=True,
+    max_iter=2,
+    max_rpm=10,
+    allow_delegation=False
+)
+
+# --- Task Definitions ---
+create_research_plan_task = Task(
+    description=plan_task_cfg["description"],
+    expected_output=plan_task_cfg["expected_output"],
+    agent=research_planner,
+    name="Create Research Plan"
+)
+
+gather_research_data_task = Task(
+    description=data_task_cfg["description"],
+    expected_output=data_task_cfg["expected_output"],
+    agent=researcher,
+    name="Gather Research Data"
+)
+
+verify_information_quality_task = Task(
+    description=verify_task_cfg["description"],
+    expected_output=verify_task_cfg["expected_output"],
+    agent=fact_checker,
+    name="Verify Information Quality"
+)
+
+write_final_report_task = Task(
+    description=report_task_cfg["description"],
+    expected_output=report_task_cfg["expected_output"],
+    agent=report_writer,
+    name="Write Final Report"
+)
+
+# --- Crew Execution ---
+deep_research_crew = Crew(
+    agents=[research_planner, researcher, fact_checker, report_writer],
+    tasks=[
+        create_research_plan_task, 
+        gather_research_data_task, 
+        verify_information_quality_task, 
+        write_final_report_task
+    ],
+    cache=False  # CrewAI's crew-wide tool cache outlives the run; tool results are memoized per run instead
+)
+
+DEFAULT_QUERY = "The impact of generative AI on software engineering productivity in 2025"
+VERIFY_INDEX = deep_research_crew.tasks.index(verify_information_quality_task)
+REPORT_INDEX = deep_research_crew.tasks.index(write_final_report_task)
+
+
+def run_until(store, start_index, stop_index, inputs):
+    """Runs the tasks from `start_index` up to `stop_index`, or only restores their outputs if there are none."""
+    if start_index < stop_index:
+        build_resumed_crew(deep_research_crew, store, start_index, stop_index).kickoff(inputs=inputs)
+    else:
+        restore_outputs(deep_research_crew.tasks, store, stop_index)
+
+
+def complete_task(task, raw):
+    """
+    Makes `raw` the output of `task`, for steps that run outside the crew. It
+    goes through the task's callbacks (source table, checkpoint, budget) like
+    a crew-run output would.
+    """
+    output = TaskOutput(description=task.description, raw=raw, agent=task.agent.role, name=task.name)
+    task.output = output
+    if task.callback:
+        task.callback(output)
+    return output
+
+
+def verify_claims(sources, max_workers=4):
+    """Claim-level verification (crews/research/claims.py), standing in for the fact checker's single agent step."""
+    verifier = ClaimVerifier(
+        fact_checker, extract_claims_cfg, verify_claims_cfg, sources, exa_search_tool, batch_scrape_tool,
+        task_name=verify_information_quality_task.name, max_workers=max_workers
+    )
+    verification = verifier.run(gather_research_data_task.output.raw)
+    complete_task(verify_information_quality_task, verification["report"])
+    return {key: value for key, value in verification.items() if key != "report"}
+
+
+def synthesize_report(inputs, max_workers=4):
+    """Map-reduce synthesis (crews/research/synthesis.py), standing in for the report writer's single agent step."""
+    synthesizer = ReportSynthesizer(
+        report_writer, summarize_section_cfg, compose_report_cfg, task_name=write_final_report_task.name,
+        max_workers=max_workers
+    )
+    synthesis = synthesizer.run(inputs["user_query"], strip_artifact(gather_research_data_task.output.raw),
+                                strip_artifact(verify_information_quality_task.output.raw))
+    output = complete_task(write_final_report_task, synthesis["report"])
+    return output, dict({key: value for key, value in synthesis.items() if key != "report"},
+                        failed_sections=synthesizer.failed_sections)
+
+
+def run_job(user_query=None, run_id=None, resume=False, replay_from=None, parallel_verify=False, map_reduce=False,
+            max_workers=4):
+    """
+    Entry point for the CLI and pooled workers: one checkpointed research run,
+    returned as plain data. With `resume`/`replay_from` the run continues from
+    the checkpoints of `run_id` instead of starting over. With `parallel_verify`
+    the claims are verified in parallel batches instead of by one agent step,
+    with `map_reduce` the report is composed from parallel section summaries.
+    """
+    tasks = deep_research_crew.tasks
+    if resume or replay_from:
+        if not run_id:
+            raise ValueError("resume and replay_from need the run_id of an earlier run")
+        store = CheckpointStore(run_id)
+        if not store.exists():
+            raise ValueError(f"No checkpoints found for run {run_id}")
+        inputs = store.load_inputs()
+        if user_query:
+            inputs["user_query"] = user_query
+        start_index = resolve_task_index(tasks, replay_from) if replay_from else store.first_incomplete(tasks)
+    else:
+        store = CheckpointStore(run_id or new_run_id())
+        inputs = {"user_query": user_query or DEFAULT_QUERY}
+        start_index = 0
+
+    sources = SourceStore(store.run_dir / "sources.json")
+    if start_index == len(tasks):
+        # Already completed: nothing to pay for, hand back the stored report
+        final = store.load(len(tasks) - 1, tasks[-1])
+        return {"run_id": store.run_id, "start_task": None, "report": with_bibliography(final.raw, sources),
+                "sources": sources.records(), "verification": None, "synthesis": None, "crew_output": None}
+
+    store.save_inputs(inputs)
+    store.attach(tasks)
+    # Attached last, so the source table is in the outputs before they are checkpointed
+    sources.attach(tasks, artifact_tasks=(gather_research_data_task, verify_information_quality_task))
+    first_task, verification, synthesis = start_index, None, None
+    try:
+        with sources:
+            if parallel_verify and start_index <= VERIFY_INDEX:
+                run_until(store, start_index, VERIFY_INDEX, inputs)
+                verification = verify_claims(sources, max_workers)
+                start_index = VERIFY_INDEX + 1
+            if map_reduce:
+                run_until(store, start_index, REPORT_INDEX, inputs)
+                result, synthesis = synthesize_report(inputs, max_workers)
+            else:
+                result = build_resumed_crew(deep_research_crew, store, start_index).kickoff(inputs=inputs)
+    finally:
+        sources.detach()
+        store.detach()
+    return {"run_id": store.run_id, "start_task": first_task + 1, "report": with_bibliography(result.raw, sources),
+            "sources": sources.records(), "verification": verification, "synthesis": synthesis, "crew_output": result}
+
+
+def format_output(output):
+    """Renders a (serialized) run_job result for the terminal."""
+    started = f"started at task {output['start_task']}" if output["start_task"] else "already completed"
+    if output.get("verification"):
+        verdicts = [claim["verdict"] for claim in output["verification"]["claims"]]
+        started += (f"; {len(verdicts)} claims verified in parallel, {verdicts.count('supported')} supported, "
+                    f"{verdicts.count('contradicted')} contradicted")
+    if output.get("synthesis"):
+        started += (f"; report composed from {output['synthesis']['sections']} section summaries "
+                    f"in {output['synthesis']['rounds']} round(s)")
+    return f"### Run ID: {output['run_id']} ({started}) ###\n\n" + "=" * 50 + "\nFINAL REPORT\n" + "=" * 50 + f"\n{output['report']}"
@@ -0,0 +1,300 @@
+# crews/research/sources.py
+
+"""
+Research Source Store
+---------------------
+The researcher, the fact checker and the report writer used to pass findings
+and source URLs to each other as prose, so the fact checker had to re-read and
+re-search what the researcher had already fetched, and the bibliography was
+whatever the writer remembered. A SourceStore records every source the
+research tools touch, once per normalized URL:
+
+    {"id": "S3", "url": "https://owasp.org/top10", "title": "...",
+     "snippet_hash": "9f2c...", "credibility": 0.9, "topic": "<search query>"}
+
+- URLs are normalized (scheme/host case, "www.", fragments, tracking
+  parameters, trailing slashes), so the same page found twice is one source
+- snippets (EXA result text, scraped page text) are stored once by hash
+- credibility is a domain heuristic (0-1), see CREDIBILITY_RULES
+
+During a run, the research and verification outputs get the compact source
+table appended, the fact checker reads stored snippets by id with
+SourceLookupTool instead of fetching pages again, and the final report's
+bibliography is generated from the store. The store is saved next to the
+run's checkpoints, so resumed runs keep their sources.
+
+    with SourceStore(path) as sources:
+        sources.attach(tasks, artifact_tasks)
+        ...
+    report = with_bibliography(report, sources)
+"""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import List, Type
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from crewai.tools import BaseTool
+from crewai_tools import EXASearchTool
+from pydantic import BaseModel, Field
+
+from crews.batch_scrape import BatchScrapeTool
+
+MAX_SNIPPET_CHARS = 2000
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref_src)$", re.I)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# (host pattern, score); first match wins
+CREDIBILITY_RULES = [
+    (re.compile(r"\.(gov|mil|edu|int)$|\.(gov|ac|edu)\.[a-z]{2}$"), 0.9),
+    (re.compile(r"(^|\.)(owasp\.org|nist\.gov|arxiv\.org|acm\.org|ieee\.org|nature\.com|science\.org|"
+                r"oecd\.org|europa\.eu)$"), 0.9),
+    (re.compile(r"(^|\.)(wikipedia\.org|github\.com|reuters\.com|apnews\.com|bbc\.co\.uk|nytimes\.com|"
+                r"ft\.com|economist\.com|mckinsey\.com|gartner\.com)$"), 0.7),
+    (re.compile(r"(^|\.)(medium\.com|substack\.com|reddit\.com|quora\.com|blogspot\.com|wordpress\.com|"
+                r"x\.com|twitter\.com|facebook\.com|linkedin\.com|youtube\.com)$"), 0.3),
+]
+DEFAULT_CREDIBILITY = 0.5
+
+ARTIFACT_TITLE = "Sources (cite as [id]; read stored snippets with the stored source tool):"
+BIBLIOGRAPHY_HEADING = re.compile(r"^#{1,6}\s*\**\s*(bibliography|references|sources|works cited)\b.*$", re.I | re.M)
+CITATION = re.compile(r"\[(S\d+)\]")
+
+_active_store = None
+_active_lock = threading.Lock()
+
+
+def normalize_url(url):
+    """Canonical form of a URL for deduplication; '' for anything that is not an http(s) URL."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return ""
+    host = parts.hostname.lower().removeprefix("www.")
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(key)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def credibility_score(url):
+    host = urlsplit(url).hostname or ""
+    score = next((score for pattern, score in CREDIBILITY_RULES if pattern.search(host)), DEFAULT_CREDIBILITY)
+    return round(score - (0.1 if url.startswith("http://") else 0.0), 2)
+
+
+def snippet_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+# --- Store ---
+
+class SourceStore:
+    """Deduplicated sources of one research run, with their snippets stored once by hash."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.sources = {}   # normalized URL -> record
+        self.snippets = {}  # snippet hash -> text
+        self._lock = threading.Lock()
+        self._previous = None
+        self._attached = []
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.sources = {record["url"]: record for record in data["sources"]}
+            self.snippets = data["snippets"]
+
+    def __len__(self):
+        return len(self.sources)
+
+    def add(self, url, title="", snippet="", topic=""):
+        """Records a source (or enriches the known one); returns its record, or None for a non-web URL."""
+        key = normalize_url(url)
+        if not key:
+            return None
+        snippet = " ".join(snippet.split())[:MAX_SNIPPET_CHARS]
+        with self._lock:
+            record = self.sources.get(key)
+            if record is None:
+                record = self.sources[key] = {
+                    "id": f"S{len(self.sources) + 1}", "url": key, "title": "", "snippet_hash": None,
+                    "credibility": credibility_score(key), "topic": topic,
+                }
+            record["title"] = record["title"] or " ".join(title.split())
+            record["topic"] = record["topic"] or topic
+            # Keep the longest snippet seen for a source
+            if len(snippet) > len(self.snippets.get(record["snippet_hash"], "")):
+                old_hash, record["snippet_hash"] = record["snippet_hash"], snippet_hash(snippet)
+                self.snippets[record["snippet_hash"]] = snippet
+                if old_hash and all(other["snippet_hash"] != old_hash for other in self.sources.values()):
+                    del self.snippets[old_hash]
+        return record
+
+    def capture_search(self, results, query=""):
+        """Records the results of an EXA search (a SearchResponse)."""
+        for result in getattr(results, "results", None) or []:
+            snippet = result.text or result.summary or " ".join(result.highlights or [])
+            self.add(result.url, result.title or "", snippet or "", topic=query)
+
+    def capture_pages(self, pages, topic=""):
+        """Records pages read by BatchScrapeTool ({url, title, text, error} dicts)."""
+        for page in pages:
+            if not page["error"]:
+                self.add(page["url"], page["title"], page["text"], topic=topic)
+
+    def get(self, ref):
+        """The record for a source id ('S3') or URL, or None."""
+        ref = ref.strip().strip("[]")
+        if re.fullmatch(r"S\d+", ref, re.I):
+            return next((record for record in self.sources.values() if record["id"] == ref.upper()), None)
+        return self.sources.get(normalize_url(ref))
+
+    def snippet(self, record):
+        return self.snippets.get(record["snippet_hash"], "")
+
+    def records(self):
+        with self._lock:
+            records = list(self.sources.values())
+        return sorted(records, key=lambda record: int(record["id"][1:]))
+
+    # --- Artifacts ---
+
+    def artifact(self):
+        """Compact source table that travels with the task outputs."""
+        lines = [ARTIFACT_TITLE, "id | credibility | topic | title | url"]
+        lines += [f"{record['id']} | {record['credibility']} | {record['topic'] or '-'} | "
+                  f"{record['title'] or '-'} | {record['url']}" for record in self.records()]
+        return "\n".join(lines)
+
+    def bibliography(self, cited=None):
+        """Numbered by source id; limited to the `cited` ids when the report cites any."""
+        records = [record for record in self.records() if not cited or record["id"] in cited]
+        return "\n".join(f"- [{record['id']}] {record['title'] or record['url']}. {record['url']}"
+                         for record in records)
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        records = self.records()
+        with self._lock:
+            snippets = dict(self.snippets)
+        data = json.dumps({"sources": records, "snippets": snippets}, indent=2)
+        # Write-then-rename, like the checkpoints next to it
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(data)
+        tmp_path.replace(self.path)
+
+    # --- Task Wiring ---
+
+    def attach(self, tasks, artifact_tasks=()):
+        """Saves the store after every task and appends the source table to the outputs of `artifact_tasks`."""
+        self._attached = [(task, task.callback) for task in tasks]
+        with_artifact = {id(task) for task in artifact_tasks}
+        for task, callback in self._attached:
+            task.callback = lambda output, task=task, callback=callback: self._completed(
+                output, id(task) in with_artifact, callback)
+
+    def detach(self):
+        for task, callback in self._attached:
+            task.callback = callback
+        self._attached = []
+
+    def _completed(self, output, with_artifact, callback):
+        # The next task's context is built from this same output object, after the callback ran
+        if with_artifact and self.sources:
+            output.raw = f"{output.raw}\n\n{self.artifact()}"
+        self.save()
+        if callback:
+            callback(output)
+
+    def __enter__(self):
+        global _active_store
+        with _active_lock:
+            self._previous, _active_store = _active_store, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_store
+        with _active_lock:
+            _active_store = self._previous
+        return False
+
+
+def active_sources():
+    return _active_store
+
+
+def strip_artifact(text):
+    """A task output without the source table `attach` appended to it."""
+    return text.split(f"\n\n{ARTIFACT_TITLE}", 1)[0]
+
+
+def with_bibliography(report, sources):
+    """Replaces the writer's own bibliography (if any) with one generated from the source store."""
+    if not sources:
+        return report
+    heading = BIBLIOGRAPHY_HEADING.search(report)
+    body = report[:heading.start()] if heading else report
+    cited = set(CITATION.findall(body))
+    return f"{body.rstrip()}\n\n## Bibliography\n\n{sources.bibliography(cited)}"
+
+# --- CrewAI Tools ---
+
+class RecordingEXASearchTool(EXASearchTool):
+    """EXASearchTool that records its results in the active SourceStore."""
+
+    def _run(self, search_query, **kwargs):
+        results = super()._run(search_query, **kwargs)
+        if active_sources() is not None:
+            active_sources().capture_search(results, search_query)
+        return results
+
+
+class RecordingBatchScrapeTool(BatchScrapeTool):
+    """BatchScrapeTool that records the pages it read in the active SourceStore."""
+
+    def _digest(self, pages, dropped):
+        if active_sources() is not None:
+            active_sources().capture_pages(pages)
+        return super()._digest(pages, dropped)
+
+
+class SourceLookupToolSchema(BaseModel):
+    """Input for SourceLookupTool."""
+
+    source_ids: List[str] = Field(
+        ..., description="Source ids from the source table (e.g. ['S1', 'S4']) or URLs; [] lists all sources"
+    )
+
+
+class SourceLookupTool(BaseTool):
+    name: str = "Read stored sources"
+    description: str = (
+        "Returns the stored snippets of sources this run already found, by source id or URL, "
+        "without fetching them again. Use it to check claims before searching the web."
+    )
+    args_schema: Type[BaseModel] = SourceLookupToolSchema
+
+    def _run(self, source_ids: List[str]) -> str:
+        sources = active_sources()
+        if sources is None or not sources:
+            return "No sources have been stored in this run yet."
+        if isinstance(source_ids, str):
+            source_ids = re.split(r"[\s,]+", source_ids)
+        if not [ref for ref in source_ids if ref.strip()]:
+            return sources.artifact()
+        sections = []
+        for ref in source_ids:
+            record = sources.get(ref)
+            if record is None:
+                sections.append(f"## {ref}\nNot a stored source; search for it instead.")
+                continue
+            snippet = sources.snippet(record) or "(no snippet stored)"
+            sections.append(f"## [{record['id']}] {record['title'] or '-'} (credibility {record['credibility']})\n"
+                            f"{record['url']}\n\n{snippet}")
+        return "\n\n".join(sections)
@@ -0,0 +1,145 @@
+# crews/research/synthesis.py
+
+"""
+Map-Reduce Report Synthesis
+---------------------------
+The report writer used to get the whole gathered dataset and verification
+report in one context, so the final step got slower with every source and a
+small local model silently truncated what did not fit. ReportSynthesizer
+writes the report in two phases instead:
+
+1. map: the research notes are split into their topic sections (markdown
+   headings; paragraphs for notes without them) plus the verification
+   findings, and every section is summarized in parallel by a small crew run
+2. reduce: the executive summary and the final report are composed from the
+   section summaries, which are fitted into a fixed `context_chars` budget;
+   while they do not fit, neighbouring summaries are merged and summarized
+   again (one more map round), so the final step's context stays the same
+   size however much was researched
+
+Citations ([S#]) are kept through both phases; the bibliography is not left to
+the model but generated from the source store (see sources.with_bibliography).
+A section whose summary fails falls back to its own opening text, trimmed to
+size, rather than failing the run.
+
+    synthesizer = ReportSynthesizer(report_writer, summarize_cfg, compose_cfg, task_name="Write Final Report")
+    output = synthesizer.run(query, notes, verification)
+    output["report"]
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai import Crew, Task
+from crewai.types.usage_metrics import UsageMetrics
+
+from crews.research.claims import chunk_text
+
+HEADING = re.compile(r"^\s*(#{1,4}\s+.+|\*\*[^*\n]{3,80}\*\*:?)\s*$", re.M)
+
+
+def split_sections(text, max_chars=6000, title="Research notes"):
+    """[(topic, text)] by markdown headings (or bold title lines); oversized sections are split into parts."""
+    headings = list(HEADING.finditer(text))
+    if not headings:
+        sections = [(title, text)]
+    else:
+        sections = [(title, text[:headings[0].start()])]
+        for heading, following in zip(headings, headings[1:] + [None]):
+            end = following.start() if following else len(text)
+            sections.append((heading.group(1).strip("#* :"), text[heading.end():end]))
+    parts = []
+    for title, body in sections:
+        chunks = [chunk for chunk in chunk_text(body.strip(), max_chars) if chunk.strip()]
+        parts += [(title if len(chunks) == 1 else f"{title} (part {number})", chunk)
+                  for number, chunk in enumerate(chunks, start=1)]
+    return parts
+
+
+def trim_text(text, max_chars):
+    """`text` cut at a word boundary to at most about `max_chars` characters."""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + " ..."
+
+
+def fit_summaries(summaries, context_chars):
+    """Joins (topic, summary) pairs, giving each an equal share of `context_chars`."""
+    share = context_chars // max(1, len(summaries))
+    return "\n\n".join(f"## {topic}\n{trim_text(summary, share)}" for topic, summary in summaries)
+
+# --- Synthesizer ---
+
+class ReportSynthesizer:
+    """Summarizes topic sections in parallel, then composes the report from the summaries within a fixed budget."""
+
+    def __init__(self, agent, summarize_task_cfg, compose_task_cfg, task_name=None, max_workers=4,
+                 section_chars=6000, summary_chars=1200, context_chars=12000, max_rounds=3):
+        self.max_workers = max_workers
+        self.section_chars = section_chars
+        self.summary_chars = summary_chars
+        self.context_chars = context_chars
+        self.max_rounds = max_rounds
+        self.failed_sections = []
+        self.token_usage = UsageMetrics()
+        self._lock = threading.Lock()
+        # Named after the task they stand in for, so budgets and usage reports attribute them to it
+        self.summarize_crew = Crew(agents=[agent], tasks=[Task(
+            description=summarize_task_cfg["description"], expected_output=summarize_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+        self.compose_crew = Crew(agents=[agent], tasks=[Task(
+            description=compose_task_cfg["description"], expected_output=compose_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+
+    def _kickoff(self, crew, inputs):
+        result = crew.copy().kickoff(inputs=inputs)
+        with self._lock:
+            self.token_usage.add_usage_metrics(result.token_usage)
+        return result
+
+    # --- Map ---
+
+    def summarize(self, query, topic, text):
+        try:
+            summary = self._kickoff(self.summarize_crew, {"user_query": query, "topic": topic, "section": text}).raw
+        except Exception as e:  # one section must not fail the report; its opening text stands in
+            print(f"⚠️  Could not summarize section {topic!r}: {type(e).__name__}: {e}", flush=True)
+            with self._lock:
+                self.failed_sections.append(topic)
+            summary = ""
+        return topic, trim_text(summary or text, self.summary_chars)
+
+    def summarize_all(self, query, sections, pool):
+        return list(pool.map(lambda section: self.summarize(query, *section), sections))
+
+    def merge_round(self, query, summaries, pool):
+        """Merges neighbouring summaries into groups of about `context_chars` and summarizes each group again."""
+        groups, current, size = [], [], 0
+        for topic, summary in summaries:
+            if current and size + len(summary) > self.context_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append((topic, summary))
+            size += len(summary)
+        groups.append(current)
+        merged = [(" / ".join(topic for topic, _ in group), fit_summaries(group, self.context_chars))
+                  for group in groups]
+        return self.summarize_all(query, merged, pool)
+
+    # --- Reduce ---
+
+    def run(self, query, notes, verification=""):
+        """Writes the report on `query` from the research notes and verification; returns {report, sections, ...}."""
+        sections = split_sections(notes, self.section_chars)
+        sections += split_sections(verification, self.section_chars, title="Verification findings")
+        rounds = 1
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            summaries = self.summarize_all(query, sections, pool)
+            while sum(len(summary) for _, summary in summaries) > self.context_chars and rounds < self.max_rounds:
+                summaries = self.merge_round(query, summaries, pool)
+                rounds += 1
+        context = fit_summaries(summaries, self.context_chars)
+        report = self._kickoff(self.compose_crew, {"user_query": query, "summaries": context}).raw
+        return {"report": report, "sections": len(sections), "rounds": rounds, "context_chars": len(context)}
@@ -0,0 +1,353 @@
+# crews/resilience.py
+
+"""
+Retries, Circuit Breakers and Hedged Calls
+------------------------------------------
+One transient failure of the model endpoint or of Serper/EXA (a dropped
+connection, a 429, a 503) used to fail the whole `kickoff()`, and the job was
+run again from the start. While a Resilience is active, every model request
+and every network tool call goes through it:
+
+- transient failures (connection errors, timeouts, 408/425/429/5xx) are
+  retried with exponential backoff and full jitter; other errors (a 400, a
+  bad tool argument) are raised at once
+- each call has a timeout; a call that does not answer in time counts as a
+  transient failure (its thread is abandoned, not killed)
+- one circuit breaker per provider (model endpoint host, "serper", "exa"):
+  after `failure_threshold` transient failures in a row it opens and calls
+  fail fast with CircuitOpenError for `reset_s`, then one trial call decides
+  whether it closes again. Breakers live as long as the process, so a warm
+  worker does not hammer a provider that failed the previous job
+- hedged requests: a call still running after the provider's observed p95
+  latency gets a second, identical request and the first answer wins. On by
+  default for tools (searches are idempotent and cheap); for the model it is
+  opt-in, since a hedge is billed twice
+
+Models are wrapped at their OpenAI client (`resilient_llms`), below CrewAI's
+LLM events and token counters, so a retried or hedged request is still one
+LLM call in the accounting and only the winning answer's tokens are counted.
+The client's own retries are turned off; this layer owns them. Tools are
+wrapped like the memoized ones (`memoized(resilient(SerperDevTool, "serper"))`,
+memo outside, so coalesced calls share one resilient call). Outside a
+Resilience both run as usual.
+
+    with Resilience({"llm": {"hedge": True}}) as resilience:
+        crew.kickoff(inputs=...)
+    print(format_resilience(resilience.report()))
+"""
+
+import contextvars
+import functools
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import ClassVar
+
+import httpx
+import openai
+import requests
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError, requests.ConnectionError,
+                    requests.Timeout, openai.APIConnectionError)
+
+DEFAULT_POLICIES = {
+    "llm": {"retries": 3, "base_delay_s": 1.0, "max_delay_s": 20.0, "timeout_s": 300.0, "hedge": False},
+    "tool": {"retries": 2, "base_delay_s": 0.5, "max_delay_s": 8.0, "timeout_s": 60.0, "hedge": True},
+}
+BREAKER_DEFAULTS = {"failure_threshold": 5, "reset_s": 30.0}
+HEDGE_QUANTILE = 0.95
+MIN_HEDGE_SAMPLES = 20   # no hedging until a provider's tail latency is known
+MIN_HEDGE_DELAY_S = 0.5  # never hedge calls that are fast anyway
+LATENCY_WINDOW = 200
+
+_active_resilience = None
+_active_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """A call refused because its provider's circuit breaker is open."""
+
+
+def status_code(error):
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient(error):
+    """Whether `error` is worth retrying: connection problems, timeouts, rate limits and server errors."""
+    return isinstance(error, TRANSIENT_ERRORS) or status_code(error) in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt, base_delay_s=0.5, max_delay_s=8.0):
+    """Seconds to wait before retry `attempt` (0-based): exponential, capped, with full jitter."""
+    return random.uniform(0, min(max_delay_s, base_delay_s * 2 ** attempt))
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (0 for none)."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+# --- Circuit Breakers ---
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` transient failures in a row; lets one trial call through after `reset_s`."""
+
+    def __init__(self, provider, failure_threshold=5, reset_s=30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_s else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self.trial = 0, None, False
+
+    def record_failure(self):
+        """Counts a transient failure; returns True if it opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            reopened = self.trial
+            self.trial = False
+            if reopened or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+# Process-wide, like the provider they protect; the latency window feeds the hedge delay
+_breakers = {}
+_latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_breakers_lock = threading.Lock()
+
+
+def breaker(provider, **options):
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider, **(BREAKER_DEFAULTS | options))
+        return _breakers[provider]
+
+
+def _start(run):
+    """Runs `run()` on a daemon thread, so an abandoned (timed out or hedged) call never blocks exit."""
+    future = Future()
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            future.set_result(context.run(run))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name="resilient-call", daemon=True).start()
+    return future
+
+# --- Resilience ---
+
+class Resilience:
+    """Per-run retry/timeout/hedging policy around model and tool calls, with metrics per provider."""
+
+    def __init__(self, policies=None, failure_threshold=None, reset_s=None):
+        policies = policies or {}
+        self.policies = {kind: dict(defaults, **(policies.get(kind) or {})) for kind, defaults in DEFAULT_POLICIES.items()}
+        self.breaker_options = {key: value for key, value in
+                                (("failure_threshold", failure_threshold), ("reset_s", reset_s)) if value is not None}
+        self.stats = defaultdict(lambda: {"calls": 0, "retries": 0, "failures": 0, "timeouts": 0, "hedges": 0,
+                                          "hedge_wins": 0, "rejected": 0, "trips": 0})
+        self.latencies = defaultdict(list)
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def _count(self, provider, field):
+        with self._lock:
+            self.stats[provider][field] += 1
+
+    def call(self, provider, kind, run):
+        """Returns `run()`, retried, timed out, hedged and circuit-broken per the `kind` ("llm"/"tool") policy."""
+        policy = self.policies[kind]
+        circuit = breaker(provider, **self.breaker_options)
+        self._count(provider, "calls")
+        for attempt in range(policy["retries"] + 1):
+            if not circuit.allow():
+                self._count(provider, "rejected")
+                raise CircuitOpenError(f"Circuit for {provider} is open after repeated failures; "
+                                       f"retry in {circuit.reset_s:g}s")
+            try:
+                result = self._attempt(provider, policy, run)
+            except Exception as e:
+                if not is_transient(e):
+                    circuit.record_success()  # the provider answered; the request itself was bad
+                    raise
+                if circuit.record_failure():
+                    self._count(provider, "trips")
+                    print(f"⚠️  Circuit for {provider} opened: calls fail fast for {circuit.reset_s:g}s", flush=True)
+                if attempt == policy["retries"]:
+                    self._count(provider, "failures")
+                    raise
+                self._count(provider, "retries")
+                time.sleep(backoff_delay(attempt, policy["base_delay_s"], policy["max_delay_s"]))
+                continue
+            circuit.record_success()
+            return result
+
+    def hedge_delay(self, provider, policy):
+        """Seconds after which a second request is sent: the provider's p95 latency, once enough are known."""
+        if not policy["hedge"]:
+            return None
+        with _breakers_lock:
+            observed = list(_latencies[provider])
+        if len(observed) < MIN_HEDGE_SAMPLES:
+            return None
+        return max(MIN_HEDGE_DELAY_S, percentile(observed, HEDGE_QUANTILE))
+
+    def _attempt(self, provider, policy, run):
+        timeout, hedge_after = policy["timeout_s"], self.hedge_delay(provider, policy)
+        started = time.perf_counter()
+        if not timeout and hedge_after is None:
+            result = run()
+            self._record_latency(provider, time.perf_counter() - started)
+            return result
+        first = _start(run)
+        pending = {first}
+        if hedge_after is not None and (not timeout or hedge_after < timeout):
+            if not wait(pending, timeout=hedge_after)[0]:
+                self._count(provider, "hedges")
+                pending.add(_start(run))
+        while pending:
+            remaining = timeout - (time.perf_counter() - started) if timeout else None
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                self._count(provider, "timeouts")
+                raise TimeoutError(f"{provider} did not answer within {timeout:.0f}s")
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._count(provider, "hedge_wins")
+                    self._record_latency(provider, time.perf_counter() - started)
+                    return future.result()
+        raise first.exception()
+
+    def _record_latency(self, provider, seconds):
+        with self._lock:
+            self.latencies[provider].append(seconds)
+        with _breakers_lock:
+            _latencies[provider].append(seconds)
+
+    def report(self):
+        """Plain-data report: totals and per provider the calls, retries, trips, hedges and p50/p99 latency."""
+        with self._lock:
+            providers = [dict(stats, provider=provider, state=breaker(provider).state,
+                              p50_s=round(percentile(self.latencies[provider], 0.5), 3),
+                              p99_s=round(percentile(self.latencies[provider], 0.99), 3))
+                         for provider, stats in sorted(self.stats.items())]
+        totals = {field: sum(provider[field] for provider in providers)
+                  for field in ("calls", "retries", "failures", "timeouts", "hedges", "rejected", "trips")}
+        return dict(totals, providers=providers)
+
+    def __enter__(self):
+        global _active_resilience
+        with _active_lock:
+            self._previous, _active_resilience = _active_resilience, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_resilience
+        with _active_lock:
+            _active_resilience = self._previous
+        return False
+
+
+def active_resilience():
+    return _active_resilience
+
+
+def tool_retries():
+    """Retries per page for tools that handle their own requests (BatchScrapeTool); 0 outside a Resilience."""
+    resilience = active_resilience()
+    return resilience.policies["tool"]["retries"] if resilience else 0
+
+# --- Model Clients ---
+
+def _resilient_method(method, provider):
+    @functools.wraps(method)
+    def call(*args, **kwargs):
+        resilience = active_resilience()
+        if resilience is None or kwargs.get("stream"):
+            return method(*args, **kwargs)
+        return resilience.call(provider, "llm", lambda: method(*args, **kwargs))
+    return call
+
+
+def resilient_llms(agents):
+    """Routes the model requests of the agents' OpenAI-compatible LLMs through the active Resilience (once per LLM)."""
+    for agent in agents:
+        llm = agent.llm
+        client = getattr(llm, "client", None)
+        if not isinstance(client, openai.OpenAI) or getattr(client, "_resilient", False):
+            continue
+        # This layer owns retries; the client's own would retry inside every attempt and defeat the timeout
+        client = client.with_options(max_retries=0)
+        provider = f"llm:{client.base_url.host}"
+        for resource in (client.chat.completions, client.beta.chat.completions, client.responses):
+            for name in ("create", "parse"):
+                if hasattr(resource, name):
+                    setattr(resource, name, _resilient_method(getattr(resource, name), provider))
+        client._resilient = True
+        llm.client = client
+
+# --- CrewAI Tools ---
+
+class ResilientToolMixin:
+    """Routes a tool's calls through the active Resilience; mixed in before the tool class by `resilient`."""
+
+    resilience_provider: ClassVar[str] = "tool"
+
+    def _run(self, *args, **kwargs):
+        resilience = active_resilience()
+        if resilience is None:
+            return super()._run(*args, **kwargs)
+        return resilience.call(self.resilience_provider, "tool",
+                               lambda: super(ResilientToolMixin, self)._run(*args, **kwargs))
+
+
+@functools.cache
+def resilient(tool_class, provider):
+    """A subclass of `tool_class` whose calls go through the active Resilience as `provider`; same class name."""
+    return type(tool_class.__name__, (ResilientToolMixin, tool_class), {
+        "__module__": __name__, "__annotations__": {"resilience_provider": ClassVar[str]},
+        "resilience_provider": provider,
+    })
+
+
+def format_resilience(report):
+    lines = [f"{report['calls']} calls, {report['retries']} retried, {report['failures']} failed, "
+             f"{report['timeouts']} timed out, {report['hedges']} hedged, {report['trips']} circuit trips", ""]
+    for provider in report["providers"]:
+        lines.append(f"- {provider['provider']}: {provider['calls']} calls, {provider['retries']} retries, "
+                     f"{provider['hedges']} hedges ({provider['hedge_wins']} won), {provider['rejected']} rejected, "
+                     f"p50 {provider['p50_s']}s, p99 {provider['p99_s']}s, circuit {provider['state']}")
+    return "\n".join(lines)
@@ -0,0 +1 @@
+"""Automated code review crew: Security Engineer, Senior Developer and Tech Lead."""
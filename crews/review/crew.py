@@ -0,0 +1,218 @@
+# crews/review/crew.py
+
+import os
+from pathlib import Path
+from crewai import Agent, Task, Crew
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+from crewai_tools import SerperDevTool
+from crews.patch import disable_ssl_verification
+from crews.utils import get_openai_api_key, get_serper_api_key, definition_file, load_md_content
+from crews.model_router import resolve_model
+from crews.tool_memo import memoized
+from crews.resilience import resilient
+from crews.batch_scrape import BatchScrapeTool
+from crews.review.owasp_index import OWASPIndexSearchTool, DEFAULT_INDEX_PATH
+from crews.review.decision_router import ReviewDecisionRouter
+from crews.review.prompt_assembly import SharedPrefixAssembler
+from crews.review.diff_ingest import DiffRules, ingest_diff
+from crews.review.risk_score import risk_prescore
+from crews.review.speculative import SpeculativeDecision, format_speculation
+
+# --- Environment Setup ---
+disable_ssl_verification()
+os.environ["CREWAI_TESTING"] = "true"
+os.environ["OPENAI_API_KEY"] = get_openai_api_key()
+os.environ["MODEL"] = "Llama-3.2-3B-Instruct-Q4_K_M"  # default for agents without a **Model:** tier override
+
+# Load configurations
+senior_dev_cfg = load_md_content(definition_file(__package__, "agent_definitions/senior_developer.md"))
+security_eng_cfg = load_md_content(definition_file(__package__, "agent_definitions/security_engineer.md"))
+tech_lead_cfg = load_md_content(definition_file(__package__, "agent_definitions/tech_lead.md"))
+
+task_quality_cfg = load_md_content(definition_file(__package__, "task_definitions/analyze_code_quality.md"))
+task_security_cfg = load_md_content(definition_file(__package__, "task_definitions/review_security.md"))
+task_decision_cfg = load_md_content(definition_file(__package__, "task_definitions/make_review_decision.md"))
+task_draft_cfg = load_md_content(definition_file(__package__, "task_definitions/draft_review_decision.md"))
+task_confirm_cfg = load_md_content(definition_file(__package__, "task_definitions/confirm_review_decision.md"))
+
+# --- Tool Initialization ---
+# Online OWASP search, only used when the local index has no good match
+serper_search_tool = memoized(resilient(SerperDevTool, "serper"))(
+    search_url="https://owasp.org", 
+    base_url=os.getenv("DLAI_SERPER_BASE_URL", "https://google.serper.dev")
+)
+# Offline OWASP cheat sheet index (build it with `crews owasp-index build <dump_dir>`)
+owasp_search_tool = OWASPIndexSearchTool(
+    index_path=os.getenv("OWASP_INDEX_PATH", DEFAULT_INDEX_PATH),
+    fallback_tool=serper_search_tool
+)
+# Reads all OWASP pages the agent picked in one step
+batch_scrape_tool = memoized(BatchScrapeTool)()
+
+# --- Agent Definitions ---
+senior_developer = Agent(
+    role=senior_dev_cfg["role"],
+    goal=senior_dev_cfg["goal"],
+    backstory=senior_dev_cfg["backstory"],
+    llm=resolve_model(senior_dev_cfg["model"]),
+    verbose=True
+)
+
+security_engineer = Agent(
+    role=security_eng_cfg["role"],
+    goal=security_eng_cfg["goal"],
+    backstory=security_eng_cfg["backstory"],
+    llm=resolve_model(security_eng_cfg["model"]),
+    verbose=True,
+    tools=[owasp_search_tool, batch_scrape_tool]
+)
+
+tech_lead = Agent(
+    role=tech_lead_cfg["role"],
+    goal=tech_lead_cfg["goal"],
+    backstory=tech_lead_cfg["backstory"],
+    llm=resolve_model(tech_lead_cfg["model"]),
+    verbose=True
+)
+
+# --- Task Definitions ---
+analyze_code_quality = Task(
+    description=task_quality_cfg["description"],
+    expected_output=task_quality_cfg["expected_output"],
+    name="Analyze Code Quality",
+    agent=senior_developer
+)
+
+review_security = Task(
+    description=task_security_cfg["description"],
+    expected_output=task_security_cfg["expected_output"],
+    agent=security_engineer,
+    name="Review Security"
+)
+
+# The Tech Lead only runs when the upstream findings are not conclusive
+decision_router = ReviewDecisionRouter(review_security, analyze_code_quality)
+
+make_review_decision = ConditionalTask(
+    description=task_decision_cfg["description"],
+    expected_output=task_decision_cfg["expected_output"],
+    agent=tech_lead,
+    context=[analyze_code_quality, review_security],
+    name="Review Decision",
+    condition=decision_router.needs_tech_lead
+)
+
+# --- Crew Execution ---
+code_review_crew = Crew(
+    agents=[security_engineer, senior_developer, tech_lead],
+    tasks=[review_security, analyze_code_quality, make_review_decision],
+    cache=False,  # CrewAI's crew-wide tool cache outlives the run; tool results are memoized per run instead
+)
+
+DECISION_INDEX = code_review_crew.tasks.index(make_review_decision)
+
+
+def reviews_crew():
+    """The crew without the Tech Lead's task, carrying over long-term memory attached for this run."""
+    crew = code_review_crew
+    return Crew(agents=crew.agents, tasks=crew.tasks[:DECISION_INDEX], process=crew.process, cache=crew.cache,
+                external_memory=crew._external_memory)
+
+
+def run_speculative_review(reviews, inputs, start="review"):
+    """
+    Runs the `reviews` crew with the Tech Lead's decision drafted alongside it
+    (crews/review/speculative.py) instead of after it; returns (result, speculation).
+    The decision becomes the result's last task output, like the ConditionalTask's.
+    """
+    speculation = SpeculativeDecision(
+        tech_lead, task_draft_cfg, task_confirm_cfg, reviews.tasks, task_name=make_review_decision.name
+    )
+    speculation.attach(inputs, prescan=risk_prescore(inputs["code_changes"]) if start == "prescan" else None)
+    try:
+        result = reviews.kickoff(inputs=inputs)
+    except BaseException:
+        speculation.discard()
+        raise
+    finally:
+        speculation.detach()
+    report = ""
+    if decision_router.needs_tech_lead():
+        report = speculation.finish(inputs)
+    else:
+        speculation.discard()
+    result.token_usage.add_usage_metrics(speculation.token_usage)
+    output = TaskOutput(description=make_review_decision.description, raw=report, agent=tech_lead.role,
+                        name=make_review_decision.name)
+    make_review_decision.output = output
+    if report and make_review_decision.callback:
+        make_review_decision.callback(output)
+    result.tasks_output.append(output)
+    result.raw = report or result.raw
+    return result, speculation
+
+
+def run_code_review(code_changes, prompt_mode=None, speculative=None):
+    """Runs one review of `code_changes` on the module's crew; returns (result, prompt_assembler, speculation)."""
+    inputs = {"code_changes": code_changes}
+
+    crew = reviews_crew() if speculative else code_review_crew
+    # REVIEW_PROMPT_MODE=shared sends the diff once as a cacheable prefix instead of once per task
+    prompt_assembler = None
+    if (prompt_mode or os.getenv("REVIEW_PROMPT_MODE", "inline")) == "shared":
+        prompt_assembler = SharedPrefixAssembler(inputs)
+        prompt_assembler.apply(crew)
+    speculation = None
+    try:
+        if speculative:
+            result, speculation = run_speculative_review(crew, inputs, speculative)
+        else:
+            result = crew.kickoff(inputs=inputs)
+    finally:
+        if prompt_assembler:
+            prompt_assembler.remove()
+    return result, prompt_assembler, speculation
+
+
+def final_report(result):
+    """The Tech Lead's report, or the rule-based decision when the Tech Lead was skipped."""
+    return result.tasks_output[2].raw or decision_router.decision_report()
+
+
+def run_job(code_changes=None, diff_path=None, prompt_mode=None, diff_rules=None, speculative=None):
+    """Entry point for the CLI and pooled workers: one review, returned as plain data.
+
+    The diff (inline text or a file path, which is streamed instead of read whole)
+    goes through `ingest_diff` first; `diff_rules` are DiffRules keyword arguments.
+    With `speculative` ("review" or "prescan") the Tech Lead drafts the decision
+    from the first finished review (or the static pre-scan) while the reviews run.
+    """
+    if (code_changes is None) == (diff_path is None):
+        raise ValueError("Pass either code_changes or diff_path")
+    diff = ingest_diff(Path(diff_path) if diff_path else code_changes, DiffRules(**(diff_rules or {})))
+    if not diff.kept:
+        raise ValueError(f"Nothing left to review after filtering the diff:\n{diff.report()}")
+    result, prompt_assembler, speculation = run_code_review(diff.text, prompt_mode, speculative)
+    return {
+        "report": final_report(result),
+        "ingest": diff.summary(),
+        "ingest_report": diff.report(),
+        "decision": decision_router.decision,
+        "routing": decision_router.summary(),
+        "prompt_tokens": prompt_assembler.token_report() if prompt_assembler else None,
+        "speculation": speculation.report() if speculation else None,
+        "crew_output": result,
+    }
+
+
+def format_output(output):
+    """Renders a (serialized) run_job result for the terminal."""
+    sections = [("Final Review Report", output["report"]), ("Decision Routing", output["routing"])]
+    if output.get("speculation"):
+        sections.append(("Speculative Decision", format_speculation(output["speculation"])))
+    if output.get("ingest", {}).get("skipped"):
+        sections.append(("Skipped Diff Files", output["ingest_report"]))
+    if output.get("prompt_tokens"):
+        sections.append(("Prompt Token Accounting", output["prompt_tokens"]))
+    return "\n".join(f"\n--- {title} ---\n\n{body}" for title, body in sections)
@@ -0,0 +1,141 @@
+# crews/review/decision_router.py
+
+"""
+Rule-based Review Decision Router
+---------------------------------
+Sits in front of the Tech Lead's `make_review_decision` task. When the
+structured JSON outputs of `review_security` and `analyze_code_quality` are
+conclusive, the decision is made deterministically and the Tech Lead LLM call
+is skipped; ambiguous reviews still go to the Tech Lead.
+"""
+
+import sqlite3
+from pathlib import Path
+
+from crews.utils import parse_json_output, state_path
+
+APPROVE = "approve"
+REQUEST_CHANGES = "request changes"
+
+DEFAULT_STATS_PATH = state_path("routing_stats.db")
+
+# --- Output Parsing ---
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes")
+    return value is True
+
+
+def _has_lists(output, *keys):
+    """Whether the reviewer answered in the expected shape: every key present and a list."""
+    return all(isinstance(output.get(key), list) for key in keys)
+
+# --- Routing Rules ---
+
+def route_decision(security, quality):
+    """
+    Returns a conclusive decision dict, or None when the Tech Lead should decide.
+
+    Conclusive cases:
+    - the security review is blocking with a Critical highest risk -> request changes
+    - both reviews parsed and report no issues at all -> approve
+
+    Approving needs both reviews in the expected shape; an answer that lacks
+    the issue lists (or names them differently) goes to the Tech Lead.
+    """
+    if security and _as_bool(security.get("blocking")) \
+            and str(security.get("highest_risk", "")).strip().lower() == "critical":
+        return {
+            "decision": REQUEST_CHANGES,
+            "reason": "The security review found a Critical, blocking vulnerability.",
+            "required_changes": _as_list(security.get("security_recommendations"))
+                                + _as_list(quality.get("critical_issues") if quality else None),
+        }
+
+    if security is None or quality is None:
+        return None
+    if not _has_lists(security, "security_vulnerabilities") or "blocking" not in security \
+            or not _has_lists(quality, "critical_issues", "minor_issues"):
+        return None
+
+    no_security_issues = not security["security_vulnerabilities"] and not _as_bool(security["blocking"])
+    no_quality_issues = not quality["critical_issues"] and not quality["minor_issues"]
+    if no_security_issues and no_quality_issues:
+        return {
+            "decision": APPROVE,
+            "reason": "Neither the security review nor the code quality review reported any issues.",
+            "required_changes": [],
+        }
+    return None
+
+
+def format_decision_report(decision):
+    """Renders a routed decision in the same shape as the Tech Lead's report."""
+    lines = [
+        f"Final decision: {decision['decision'].upper()} (rule-based, Tech Lead review skipped)",
+        f"Reasoning: {decision['reason']}",
+    ]
+    if decision["required_changes"]:
+        lines.append("Required changes:")
+        lines.extend(f"- {change}" for change in decision["required_changes"])
+    elif decision["decision"] == APPROVE:
+        lines.append("Approval comments: No blocking or minor issues were found by either reviewer.")
+    return "\n".join(lines)
+
+# --- Crew Integration ---
+
+class ReviewDecisionRouter:
+    """Condition for the Tech Lead ConditionalTask; keeps short-circuit statistics across runs."""
+
+    def __init__(self, security_task, quality_task, stats_path=DEFAULT_STATS_PATH):
+        self.security_task = security_task
+        self.quality_task = quality_task
+        self.stats_path = Path(stats_path)
+        self.decision = None
+
+    def needs_tech_lead(self, _previous_output=None):
+        """Routes the current review; returns True only when the LLM decision is required."""
+        security = parse_json_output(self.security_task.output.raw if self.security_task.output else "")
+        quality = parse_json_output(self.quality_task.output.raw if self.quality_task.output else "")
+        self.decision = route_decision(security, quality)
+        self._record(self.decision)
+        return self.decision is None
+
+    def decision_report(self):
+        return format_decision_report(self.decision) if self.decision else ""
+
+    def _connect(self):
+        # Pool workers record from several processes; wait for the lock instead of failing
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.stats_path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS decisions (decision TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        return conn
+
+    def load_stats(self):
+        with self._connect() as conn:
+            decisions = dict(conn.execute("SELECT decision, count FROM decisions ORDER BY decision").fetchall())
+        total = sum(decisions.values())
+        return {"total": total, "short_circuited": total - decisions.get("tech lead", 0), "decisions": decisions}
+
+    def _record(self, decision):
+        key = decision["decision"] if decision else "tech lead"
+        with self._connect() as conn:
+            conn.execute("INSERT INTO decisions VALUES (?, 1) ON CONFLICT(decision) DO UPDATE SET count = count + 1",
+                         (key,))
+
+    def summary(self):
+        stats = self.load_stats()
+        if not stats["total"]:
+            return "No reviews routed yet."
+        ratio = stats["short_circuited"] / stats["total"]
+        return (
+            f"Short-circuited {stats['short_circuited']} of {stats['total']} PRs "
+            f"({ratio:.0%}) without a Tech Lead LLM call: {stats['decisions']}"
+        )
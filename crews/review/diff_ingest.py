@@ -0,0 +1,294 @@
+# crews/review/diff_ingest.py
+
+"""
+Streaming Diff Ingestion
+------------------------
+Large monorepo PRs are mostly noise for a reviewer: lockfiles (our own
+`uv.lock` is 630 KB), generated code, vendored dependencies and binary
+patches. Reading such a diff into one string and interpolating it into every
+task prompt holds several copies of it in memory and blows the context window.
+
+`ingest_diff` walks the unified diff line by line (memory-mapped when it is a
+file), decides per file from its `diff --git` header (or, in a plain unified
+diff, its `---`/`+++` pair) whether to keep it, and only buffers kept files up
+to a per-file cap. Everything that is dropped or
+truncated is listed in the report that goes with the review:
+
+    diff = ingest_diff(Path("changes.diff"), DiffRules(max_file_bytes=64_000))
+    diff.text       # filtered diff for the prompts
+    diff.report()   # what was skipped and why
+
+Rules can also be set with REVIEW_DIFF_MAX_FILE_KB, REVIEW_DIFF_MAX_TOTAL_KB,
+REVIEW_DIFF_EXCLUDE and REVIEW_DIFF_INCLUDE (comma-separated globs).
+"""
+
+import io
+import mmap
+import os
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+GENERATED = "generated"
+VENDORED = "vendored"
+LOCKFILE = "lockfile"
+BINARY = "binary"
+EXCLUDED = "excluded"
+TRUNCATED = "truncated"
+OVER_BUDGET = "over total budget"
+
+DEFAULT_RULES = {
+    LOCKFILE: [
+        "*.lock", "package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml", "go.sum",
+        "Pipfile.lock", "composer.lock", "Gemfile.lock", "poetry.lock", "uv.lock", "Cargo.lock",
+    ],
+    GENERATED: [
+        "*.min.js", "*.min.css", "*.map", "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.generated.*",
+        "dist/*", "build/*", "*/dist/*", "*/build/*", "__snapshots__/*", "*/__snapshots__/*", "*.snap",
+    ],
+    VENDORED: [
+        "vendor/*", "*/vendor/*", "node_modules/*", "*/node_modules/*", "third_party/*", "*/third_party/*",
+        "site-packages/*", "*/site-packages/*",
+    ],
+}
+# Markers in the first added lines that tools put into generated files
+GENERATED_MARKERS = ("@generated", "DO NOT EDIT", "Code generated by", "autogenerated", "auto-generated")
+GENERATED_MARKER_LINES = 20
+
+FILE_HEADER_PATTERN = re.compile(r"^diff --git a/(.*?) b/(.*)$")
+# Plain unified diffs (diff -u, svn, hg export) start each file with ---/+++ lines, optionally timestamped
+OLD_FILE_PATTERN = re.compile(r"^--- (?:a/)?([^\t]*)")
+NEW_FILE_PATTERN = re.compile(r"^\+\+\+ (?:b/)?([^\t]*)")
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+HUNK_LINE_PREFIXES = (" ", "+", "-", "\\", "\n")
+BINARY_PATTERN = re.compile(r"^(Binary files .* differ|GIT binary patch)$")
+
+# --- Rules ---
+
+def _env_globs(name):
+    return [glob.strip() for glob in os.getenv(name, "").split(",") if glob.strip()]
+
+
+def _env_kb(name, default):
+    value = os.getenv(name)
+    return int(float(value) * 1024) if value else default
+
+
+def _matches(path, globs):
+    """Globs match the full path or just the file name (so '*.lock' also covers 'sub/dir/x.lock')."""
+    name = path.rsplit("/", 1)[-1]
+    return any(fnmatch(path, glob) or fnmatch(name, glob) for glob in globs)
+
+
+class DiffRules:
+    """Which files of a diff are kept, and how many bytes of them go into the prompts."""
+
+    def __init__(self, max_file_bytes=None, max_total_bytes=None, exclude=None, include=None,
+                 categories=None, detect_markers=True):
+        self.max_file_bytes = max_file_bytes or _env_kb("REVIEW_DIFF_MAX_FILE_KB", 64 * 1024)
+        self.max_total_bytes = max_total_bytes or _env_kb("REVIEW_DIFF_MAX_TOTAL_KB", 256 * 1024)
+        self.exclude = list(exclude or []) + _env_globs("REVIEW_DIFF_EXCLUDE")
+        # Include globs win over every skip rule (e.g. a hand-written file under build/)
+        self.include = list(include or []) + _env_globs("REVIEW_DIFF_INCLUDE")
+        self.categories = DEFAULT_RULES if categories is None else categories
+        self.detect_markers = detect_markers
+
+    def skip_reason(self, path):
+        """Returns why `path` is skipped from its name alone, or None to keep it."""
+        if self.is_included(path):
+            return None
+        if _matches(path, self.exclude):
+            return EXCLUDED
+        for reason, globs in self.categories.items():
+            if _matches(path, globs):
+                return reason
+        return None
+
+    def is_included(self, path):
+        return _matches(path, self.include)
+
+# --- Line Sources ---
+
+def _iter_mmap_lines(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                yield line.decode("utf-8", errors="replace")
+
+
+def iter_diff_lines(source):
+    """Yields the lines of a diff from a Path, a text/binary stream or a string (the diff itself)."""
+    if isinstance(source, Path):
+        yield from _iter_mmap_lines(source)
+        return
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    for line in source:
+        yield line.decode("utf-8", errors="replace") if isinstance(line, bytes) else line
+
+# --- Ingestion ---
+
+class _FileDiff:
+    """The part of one file's diff that is kept in memory while streaming."""
+
+    def __init__(self, path, header, skip):
+        self.path = path
+        self.lines = [header]
+        self.size = len(header.encode())
+        self.kept_bytes = self.size
+        self.skip = skip
+        self.truncated = False
+        self.added_lines = 0
+
+    def add(self, line, rules):
+        size = len(line.encode())
+        self.size += size
+        if self.skip:
+            return
+        if BINARY_PATTERN.match(line.rstrip("\n")) and not rules.is_included(self.path):
+            self.skip, self.lines = BINARY, []
+            return
+        if line.startswith("+") and not line.startswith("+++") and self.added_lines < GENERATED_MARKER_LINES:
+            self.added_lines += 1
+            if rules.detect_markers and not rules.is_included(self.path) and any(
+                    marker in line for marker in GENERATED_MARKERS):
+                self.skip, self.lines = GENERATED, []
+                return
+        if self.kept_bytes + size > rules.max_file_bytes:
+            self.truncated = True
+            return
+        self.lines.append(line)
+        self.kept_bytes += size
+
+
+class IngestedDiff:
+    """A filtered diff plus the per-file accounting of what was kept, truncated and skipped."""
+
+    def __init__(self, text, kept, skipped, total_bytes):
+        self.text = text
+        self.kept = kept
+        self.skipped = skipped
+        self.total_bytes = total_bytes
+
+    @property
+    def kept_bytes(self):
+        return len(self.text.encode())
+
+    def summary(self):
+        return {
+            "files_kept": len(self.kept),
+            "files_skipped": len([entry for entry in self.skipped if entry["reason"] != TRUNCATED]),
+            "files_truncated": len([entry for entry in self.skipped if entry["reason"] == TRUNCATED]),
+            "input_bytes": self.total_bytes,
+            "kept_bytes": self.kept_bytes,
+            "skipped": self.skipped,
+        }
+
+    def report(self):
+        """Markdown summary of the skipped and truncated files for the review output."""
+        lines = [f"Kept {len(self.kept)} file(s), {self.kept_bytes:,} of {self.total_bytes:,} bytes."]
+        if not self.skipped:
+            return lines[0]
+        lines.append("")
+        for entry in self.skipped:
+            lines.append(f"- {entry['path']}: {entry['reason']} ({entry['bytes']:,} bytes)")
+        return "\n".join(lines)
+
+
+def split_diff(source):
+    """
+    Yields (path, line, starts_file) for every line of a unified diff, in order.
+    A file starts at its `diff --git` header or, in a plain unified diff, at the
+    `---` line of a `---`/`+++` pair; `path` is None before the first file.
+    """
+    path = None
+    old_file = None  # a '---' line that starts a plain unified diff file if a '+++' line follows
+    hunk_old = hunk_new = 0  # lines left in the current hunk, which may themselves start with ---/+++
+    awaiting_hunk = False  # between a `diff --git` header and its first hunk, where its ---/+++ lines are
+
+    for line in iter_diff_lines(source):
+        stripped = line.rstrip("\n")
+        if (hunk_old > 0 or hunk_new > 0) and line.startswith(HUNK_LINE_PREFIXES):
+            hunk_old -= not line.startswith("+") and not line.startswith("\\")
+            hunk_new -= not line.startswith("-") and not line.startswith("\\")
+            yield path, line, False
+            continue
+        hunk_old = hunk_new = 0
+        header = FILE_HEADER_PATTERN.match(stripped)
+        if header:
+            if old_file is not None:
+                yield path, old_file, False
+                old_file = None
+            path = header.group(2)
+            awaiting_hunk = True
+            yield path, line, True
+            continue
+        if old_file is not None:
+            new_file = NEW_FILE_PATTERN.match(stripped)
+            if new_file:
+                path = new_file.group(1).rstrip()
+                if path == "/dev/null":  # a deleted file
+                    path = OLD_FILE_PATTERN.match(old_file.rstrip("\n")).group(1).rstrip()
+                yield path, old_file, True
+                yield path, line, False
+                old_file = None
+                continue
+            yield path, old_file, False
+            old_file = None
+        if stripped.startswith("--- ") and not awaiting_hunk:
+            old_file = line
+            continue
+        hunk = HUNK_PATTERN.match(stripped)
+        if hunk:
+            awaiting_hunk = False
+            hunk_old = int(hunk.group(1) or 1)
+            hunk_new = int(hunk.group(2) or 1)
+        yield path, line, False
+    if old_file is not None:
+        yield path, old_file, False
+
+
+def ingest_diff(source, rules=None):
+    """Streams a unified diff and returns an IngestedDiff with only the reviewable files."""
+    rules = rules or DiffRules()
+    kept, skipped, chunks = [], [], []
+    total_bytes = kept_bytes = 0
+    current = None
+    # Text before the first file header; kept (capped) only when the input has no file headers at all
+    preamble = _FileDiff("(diff)", "", None)
+
+    def finish(file_diff):
+        nonlocal kept_bytes
+        if file_diff is None:
+            return
+        if file_diff.skip:
+            skipped.append({"path": file_diff.path, "reason": file_diff.skip, "bytes": file_diff.size})
+            return
+        text = "".join(file_diff.lines)
+        dropped = file_diff.size - file_diff.kept_bytes
+        if file_diff.truncated:
+            text += f"\n[... {dropped:,} more bytes of {file_diff.path} omitted by the per-file size cap ...]\n"
+        if kept_bytes + len(text.encode()) > rules.max_total_bytes:
+            skipped.append({"path": file_diff.path, "reason": OVER_BUDGET, "bytes": file_diff.size})
+            return
+        if file_diff.truncated:
+            skipped.append({"path": file_diff.path, "reason": TRUNCATED, "bytes": dropped})
+        chunks.append(text)
+        kept.append(file_diff.path)
+        kept_bytes += len(text.encode())
+
+    for path, line, starts_file in split_diff(source):
+        total_bytes += len(line.encode())
+        if starts_file:
+            finish(current)
+            current = _FileDiff(path, line, rules.skip_reason(path))
+        else:
+            (current or preamble).add(line, rules)
+    finish(current)
+
+    # No file headers at all (a bare hunk, a pasted snippet): keep it as one capped block
+    if not kept and not skipped and preamble.size:
+        finish(preamble)
+    return IngestedDiff("".join(chunks), kept, skipped, total_bytes)
@@ -0,0 +1,197 @@
+# crews/review/owasp_index.py
+
+"""
+Offline OWASP Knowledge Index
+-----------------------------
+Builds a local SQLite FTS5 index from a dump of the OWASP Cheat Sheet Series
+(https://github.com/OWASP/CheatSheetSeries, `cheatsheets/*.md`) and exposes it
+to the Security Engineer as a CrewAI tool. Lookups take milliseconds instead of
+a Serper round-trip plus page scrapes; the online search is only used as a
+fallback when the index has no good match.
+
+Usage:
+    crews owasp-index build path/to/CheatSheetSeries/cheatsheets
+    crews owasp-index search "sql injection parameterized queries"
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from crews.utils import state_path
+
+# --- Index Configuration ---
+
+DEFAULT_INDEX_PATH = state_path("owasp_index.db")
+CHEATSHEET_BASE_URL = "https://cheatsheetseries.owasp.org/cheatsheets"
+INDEXED_SUFFIXES = (".md", ".markdown", ".txt")
+
+HEADING_PATTERN = re.compile(r"^(#{1,3})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+QUERY_TERM_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+# --- Index Builder ---
+
+def _anchor(heading):
+    """Mirrors the heading anchors generated on cheatsheetseries.owasp.org."""
+    return re.sub(r"[^a-z0-9]+", "-", heading.lower()).strip("-")
+
+
+def split_sections(text):
+    """Splits a markdown document into (heading, body) sections."""
+    matches = list(HEADING_PATTERN.finditer(text))
+    if not matches:
+        return [("", text.strip())] if text.strip() else []
+
+    sections = []
+    preamble = text[:matches[0].start()].strip()
+    if preamble:
+        sections.append(("", preamble))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body:
+            sections.append((match.group(2), body))
+    return sections
+
+
+def build_index(source_dir, index_path=DEFAULT_INDEX_PATH):
+    """(Re)builds the index from a local dump of OWASP documents. Returns the section count."""
+    source_dir = Path(source_dir)
+    files = sorted(p for p in source_dir.rglob("*") if p.suffix.lower() in INDEXED_SUFFIXES)
+    if not files:
+        raise FileNotFoundError(f"No OWASP documents ({', '.join(INDEXED_SUFFIXES)}) found in {source_dir}")
+
+    # Build into a temporary file and swap it in, so readers never see a half-built index
+    tmp_path = Path(f"{index_path}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE sections USING fts5("
+            "title, heading, body, url UNINDEXED, tokenize='porter unicode61')"
+        )
+        count = 0
+        for path in files:
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            title = path.stem.replace("_", " ")
+            page_url = f"{CHEATSHEET_BASE_URL}/{path.stem}.html"
+            rows = [
+                (title, heading, body, f"{page_url}#{_anchor(heading)}" if heading else page_url)
+                for heading, body in split_sections(text)
+            ]
+            conn.executemany("INSERT INTO sections VALUES (?, ?, ?, ?)", rows)
+            count += len(rows)
+        conn.execute("INSERT INTO sections(sections) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    tmp_path.replace(index_path)
+    return count
+
+# --- Index Lookup ---
+
+def _match_expression(query):
+    """Turns free text into an FTS5 OR-query so agent phrasing cannot break the syntax."""
+    terms = {term.lower() for term in QUERY_TERM_PATTERN.findall(query) if len(term) > 1}
+    return " OR ".join(f'"{term}"' for term in sorted(terms))
+
+
+def search_index(query, index_path=DEFAULT_INDEX_PATH, limit=5):
+    """Returns the best matching sections, most relevant first. Empty if there is no index."""
+    expression = _match_expression(query)
+    if not expression or not Path(index_path).exists():
+        return []
+
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT title, heading, url, body, bm25(sections, 5.0, 3.0, 1.0) AS rank "
+            "FROM sections WHERE sections MATCH ? ORDER BY rank LIMIT ?",
+            (expression, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    # FTS5 bm25() is negative, lower is better; expose it as a positive relevance score
+    return [
+        {"title": title, "heading": heading, "url": url, "body": body, "score": -rank}
+        for title, heading, url, body, rank in rows
+    ]
+
+# --- CrewAI Tool ---
+
+class OWASPIndexSearchToolSchema(BaseModel):
+    """Input for OWASPIndexSearchTool."""
+
+    search_query: str = Field(
+        ..., description="Security topic or vulnerability to look up in the OWASP cheat sheets"
+    )
+
+
+class OWASPIndexSearchTool(BaseTool):
+    name: str = "Search the OWASP knowledge index"
+    description: str = (
+        "Searches a local index of the OWASP Cheat Sheet Series and returns the most relevant "
+        "guidance excerpts with their source URLs. Falls back to an online OWASP search when "
+        "the index has no good match."
+    )
+    args_schema: Type[BaseModel] = OWASPIndexSearchToolSchema
+    index_path: str = DEFAULT_INDEX_PATH
+    n_results: int = 3
+    min_score: float = 2.0
+    max_excerpt_chars: int = 1500
+    fallback_tool: Optional[BaseTool] = None
+
+    def _run(self, search_query: str) -> str:
+        hits = search_index(search_query, self.index_path, self.n_results)
+        if hits and hits[0]["score"] >= self.min_score:
+            return "\n\n".join(self._format_hit(hit) for hit in hits)
+
+        if self.fallback_tool is not None:
+            return self.fallback_tool.run(search_query=search_query)
+        return f"No OWASP guidance found in the local index for: {search_query}"
+
+    def _format_hit(self, hit):
+        heading = f" - {hit['heading']}" if hit["heading"] else ""
+        body = hit["body"]
+        if len(body) > self.max_excerpt_chars:
+            body = body[:self.max_excerpt_chars].rsplit(" ", 1)[0] + " ..."
+        return f"## {hit['title']}{heading}\nSource: {hit['url']}\n\n{body}"
+
+# --- Command Line ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews owasp-index", description="Build or query the offline OWASP knowledge index.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Path of the SQLite index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="Rebuild the index from a local document dump")
+    build_cmd.add_argument("source_dir", help="Directory containing OWASP cheat sheet markdown files")
+
+    search_cmd = commands.add_parser("search", help="Query the index")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--limit", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "build":
+        count = build_index(args.source_dir, args.index)
+        print(f"Indexed {count} sections into {args.index} in {time.perf_counter() - start:.2f}s")
+    else:
+        hits = search_index(args.query, args.index, args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"{hit['score']:6.2f}  {hit['title']} / {hit['heading']}  ({hit['url']})")
+        print(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# crews/review/prompt_assembly.py
+
+"""
+Shared-Prefix Prompt Assembly
+-----------------------------
+By default every review task interpolates `{code_changes}` into its own
+description, so a single review sends the diff three times. In shared mode the
+large inputs are moved into one system message that is placed first in every
+LLM call of the crew. The prefix is byte-identical across agents and
+iterations, so servers with prefix caching (llama.cpp KV reuse, provider-side
+prompt caching) only process it once; the task descriptions just refer to it.
+"""
+
+from crewai.hooks import register_before_llm_call_hook, unregister_before_llm_call_hook
+
+PREFIX_HEADER = (
+    "# Shared Review Context\n"
+    "The inputs below are shared by every reviewer of this pull request. "
+    "Task instructions refer to them by name."
+)
+REFERENCE_TEMPLATE = "[{label}: see the Shared Review Context at the start of this conversation]"
+
+# --- Token Estimation ---
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def count_tokens(text):
+    """Counts tokens with tiktoken when available, otherwise estimates ~4 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+# --- Prompt Assembly ---
+
+class SharedPrefixAssembler:
+    """Moves shared task inputs out of task descriptions into a cacheable system prefix."""
+
+    def __init__(self, shared_inputs, labels=None):
+        self.shared_inputs = shared_inputs
+        self.labels = labels or {}
+        self.crew = None
+        self.report_rows = []
+        self._original_descriptions = {}
+        self.prefix = self._build_prefix()
+
+    def _label(self, key):
+        return self.labels.get(key, key.replace("_", " ").title())
+
+    def _build_prefix(self):
+        sections = [PREFIX_HEADER]
+        for key, value in self.shared_inputs.items():
+            sections.append(f"## {self._label(key)}\n{value}")
+        return "\n\n".join(sections)
+
+    def apply(self, crew):
+        """Rewrites the crew's task descriptions and injects the prefix into its LLM calls."""
+        self.crew = crew
+        self.report_rows = []
+        for task in crew.tasks:
+            # kickoff interpolates from _original_description (the template, set on the first run), not description
+            self._original_descriptions[task] = (task.description, task._original_description)
+            inline = task._original_description or task.description
+            shared = inline
+            for key in self.shared_inputs:
+                shared = shared.replace("{" + key + "}", REFERENCE_TEMPLATE.format(label=self._label(key)))
+            task.description = task._original_description = shared
+            self.report_rows.append((task.name or task.description[:30], inline, shared))
+        register_before_llm_call_hook(self._inject_prefix)
+        return crew
+
+    def remove(self):
+        """Unregisters the hook and restores the inline task descriptions, so the crew can be reused."""
+        unregister_before_llm_call_hook(self._inject_prefix)
+        for task, (description, template) in self._original_descriptions.items():
+            task.description, task._original_description = description, template
+        self._original_descriptions = {}
+
+    def _inject_prefix(self, context):
+        """before_llm_call hook: keeps the shared prefix as the first message of this crew's calls."""
+        if context.crew is not self.crew:
+            return None
+        if not context.messages or context.messages[0].get("content") != self.prefix:
+            context.messages.insert(0, {"role": "system", "content": self.prefix})
+        return None
+
+    # --- Token Accounting ---
+
+    def token_report(self):
+        """Compares task prompt tokens with inline inputs against the shared-prefix layout."""
+        def interpolate(text):
+            for key, value in self.shared_inputs.items():
+                text = text.replace("{" + key + "}", str(value))
+            return text
+
+        prefix_tokens = count_tokens(self.prefix)
+        lines = [f"{'Task':<28}{'inline':>10}{'shared':>10}"]
+        total_inline = total_shared = 0
+        for name, inline, shared in self.report_rows:
+            inline_tokens = count_tokens(interpolate(inline))
+            shared_tokens = count_tokens(shared)
+            total_inline += inline_tokens
+            total_shared += shared_tokens
+            lines.append(f"{name[:27]:<28}{inline_tokens:>10}{shared_tokens:>10}")
+
+        total_with_prefix = total_shared + prefix_tokens
+        lines.append(f"{'Shared prefix (cacheable)':<28}{'-':>10}{prefix_tokens:>10}")
+        lines.append(f"{'Total':<28}{total_inline:>10}{total_with_prefix:>10}")
+        if total_inline:
+            saved = 1 - total_with_prefix / total_inline
+            lines.append(f"Task prompt tokens processed per review: {total_inline} -> {total_with_prefix} ({saved:.0%} less)")
+        return "\n".join(lines)
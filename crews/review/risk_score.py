@@ -0,0 +1,103 @@
+# crews/review/risk_score.py
+
+"""
+Review Risk Pre-Score
+---------------------
+A cheap, LLM-free estimate of how risky a diff is, used to order review jobs
+(crews/daemon.py, `crews review a.diff b.diff ...`) so that an auth change
+is not stuck behind a batch of doc-only PRs. The score adds up:
+
+- touched paths: auth/session/crypto/payment code, migrations, CI and
+  deployment config weigh more; docs and tests weigh less
+- static-scan hits: regexes for the usual suspects on added lines
+  (string-built SQL, eval/exec, shell=True, unsafe deserialization,
+  disabled TLS verification, weak hashes, hard-coded secrets)
+- diff size: log-scaled number of changed lines
+
+Lock, generated, vendored and binary files are ignored, using the same rules
+and file splitting (`diff --git` or plain `---`/`+++` headers) as
+crews/review/diff_ingest.py. The diff is streamed, never read whole.
+
+    risk = risk_prescore(Path("changes.diff"))
+    risk["score"], risk["priority"], risk["reasons"]
+"""
+
+import math
+import re
+
+from crews.review.diff_ingest import DiffRules, split_diff
+
+CRITICAL, HIGH, NORMAL, LOW = "critical", "high", "normal", "low"
+PRIORITY_CLASSES = (CRITICAL, HIGH, NORMAL, LOW)
+# Lowest score of each class, highest first
+PRIORITY_THRESHOLDS = ((CRITICAL, 10.0), (HIGH, 6.0), (NORMAL, 2.0), (LOW, float("-inf")))
+
+PATH_WEIGHTS = [
+    (re.compile(r"auth|login|passw|session|token|oauth|jwt|permission|acl|rbac", re.I), 4.0, "auth/session code"),
+    (re.compile(r"crypt|secret|key|cert|tls|ssl", re.I), 3.0, "crypto/secrets"),
+    (re.compile(r"payment|billing|checkout|invoice", re.I), 3.0, "payment code"),
+    (re.compile(r"migrations?/|\.sql$|schema", re.I), 2.0, "database schema"),
+    (re.compile(r"(^|/)(\.github/workflows|Dockerfile|docker-compose|k8s|helm|terraform)|\.tf$", re.I), 2.0,
+     "CI/deployment config"),
+    (re.compile(r"(^|/)(settings|config)[^/]*\.(py|ya?ml|toml|json|ini)$", re.I), 1.5, "app config"),
+]
+LOW_RISK_PATHS = re.compile(r"(^|/)(docs?|examples?)/|\.(md|rst|txt)$|(^|/)(tests?|spec)/|_test\.|test_", re.I)
+
+SCAN_RULES = [
+    (re.compile(r"(execute|query)\(\s*f[\"']|(SELECT|INSERT|UPDATE|DELETE)\b[^\"']*[\"']\s*(%|\+|\.format)", re.I),
+     3.0, "string-built SQL"),
+    (re.compile(r"\b(eval|exec)\("), 3.0, "eval/exec"),
+    (re.compile(r"shell\s*=\s*True|os\.system\(|os\.popen\("), 2.5, "shell command"),
+    (re.compile(r"pickle\.loads?\(|yaml\.load\((?![^)]*SafeLoader)|marshal\.loads\("), 2.5, "unsafe deserialization"),
+    (re.compile(r"verify\s*=\s*False|CERT_NONE|check_hostname\s*=\s*False"), 2.0, "TLS verification disabled"),
+    (re.compile(r"\b(md5|sha1)\(", re.I), 1.5, "weak hash"),
+    (re.compile(r"(password|passwd|secret|api_key|token)\s*=\s*[\"'][^\"']{4,}[\"']", re.I), 2.5,
+     "hard-coded secret"),
+]
+MAX_HITS_PER_RULE = 3  # one noisy rule should not dominate the score
+SIZE_WEIGHT = 1.0      # per factor of e in changed lines
+
+
+def priority_class(score):
+    return next(name for name, threshold in PRIORITY_THRESHOLDS if score >= threshold)
+
+
+def risk_prescore(source, rules=None):
+    """Scores a diff (Path, stream or diff text); returns {score, priority, reasons, files, changed_lines}."""
+    rules = rules or DiffRules()
+    path_points, scan_hits, files = {}, {}, []
+    changed_lines = 0
+    skipping = False
+
+    for path, line, starts_file in split_diff(source):
+        if starts_file:
+            skipping = rules.skip_reason(path) is not None
+            if skipping:
+                continue
+            files.append(path)
+            weights = [(weight, reason) for pattern, weight, reason in PATH_WEIGHTS if pattern.search(path)]
+            if weights:
+                weight, reason = max(weights)
+                path_points[path] = (weight, reason)
+            elif LOW_RISK_PATHS.search(path):
+                path_points[path] = (-0.5, "docs/tests")
+            continue
+        if skipping or line.startswith(("+++", "---")) or not line.startswith(("+", "-")):
+            continue
+        changed_lines += 1
+        if line.startswith("+"):
+            for pattern, weight, reason in SCAN_RULES:
+                if scan_hits.get(reason, 0) < MAX_HITS_PER_RULE and pattern.search(line):
+                    scan_hits[reason] = scan_hits.get(reason, 0) + 1
+
+    weights = {reason: weight for _, weight, reason in SCAN_RULES}
+    path_score = sum(weight for weight, _ in path_points.values())
+    scan_score = sum(weights[reason] * hits for reason, hits in scan_hits.items())
+    size_score = SIZE_WEIGHT * math.log1p(changed_lines)
+    score = round(max(0.0, path_score + scan_score + size_score), 2)
+
+    reasons = [f"{path}: {reason}" for path, (weight, reason) in path_points.items() if weight > 0]
+    reasons += [f"{reason} x{hits}" for reason, hits in scan_hits.items()]
+    reasons.append(f"{changed_lines} changed lines")
+    return {"score": score, "priority": priority_class(score), "reasons": reasons,
+            "files": len(files), "changed_lines": changed_lines}
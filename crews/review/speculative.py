@@ -0,0 +1,161 @@
+# crews/review/speculative.py
+
+"""
+Speculative Review Decision
+---------------------------
+The Tech Lead's `make_review_decision` only started once both the security
+review and the code quality review were done, so its whole LLM call was added
+to every review's latency. With a SpeculativeDecision the Tech Lead drafts the
+decision as soon as the first review finishes (or, with `start="prescan"`,
+right away from the static pre-scan of crews/review/risk_score.py). The draft
+runs on a background thread while the remaining review is still running. Once
+all findings are in, the draft is checked against them in a short call that
+either answers CONFIRMED (the draft becomes the report, a few output tokens)
+or rewrites it.
+
+The rule-based decision router (crews/review/decision_router.py) still goes
+first: when the reviews are conclusive the draft is discarded. A draft that
+fails is not retried; the decision is then written from all findings in one
+call, as the Tech Lead would have without speculation.
+
+    speculation = SpeculativeDecision(tech_lead, draft_cfg, confirm_cfg, [review_security, analyze_code_quality])
+    speculation.attach(inputs)
+    ...  # run the reviews
+    speculation.detach()
+    report = speculation.finish(inputs)  # or speculation.discard()
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crewai import Crew, Task
+from crewai.types.usage_metrics import UsageMetrics
+
+CONFIRMED = "CONFIRMED"
+
+
+def format_reviews(tasks):
+    """The findings of the finished `tasks`, one section per task."""
+    return "\n\n".join(f"## {task.name}\n{task.output.raw}" for task in tasks if task.output)
+
+
+def format_prescan(risk):
+    """A risk_prescore result as findings the Tech Lead can draft from."""
+    reasons = "\n".join(f"- {reason}" for reason in risk["reasons"])
+    return (f"## Static pre-scan (no LLM, pattern based)\nRisk score {risk['score']} ({risk['priority']} priority), "
+            f"{risk['files']} file(s):\n{reasons}")
+
+
+class SpeculativeDecision:
+    """Drafts the Tech Lead decision while the reviews still run, then confirms or revises it."""
+
+    def __init__(self, agent, draft_task_cfg, confirm_task_cfg, upstream_tasks, task_name=None):
+        self.upstream_tasks = upstream_tasks
+        self.token_usage = UsageMetrics()
+        self.started_from = None
+        self.outcome = None
+        self.timings = {}
+        self._inputs = None
+        self._draft = None
+        self._attached = []
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-decision")
+        # Named after the task they stand in for, so budgets and usage reports attribute them to it
+        self.draft_crew = Crew(agents=[agent], tasks=[Task(
+            description=draft_task_cfg["description"], expected_output=draft_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+        self.confirm_crew = Crew(agents=[agent], tasks=[Task(
+            description=confirm_task_cfg["description"], expected_output=confirm_task_cfg["expected_output"],
+            agent=agent, name=task_name)])
+
+    def _kickoff(self, crew, inputs):
+        result = crew.copy().kickoff(inputs=inputs)
+        self.token_usage.add_usage_metrics(result.token_usage)
+        return result.raw
+
+    # --- Draft ---
+
+    def start(self, source, findings):
+        """Starts the draft from `findings` on the background thread; later calls are ignored."""
+        if self._draft is not None:
+            return
+        self.started_from = source
+        self.timings["draft_started"] = time.perf_counter()
+
+        def draft():
+            try:
+                return self._kickoff(self.draft_crew, dict(self._inputs, reviews=findings))
+            finally:
+                self.timings["draft_done"] = time.perf_counter()
+
+        self._draft = self._pool.submit(draft)
+
+    def attach(self, inputs, prescan=None):
+        """Starts the draft from `prescan` now, or from the first upstream task to finish."""
+        self._inputs = dict(inputs)
+        if prescan is not None:
+            self.start("static pre-scan", format_prescan(prescan))
+        self._attached = [(task, task.callback) for task in self.upstream_tasks]
+        for task, callback in self._attached:
+            task.callback = lambda output, task=task, callback=callback: self._completed(task, callback, output)
+
+    def detach(self):
+        for task, callback in self._attached:
+            task.callback = callback
+        self._attached = []
+        self.timings.setdefault("reviews_done", time.perf_counter())
+
+    def _completed(self, task, callback, output):
+        if callback:
+            callback(output)
+        self.start(task.name, format_reviews([task]))
+
+    # --- Confirm ---
+
+    def discard(self):
+        """
+        The reviews were conclusive without the Tech Lead. A draft cannot be
+        cancelled once its LLM call is in flight, so it is waited for and its
+        tokens stay in `token_usage`, counted against this job rather than the next.
+        """
+        self.outcome = "discarded"
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def finish(self, inputs):
+        """The Tech Lead's report: the draft, confirmed or revised against all findings."""
+        reviews = format_reviews(self.upstream_tasks)
+        self.timings.setdefault("reviews_done", time.perf_counter())
+        try:
+            draft = self._draft.result() if self._draft else None
+        except Exception as e:  # the draft is only an optimization; decide without it
+            print(f"⚠️  Speculative draft failed: {type(e).__name__}: {e}", flush=True)
+            draft = None
+        self.timings["draft_ready"] = time.perf_counter()
+        self._pool.shutdown(wait=False)
+        if not draft:
+            self.outcome = "failed"
+            return self._kickoff(self.draft_crew, dict(inputs, reviews=reviews))
+        answer = self._kickoff(self.confirm_crew, {"draft": draft, "reviews": reviews})
+        confirmed = answer.strip().strip("*.`\"'").upper() == CONFIRMED
+        self.outcome = "confirmed" if confirmed else "revised"
+        return draft if confirmed else answer
+
+    def report(self):
+        """Plain data: where the draft started from, the outcome and how much of it ran alongside the reviews."""
+        timings = self.timings
+        report = {"started_from": self.started_from, "outcome": self.outcome}
+        if "draft_started" in timings and "reviews_done" in timings:
+            draft_end = timings.get("draft_done", timings["reviews_done"])
+            report["overlap_s"] = round(max(0.0, min(draft_end, timings["reviews_done"]) - timings["draft_started"]), 3)
+        if "draft_ready" in timings:
+            report["waited_s"] = round(timings["draft_ready"] - timings["reviews_done"], 3)
+        return report
+
+
+def format_speculation(report):
+    started = report["started_from"] or "nothing (no review finished)"
+    line = f"Draft started from {started}; {report['outcome']}"
+    if "overlap_s" in report:
+        line += f"; {report['overlap_s']:.1f}s of drafting overlapped the reviews"
+    if "waited_s" in report:
+        line += f", {report['waited_s']:.1f}s waited for the draft afterwards"
+    return line
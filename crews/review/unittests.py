@@ -21,7 +21,7 @@ def print_results(cases):
             print(feedback_msg)
 
 
-def test_tools(serper_search_tool, scrape_website_tool):
+def test_tools(serper_search_tool, batch_scrape_tool):
     cases = []
 
     # Test 1: Check if the serper_search_tool can run
@@ -35,13 +35,13 @@ def test_tools(serper_search_tool, scrape_website_tool):
         t.got = str(e)
         cases.append(t)
 
-    # Test 2: Check if the scrape_website_tool can run
+    # Test 2: Check if the batch_scrape_tool can run
     t = test_case()
     try:
-        content = scrape_website_tool.run(website_url="https://owasp.org")
+        content = batch_scrape_tool.run(website_urls=["https://owasp.org"])
     except Exception as e:
         t.failed = True
-        t.msg = f"Couldn't run ScrapeWebsiteTool instance"
+        t.msg = f"Couldn't run BatchScrapeTool instance"
         t.want = "No exception"
         t.got = str(e)
     cases.append(t)
@@ -89,20 +89,20 @@ def test_security_engineer_agent(security_engineer):
         if len(security_engineer.tools) == 2:
             tools = security_engineer.tools
             tool_types = [type(tool).__name__ for tool in tools]
-            if 'SerperDevTool' not in tool_types or 'ScrapeWebsiteTool' not in tool_types:
+            if 'OWASPIndexSearchTool' not in tool_types or 'BatchScrapeTool' not in tool_types:
                 t.failed = True
                 t.msg = "security_engineer has the wrong type of tools"
-                t.want = "List with SerperDevTool and ScrapeWebsiteTool instances"
+                t.want = "List with OWASPIndexSearchTool and BatchScrapeTool instances"
                 t.got = f"{tool_types}"
         else:
             t.failed = True
             t.msg = "security_engineer should have exactly 2 tools assigned"
-            t.want = "List with the SerperDevTool and ScrapeWebsiteTool instances"
+            t.want = "List with the OWASPIndexSearchTool and BatchScrapeTool instances"
             t.got = f"{len(security_engineer.tools)} tools"
     else: 
         t.failed = True
         t.msg = "security_engineer agent should have tools assigned"
-        t.want = "List with the SerperDevTool and ScrapeWebsiteTool instances"
+        t.want = "List with the OWASPIndexSearchTool and BatchScrapeTool instances"
         t.got = "Attribute is missing or None"
     cases.append(t)
     print_results(cases)
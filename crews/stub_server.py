@@ -0,0 +1,183 @@
+# crews/stub_server.py
+
+"""
+Local Stub Server
+-----------------
+The cassettes in crews/cassettes/ are recorded against this server instead of
+the real OpenAI, Serper and EXA APIs, so re-recording them costs nothing and
+gives the same fixtures every time. One local HTTP server answers:
+
+    POST /v1/chat/completions   OpenAI-compatible completions: one call per tool the agent has, then a
+                                final answer shaped like the task's expected output (JSON where asked)
+    POST /search                Serper ({"q": ...}) and EXA ({"query": ...}) searches
+    GET  /<anything else>       a small HTML page to scrape
+
+Usage:
+    crews stub-server --port 8790
+    export OPENAI_API_BASE=http://127.0.0.1:8790/v1 DLAI_SERPER_BASE_URL=http://127.0.0.1:8790 \
+        EXA_BASE_URL=http://127.0.0.1:8790 SELFTEST_SCRAPE_URL=http://127.0.0.1:8790/
+    crews selftest --record
+"""
+
+import argparse
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTEXT_MARKER = "This is the context you're working with"
+EXPECTED_MARKER = "This is the expected criteria for your final answer:"
+SEARCH_QUERY = "SQL injection prevention"
+USAGE = {"prompt_tokens": 500, "completion_tokens": 50, "total_tokens": 550}
+
+# --- Canned Answers ---
+
+SECURITY_REVIEW = {
+    "security_vulnerabilities": [{
+        "type": "SQL injection", "severity": "high", "risk_score": 8, "location": "login()",
+        "description": "The query is built by string concatenation of user input.",
+        "recommendation": "Use parameterized queries.",
+    }],
+    "blocking": True,
+    "highest_risk": "High",
+    "security_recommendations": ["Use parameterized queries in login()."],
+}
+QUALITY_REVIEW = {
+    "critical_issues": [],
+    "minor_issues": ["The password check has no docstring."],
+    "reasoning": "Readable code; the issues are cosmetic.",
+}
+TOPICS = ["Paperclip", "Fork", "Zipper", "Umbrella", "Teabag"]
+
+
+def blueprint(subject):
+    return {
+        "title": f"The Secret History of the {subject}",
+        "hook_main": f"This {subject.lower()} changed everything.",
+        "hook_alt": f"You use a {subject.lower()} daily without knowing this.",
+        "visuals": [f"Close-up of a {subject.lower()}", "Old patent drawing"],
+        "tags": ["#shorts", "#microhistory"],
+        "cta": f"What should the next {subject.lower()} story be?",
+    }
+
+
+def final_answer(prompt):
+    """The final answer for a task prompt, shaped like the expected output it asks for."""
+    description, _, expected = prompt.partition(EXPECTED_MARKER)
+    if "single word CONFIRMED" in expected:
+        return "CONFIRMED"
+    if "security_vulnerabilities" in expected:
+        return json.dumps(SECURITY_REVIEW)
+    if "critical_issues" in expected:
+        return json.dumps(QUALITY_REVIEW)
+    if '"videos"' in expected:
+        return json.dumps({"videos": [blueprint(subject) for subject in TOPICS]})
+    if '"topics"' in expected:
+        return json.dumps({"topics": [f"{subject} - the surprising twist behind it" for subject in TOPICS]})
+    topic = re.search(r"on this topic: (\w+)", description)
+    if topic:
+        return json.dumps(blueprint(topic.group(1)))
+    heading = next((line.strip() for line in description.replace("Current Task:", "").splitlines() if line.strip()),
+                   "Answer")
+    return (f"## {heading[:80]}\n\n- Finding one, supported by the stub page [S1].\n"
+            f"- Finding two: parameterized queries prevent SQL injection.\n\nFinal decision: REQUEST CHANGES")
+
+
+def tool_arguments(parameters, page_url):
+    """Arguments for a tool call: every parameter without a default, with a plausible value of its type."""
+    arguments = {}
+    for name, schema in parameters.get("properties", {}).items():
+        if "default" in schema and name not in parameters.get("required", []):
+            continue
+        types = {schema.get("type")} | {option.get("type") for option in schema.get("anyOf", [])}
+        value = page_url if "url" in name else SEARCH_QUERY
+        if "array" in types:
+            arguments[name] = [] if "source" in name else [value]
+        elif types & {"integer", "number"}:
+            arguments[name] = 3
+        elif "boolean" in types:
+            arguments[name] = False
+        else:
+            arguments[name] = value
+    return arguments
+
+
+def completion(body, page_url):
+    """One tool call per offered tool (in order), then the final answer."""
+    messages = body.get("messages", [])
+    tools = body.get("tools") or []
+    tool_results = sum(message.get("role") == "tool" for message in messages)
+    message = {"role": "assistant", "content": None}
+    if tool_results < len(tools):
+        function = tools[tool_results]["function"]
+        message["tool_calls"] = [{
+            "id": f"call_{tool_results}", "type": "function",
+            "function": {"name": function["name"],
+                         "arguments": json.dumps(tool_arguments(function.get("parameters", {}), page_url))},
+        }]
+    else:
+        prompts = [message.get("content") or "" for message in messages if message.get("role") == "user"]
+        message["content"] = final_answer(prompts[0].split(CONTEXT_MARKER)[0] if prompts else "")
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": message,
+                     "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+        "usage": USAGE,
+    }
+
+
+def search(body, page_url):
+    if "q" in body:  # Serper
+        return {"searchParameters": {"q": body["q"]}, "organic": [
+            {"title": "SQL Injection Prevention Cheat Sheet", "link": page_url, "position": 1,
+             "snippet": "Use prepared statements with parameterized queries."}]}
+    return {"requestId": "stub", "resolvedSearchType": "neural", "results": [  # EXA
+        {"id": page_url, "url": page_url, "title": "SQL Injection Prevention Cheat Sheet", "score": 0.9,
+         "publishedDate": "2025-01-01", "author": "OWASP", "text": "Use prepared statements with parameterized queries."}]}
+
+
+PAGE = ("<html><head><title>SQL Injection Prevention</title></head><body><h1>SQL Injection Prevention</h1>"
+        "<p>Use prepared statements with parameterized queries. Never build SQL from user input.</p></body></html>")
+
+# --- HTTP Server ---
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _page_url(self):
+        return f"http://{self.headers.get('Host', '127.0.0.1')}/"
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            return self._send(200, completion(body, self._page_url()))
+        if path.endswith("/search"):
+            return self._send(200, search(body, self._page_url()))
+        self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        self._send(200, PAGE, "text/html; charset=utf-8")
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews stub-server",
+                                     description="Serve canned LLM, search and page answers for recording cassettes.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub server on http://{args.host}:{args.port} (OPENAI_API_BASE=http://{args.host}:{args.port}/v1)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
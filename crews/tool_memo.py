@@ -0,0 +1,143 @@
+# crews/tool_memo.py
+
+"""
+In-Run Tool Memoization
+-----------------------
+Within one research run the researcher and the fact checker often send the
+same EXA query or scrape the same URL, and an agent sometimes repeats a tool
+call across its own iterations. Every such repeat costs a network round trip
+(and API credits) for a result the run already has.
+
+`memoized(BatchScrapeTool)(...)` builds a tool whose calls go through the
+active ToolMemo and that is otherwise unchanged (same class name, arguments
+and description). Used for EXASearchTool, SerperDevTool and BatchScrapeTool.
+While a ToolMemo is active, calls are keyed on the tool name and its
+normalized arguments:
+
+- the first call runs the tool; identical calls made while it is still
+  running wait for that result instead of starting their own (single-flight)
+- later identical calls get the memoized result
+- failures are shared with the calls that waited for them, but not memoized,
+  so a later call tries again
+
+The memo lives for one run only (crews/pool.py opens one per job), so results
+never leak from one job into the next in a warm worker. Outside a ToolMemo the
+tool runs as usual.
+
+    with ToolMemo() as memo:
+        crews.research.crew.run_job("query")
+    print(format_memo(memo.report()))
+"""
+
+import functools
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+
+_active_memo = None
+_active_lock = threading.Lock()
+
+
+def normalize_arguments(kwargs):
+    """Canonical form of tool arguments: whitespace collapsed, queries case-folded, URLs without trailing '/'."""
+    normalized = {}
+    for name, value in kwargs.items():
+        if isinstance(value, str):
+            value = " ".join(value.split())
+            if name.endswith("query"):
+                value = value.casefold()
+            elif name.endswith("url"):
+                value = value.split("#", 1)[0].rstrip("/")
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+# --- Memo ---
+
+class ToolMemo:
+    """Per-run memo of tool results with single-flight for identical concurrent calls."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._previous = None
+        self.stats = defaultdict(lambda: {"calls": 0, "executed": 0, "memo_hits": 0, "coalesced": 0})
+
+    def call(self, tool_name, arguments, run):
+        """Returns the result of `run()` for (tool_name, arguments), running it at most once at a time."""
+        key = (tool_name, normalize_arguments(arguments))
+        with self._lock:
+            stats = self.stats[tool_name]
+            stats["calls"] += 1
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = Future()
+                stats["executed"] += 1
+            else:
+                stats["memo_hits" if flight.done() else "coalesced"] += 1
+        if not owner:
+            return flight.result()
+        try:
+            result = run()
+        except BaseException as e:
+            with self._lock:
+                del self._flights[key]
+            flight.set_exception(e)
+            raise
+        flight.set_result(result)
+        return result
+
+    def report(self):
+        """Plain-data report: per tool the calls made, executed and saved (memo hits + coalesced)."""
+        tools = [
+            dict(stats, tool=name, saved=stats["memo_hits"] + stats["coalesced"])
+            for name, stats in sorted(self.stats.items())
+        ]
+        return {
+            "calls": sum(tool["calls"] for tool in tools),
+            "saved": sum(tool["saved"] for tool in tools),
+            "tools": tools,
+        }
+
+    def __enter__(self):
+        global _active_memo
+        with _active_lock:
+            self._previous, _active_memo = _active_memo, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active_memo
+        with _active_lock:
+            _active_memo = self._previous
+        return False
+
+
+def active_memo():
+    return _active_memo
+
+# --- CrewAI Tools ---
+
+class MemoizedToolMixin:
+    """Routes a tool's calls through the active ToolMemo; mixed in before the tool class by `memoized`."""
+
+    def _run(self, *args, **kwargs):
+        memo = active_memo()
+        if memo is None:
+            return super()._run(*args, **kwargs)
+        arguments = dict(kwargs, _args=list(args)) if args else kwargs
+        return memo.call(self.name, arguments, lambda: super(MemoizedToolMixin, self)._run(*args, **kwargs))
+
+
+@functools.cache
+def memoized(tool_class):
+    """A subclass of `tool_class` with memoized calls; same class name, so type checks and prompts are unchanged."""
+    return type(tool_class.__name__, (MemoizedToolMixin, tool_class), {"__module__": __name__})
+
+
+def format_memo(report):
+    lines = [f"{report['saved']} of {report['calls']} tool calls served from this run's memo", ""]
+    for tool in report["tools"]:
+        lines.append(f"- {tool['tool']}: {tool['calls']} calls, {tool['executed']} executed, "
+                     f"{tool['memo_hits']} memoized, {tool['coalesced']} coalesced")
+    return "\n".join(lines)
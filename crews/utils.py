@@ -0,0 +1,103 @@
+# Add your utilities or helper functions to this file.
+
+import os
+import re
+from importlib import resources
+from pathlib import Path
+from dotenv import load_dotenv, find_dotenv
+import json
+
+# these expect to find a .env file in the current directory or one of its parents.
+# the format for that file is (without the comment)
+#API_KEYNAME=AStringThatIsTheLongAPIKeyFromSomeService
+def load_env():
+    _ = load_dotenv(find_dotenv(usecwd=True))
+
+def get_openai_api_key():
+    load_env()
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    return openai_api_key
+
+def get_serper_api_key():
+    load_env()
+    serper_api_key = os.getenv("SERPER_API_KEY")
+    return serper_api_key
+
+def get_exa_api_key():
+    load_env()
+    exa_api_key = os.getenv("EXA_API_KEY")
+    return exa_api_key
+
+def get_dict_keys(task_output):
+    """
+    Extracts the keys from a dictionary-like string.
+    """
+    # Check if task outputs are dictionaries and show their keys
+    if isinstance(task_output, str):
+        try:
+            
+            parsed = json.loads(task_output)
+            if isinstance(parsed, dict):
+                print(f"  ✅ Can be parsed as JSON dictionary")  
+                print(f"  Keys: {list(parsed.keys())}")
+            else:
+                print(f"  ❌ JSON parses but not as dictionary")
+        except json.JSONDecodeError:
+            print(f"  ❌ Cannot parse as JSON")
+    print()
+
+# --- Agent Output ---
+
+FENCED_JSON_PATTERN = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+
+def parse_json_output(raw):
+    """Extracts the first JSON object from an agent's raw answer (plain or fenced). Returns None if absent."""
+    if not raw:
+        return None
+
+    candidates = FENCED_JSON_PATTERN.findall(raw)
+    start, end = raw.find("{"), raw.rfind("}")
+    if start != -1 and end > start:
+        candidates.append(raw[start:end + 1])
+
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+# --- Packaged Definitions ---
+
+def definition_file(package, relative_path):
+    """Locates an agent/task definition shipped inside a crew package, independent of the cwd."""
+    return resources.files(package).joinpath(relative_path)
+
+def load_md_content(file_path):
+    """Parses MD files (paths or package resources) to extract labeled sections for Agents and Tasks."""
+    content = file_path.read_text() if hasattr(file_path, "read_text") else Path(file_path).read_text()
+
+    def extract_section(label, text):
+        # Matches content after **Label:** until the next **Label:** line or end of file
+        pattern = rf"\*\*{label}:\*\*\s*([\s\S]*?)(?=\n[ \t]*(?:- )?\*\*[^*\n]+:\*\*|\Z)"
+        match = re.search(pattern, text)
+        return match.group(1).strip() if match else ""
+
+    return {
+        "role": extract_section("Role", content),
+        "goal": extract_section("Goal", content),
+        "backstory": extract_section("Backstory", content),
+        "description": extract_section("Description", content),
+        "expected_output": extract_section("Expected Output", content),
+        "model": extract_section("Model", content)
+    }
+
+# --- Local State ---
+
+def state_path(name):
+    """Path of a local state file (indexes, caches, checkpoints) under $CREWS_HOME, default ~/.crews."""
+    home = Path(os.getenv("CREWS_HOME", "~/.crews")).expanduser()
+    home.mkdir(parents=True, exist_ok=True)
+    return str(home / name)
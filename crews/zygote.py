@@ -0,0 +1,329 @@
+# crews/zygote.py
+
+"""
+Warm-Start Zygote
+-----------------
+Before a cold crew job makes its first LLM call, it imports crewai and
+crewai_tools, reads the environment, loads the agent/task definitions and
+builds tools, agents and the crew. That costs a few seconds per process. Pool
+workers pay it once each, but every recycled worker and every `crews`
+invocation pays it again.
+
+Zygote starts one process that imports and builds all three crews once. It
+then forks a child per job. The child starts with everything already built,
+runs the job (crews/pool.py run_crew_job), sends the result back and exits.
+Every job starts from the same clean state, and nothing a job changes leaks
+into the next one. CrewAI's background threads do not survive a fork: the
+event bus loop, its handler pool and the agents' RPM reset timers. They are
+restarted in the child before the job runs. The zygote forks only while idle,
+and it is POSIX-only (os.fork).
+
+    with Zygote(max_concurrent=4) as zygote:
+        for result in zygote.run_jobs([("review", {"diff_path": "/path/to/pr.diff"})]):
+            ...
+
+    crews pool jobs.jsonl --zygote --workers review=4
+    crews serve --zygote
+    crews zygote bench --kind review --jobs 5      # job start latency, cold (spawned) vs warm (forked)
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+
+from crews.pool import CREW_KINDS, load_crew_module, run_crew_job
+
+# --- Forked Children ---
+
+def restart_after_fork():
+    """Restarts what CrewAI keeps on background threads, which a forked child does not inherit."""
+    from crewai.events.event_bus import crewai_event_bus as bus
+    from crewai.utilities.rw_lock import RWLock
+
+    bus._rwlock = RWLock()
+    bus._futures_lock = threading.Lock()
+    bus._pending_futures = set()
+    bus._sync_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix="CrewAISyncHandler")
+    bus._loop = asyncio.new_event_loop()
+    bus._loop_thread = threading.Thread(target=bus._run_loop, name="CrewAIEventsLoop", daemon=True)
+    bus._loop_thread.start()
+    # Without their timers the agents' RPM counters would only reset after a one-minute wait
+    for module_name, crew_attribute in CREW_KINDS.values():
+        module = sys.modules.get(module_name)
+        for agent in getattr(module, crew_attribute).agents if module else []:
+            controller = agent._rpm_controller
+            if controller is not None and controller.max_rpm:
+                controller._lock = threading.Lock()
+                controller._reset_request_count()
+
+
+def _run_child(request, build_errors):
+    job_id, kind, payload, submitted = request
+    restart_after_fork()
+    start_s = round(time.time() - submitted, 4)
+    if kind in build_errors:
+        return {"job_id": job_id, "kind": kind, "status": "failed", "error": build_errors[kind],
+                "worker_pid": os.getpid(), "start_s": start_s}
+    if payload is None:
+        # Start probe (see `bench`): report when the job could have started, run nothing
+        return {"job_id": job_id, "kind": kind, "status": "done", "worker_pid": os.getpid(), "start_s": start_s}
+    return run_crew_job(sys.modules[CREW_KINDS[kind][0]], kind, payload, job_id) | {"start_s": start_s}
+
+
+def _child_main(request, build_errors, address, authkey):
+    try:
+        result = _run_child(request, build_errors)
+    except Exception as e:
+        result = {"job_id": request[0], "kind": request[1], "status": "failed", "error": f"{type(e).__name__}: {e}",
+                  "worker_pid": os.getpid()}
+    with Client(address, authkey=authkey) as conn:
+        conn.send(result)
+
+# --- Zygote Process ---
+
+def _reap(children, control):
+    """Collects exited children; a child that died before sending its result is reported as failed."""
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        job_id, kind = children.pop(pid)
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0:
+            control.send({"job_id": job_id, "kind": kind, "status": "failed", "worker_pid": pid,
+                          "error": f"Job process {pid} exited with {code} before sending its result"})
+
+
+def _zygote_main(kinds, control, address, authkey):
+    started = time.perf_counter()
+    build_errors = {}
+    for kind in kinds:
+        try:
+            load_crew_module(kind)
+        except Exception as e:
+            build_errors[kind] = f"Could not build the {kind} crew: {type(e).__name__}: {e}"
+    control.send({"pid": os.getpid(), "build_s": round(time.perf_counter() - started, 3), "errors": build_errors})
+
+    children = {}  # pid -> (job_id, kind)
+    while True:
+        _reap(children, control)
+        if not control.poll(0.2):
+            continue
+        try:
+            request = control.recv()
+        except EOFError:
+            request = None
+        if request is None:
+            break
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                control.close()
+                _child_main(request, build_errors, address, authkey)
+                code = 0
+            finally:
+                os._exit(code)
+        children[pid] = request[:2]
+    while children:
+        time.sleep(0.2)
+        _reap(children, control)
+
+# --- Zygote ---
+
+class Zygote:
+    """A process with all crews built that forks one child per job; same submit/run_jobs interface as CrewPool."""
+
+    def __init__(self, kinds=None, max_concurrent=4):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The warm-start zygote needs os.fork (POSIX); use the process pool instead")
+        self.kinds = list(kinds or CREW_KINDS)
+        unknown = set(self.kinds) - set(CREW_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown crew kind(s) {sorted(unknown)}; choose from {sorted(CREW_KINDS)}")
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._running = set()
+        self._results = queue.Queue()
+        self._callbacks = {}
+        self._send_lock = threading.Lock()
+        authkey = os.urandom(16)
+        self._listener = Listener(family="AF_UNIX", authkey=authkey)
+        # The zygote itself is spawned: it must start without the threads this process may already run
+        context = multiprocessing.get_context("spawn")
+        self._control, zygote_end = context.Pipe()
+        self._process = context.Process(target=_zygote_main, name="crews-zygote", daemon=True,
+                                        args=(self.kinds, zygote_end, self._listener.address, authkey))
+        self._process.start()
+        zygote_end.close()
+        self.info = self._control.recv()  # returns once the crews are built
+        threading.Thread(target=self._accept_results, name="zygote-results", daemon=True).start()
+        threading.Thread(target=self._watch_zygote, name="zygote-control", daemon=True).start()
+
+    def _accept_results(self):
+        while True:
+            try:
+                with self._listener.accept() as conn:
+                    self._deliver(conn.recv())
+            except (OSError, EOFError):
+                return
+
+    def _watch_zygote(self):
+        while True:
+            try:
+                self._deliver(self._control.recv())
+            except (OSError, EOFError):
+                return
+
+    def _deliver(self, result):
+        if result["job_id"] not in self._running:
+            return  # already reported, e.g. a child that failed after sending its result
+        self._running.discard(result["job_id"])
+        callback = self._callbacks.pop(result["job_id"], None)
+        try:
+            if callback:
+                callback(result)
+            else:
+                self._results.put(result)
+        finally:
+            self._slots.release()
+
+    def submit(self, kind, payload=None, job_id=None, callback=None):
+        """
+        Forks a child for one job; its result is passed to `callback`, or yielded by
+        `run_jobs` without one. A None payload only probes how fast a job would start.
+        Blocks while `max_concurrent` children are still running.
+        """
+        if kind not in self.kinds:
+            raise ValueError(f"The zygote did not build the '{kind}' crew; available: {self.kinds}")
+        job_id = job_id or uuid.uuid4().hex[:12]
+        self._slots.acquire()
+        self._running.add(job_id)
+        if callback:
+            self._callbacks[job_id] = callback
+        try:
+            with self._send_lock:
+                self._control.send((job_id, kind, payload, time.time()))
+        except BaseException:
+            self._callbacks.pop(job_id, None)
+            self._running.discard(job_id)
+            self._slots.release()
+            raise
+        return job_id
+
+    def run_jobs(self, jobs):
+        """Runs (kind, payload) pairs, at most `max_concurrent` at a time; yields results in completion order."""
+        jobs = iter(jobs)
+        running = 0
+        for kind, payload in jobs:
+            self.submit(kind, payload)
+            running += 1
+            if running == self.max_concurrent:
+                break
+        while running:
+            yield self._results.get()
+            running -= 1
+            for kind, payload in jobs:
+                self.submit(kind, payload)
+                running += 1
+                break
+
+    def close(self):
+        with self._send_lock:
+            try:
+                self._control.send(None)
+            except OSError:
+                pass
+        self._process.join(timeout=30)
+        self._listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# --- Benchmark ---
+
+def _cold_main(kind, payload, submitted, conn):
+    load_crew_module(kind)
+    start_s = round(time.time() - submitted, 4)
+    result = {"job_id": uuid.uuid4().hex[:12], "kind": kind, "status": "done", "worker_pid": os.getpid()}
+    if payload is not None:
+        result = run_crew_job(sys.modules[CREW_KINDS[kind][0]], kind, payload)
+    conn.send(result | {"start_s": start_s})
+
+
+def bench(kind="review", jobs=5, payload=None):
+    """Job start latency (submit -> crew built and job starting) of cold spawned processes vs zygote forks.
+
+    With `payload` None the jobs are start probes that run nothing; otherwise every job runs `payload`.
+    """
+    context = multiprocessing.get_context("spawn")
+    cold = []
+    for _ in range(jobs):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_cold_main, args=(kind, payload, time.time(), sender))
+        process.start()
+        cold.append(receiver.recv())
+        process.join()
+    started = time.perf_counter()
+    with Zygote([kind], max_concurrent=1) as zygote:
+        zygote_ready_s = time.perf_counter() - started
+        warm = list(zygote.run_jobs((kind, payload) for _ in range(jobs)))
+    report = {"kind": kind, "jobs": jobs, "zygote_ready_s": round(zygote_ready_s, 3),
+              "zygote_build_s": zygote.info["build_s"]}
+    for mode, results in (("cold", cold), ("warm", warm)):
+        failed = [result["error"] for result in results if result["status"] != "done"]
+        if failed:
+            raise RuntimeError(f"{mode} job failed: {failed[0]}")
+        starts = [result["start_s"] for result in results]
+        report[mode] = {"median_s": round(statistics.median(starts), 4), "max_s": round(max(starts), 4)}
+        if payload is not None:
+            report[mode]["median_job_s"] = round(statistics.median(result["seconds"] for result in results), 3)
+    report["speedup"] = round(report["cold"]["median_s"] / max(report["warm"]["median_s"], 1e-6), 1)
+    return report
+
+
+def format_bench(report):
+    lines = [f"Job start latency, {report['kind']} crew, {report['jobs']} jobs each (submit -> job starting):",
+             f"  cold (spawned process): median {report['cold']['median_s']:.3f}s, max {report['cold']['max_s']:.3f}s",
+             f"  warm (zygote fork):     median {report['warm']['median_s']:.3f}s, max {report['warm']['max_s']:.3f}s",
+             f"  -> {report['speedup']}x faster; the zygote itself was ready after {report['zygote_ready_s']:.2f}s "
+             f"(crew build {report['zygote_build_s']:.2f}s, paid once)"]
+    if "median_job_s" in report["cold"]:
+        lines.append(f"  median job time: cold {report['cold']['median_job_s']}s, warm {report['warm']['median_job_s']}s")
+    return "\n".join(lines)
+
+# --- Command Line ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="crews zygote", description="Warm-start zygote for crew jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = commands.add_parser("bench", help="Compare cold and warm job start latency")
+    bench_cmd.add_argument("--kind", choices=list(CREW_KINDS), default="review")
+    bench_cmd.add_argument("--jobs", type=int, default=5, help="Jobs per mode")
+    bench_cmd.add_argument("--payload", help="JSON payload to run in every job (default: start probes only)")
+    bench_cmd.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = bench(args.kind, args.jobs, json.loads(args.payload) if args.payload else None)
+    print(json.dumps(report) if args.json else format_bench(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,8 @@
-def main():
-    print("Hello from design-develop-and-deploy-multi-agent-systems-with-crewai!")
+# main.py
+
+"""Starts the crew daemon (same as `crews serve`); see crews/daemon.py for the HTTP API."""
+
+from crews.daemon import main
 
 
 if __name__ == "__main__":